@@ -0,0 +1,69 @@
+"""Latency of `docmatd` requests against cold `docmat -` invocations.
+
+Run with `python -m benchmarks.bench_daemon`.
+"""
+
+import http.client
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.corpus import generate_module
+from docmat.daemon import make_server
+
+N_FUNCTIONS = 20
+N_CLI_RUNS = 30
+N_DAEMON_REQUESTS = 300
+
+
+def percentiles(timings):
+    quantiles = statistics.quantiles(timings, n=100)
+    return quantiles[49] * 1e3, quantiles[98] * 1e3
+
+
+def time_cli(source):
+    timings = []
+    for _ in range(N_CLI_RUNS):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "docmat", "-"],
+            input=source.encode(),
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_daemon(source):
+    server = make_server("localhost", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    timings = []
+    try:
+        for _ in range(N_DAEMON_REQUESTS):
+            start = time.perf_counter()
+            connection = http.client.HTTPConnection("localhost", port)
+            connection.request("POST", "/", body=source.encode())
+            connection.getresponse().read()
+            connection.close()
+            timings.append(time.perf_counter() - start)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return timings
+
+
+def main():
+    source = generate_module(N_FUNCTIONS)
+    print(f"module with {N_FUNCTIONS} docstrings")
+    print(f"{'':>8} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, timings in (("cli", time_cli(source)), ("docmatd", time_daemon(source))):
+        p50, p99 = percentiles(timings)
+        print(f"{name:>8} {p50:>10.2f} {p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
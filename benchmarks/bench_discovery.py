@@ -0,0 +1,67 @@
+"""File discovery with `os.scandir` and pruning against `Path.rglob`.
+
+Run with `python -m benchmarks.bench_discovery`. The tree mimics a project with a deep
+source tree next to a virtual environment, `node_modules`, a build directory and a
+gitignored directory of generated code, which are pruned by `iter_files`.
+"""
+
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from docmat.discovery import DEFAULT_EXCLUDES, iter_files
+
+DEPTH = 6
+FANOUT = 3
+VENDORED_FILES = 20_000
+REPEAT = 5
+
+
+def make_source_tree(root, depth):
+    root.mkdir()
+    (root / "module.py").touch()
+    (root / "README.md").touch()
+    if depth:
+        for i in range(FANOUT):
+            make_source_tree(root / f"package_{i}", depth - 1)
+
+
+def make_vendored_tree(root, n_files):
+    for i in range(n_files):
+        directory = root / f"package_{i // 100}" / f"sub_{i // 10 % 10}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"module_{i}.py").touch()
+
+
+def best_of(function):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(result)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / ".git").mkdir()
+        (root / ".gitignore").write_text("generated/\n")
+        make_source_tree(root / "src", DEPTH)
+        for vendored in (".venv", "node_modules/pkg", "build", "generated"):
+            make_vendored_tree(root / vendored, VENDORED_FILES // 4)
+        exclude = re.compile(DEFAULT_EXCLUDES)
+        runs = {
+            "Path.rglob": lambda: [str(path) for path in root.rglob("*.py")],
+            "iter_files (no exclude)": lambda: list(iter_files([tmp])),
+            "iter_files": lambda: list(iter_files([tmp], exclude, gitignore=True)),
+        }
+        print(f"{'method':<24} {'time (ms)':>10} {'files':>7}")
+        for name, function in runs.items():
+            seconds, n_files = best_of(function)
+            print(f"{name:<24} {seconds * 1e3:>10.1f} {n_files:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Scaling of the output assembly of `GoogleFormatter` with the docstring size.
+
+Run with `python -m benchmarks.bench_docstring_assembly`. The time per output line of
+`get_formatted_docstring` stays flat when the assembly is linear.
+"""
+
+import timeit
+
+from docmat.docstring_formats.google.docstring import GoogleFormatter
+
+N_ARGS = (100, 1_000, 10_000)
+
+
+def generate_docstring(n_args):
+    lines = ['    """Summary.', "", "    Args:"]
+    lines += [f"        arg{i} (int): argument {i}." for i in range(n_args)]
+    return lines + ['    """']
+
+
+def best_of(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main():
+    print(f"{'args':>8} {'assembly (ns/line)':>19}")
+    for n_args in N_ARGS:
+        formatter = GoogleFormatter(generate_docstring(n_args))
+        n_lines = len(formatter.get_formatted_docstring())
+        assembly = best_of(formatter.get_formatted_docstring, 10)
+        print(f"{n_args:>8} {assembly / n_lines * 1e9:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Micro-benchmarks of the docstring element classes.
+
+Run with `python -m benchmarks.bench_elements`. Besides the time to build each element,
+the memory held by many parsed elements is measured with `tracemalloc`, before and
+after deduplicating them with a set.
+"""
+
+import timeit
+import tracemalloc
+
+from docmat.docstring_formats.shared.elements import (
+    IndentedSection,
+    Summary,
+    UnindentedSection,
+    clean_text,
+)
+from docmat.docstring_formats.shared.string_utils import get_section_name
+
+SUMMARY = "short  summary of the function"
+TEXT_LINES = [
+    "The length of this description exceeds the maximum line length, hence it",
+    "needs to be   wrapped by the formatter.",
+]
+SECTION_LINES = [
+    "args:",
+    "    arg1 (int): first argument.",
+    "    arg2 (str): second argument, whose description is long enough to be wrapped",
+    "        on a new line",
+]
+
+BENCHMARKS = {
+    "clean_text": lambda: clean_text(SUMMARY),
+    "get_section_name": lambda: get_section_name(SECTION_LINES[0]),
+    "Summary": lambda: Summary(SUMMARY, '"""'),
+    "Summary (wrapped)": lambda: Summary(SUMMARY, '"""', True, 20),
+    "UnindentedSection": lambda: UnindentedSection(TEXT_LINES, 84),
+    "IndentedSection": lambda: IndentedSection(SECTION_LINES, 84),
+}
+
+N_ELEMENTS = 10_000
+# Number of distinct sections, as in a repository where many docstrings document the
+# same arguments
+N_DISTINCT = 100
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    try:
+        elements = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, len(elements)
+
+
+def build_sections():
+    return [
+        IndentedSection(SECTION_LINES[:-1] + [f"        on line {i % N_DISTINCT}"])
+        for i in range(N_ELEMENTS)
+    ]
+
+
+def main():
+    print(f"{'benchmark':>20} {'us/call':>10}")
+    for name, function in BENCHMARKS.items():
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        print(f"{name:>20} {best * 1e6:>10.2f}")
+    print(f"\n{'memory':>20} {'bytes/element':>14} {'elements':>9}")
+    for name, build in [
+        ("IndentedSection", build_sections),
+        ("deduplicated", lambda: set(build_sections())),
+    ]:
+        size, n_elements = measure_memory(build)
+        print(f"{name:>20} {size / N_ELEMENTS:>14.0f} {n_elements:>9}")
+
+
+if __name__ == "__main__":
+    main()
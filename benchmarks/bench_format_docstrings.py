@@ -0,0 +1,53 @@
+"""Throughput of the batch docstring formatting API.
+
+Run with `python -m benchmarks.bench_format_docstrings`. Compares constructing a
+`GoogleFormatter` for each docstring with `format_docstrings`, in the current process
+and with a pool of worker processes, in docstrings per second.
+"""
+
+import os
+import time
+
+from benchmarks.corpus import generate_module
+from docmat.api import format_docstrings
+from docmat.docstring_formats.google import GoogleFormatter
+from docmat.file import SourceHandler
+
+N_DOCSTRINGS = 20_000
+
+
+def generate_docstrings(n_docstrings):
+    handler = SourceHandler(generate_module(n_docstrings - 1))
+    return [lines for _, lines in handler.iter_doc()]
+
+
+def throughput(function, docstrings):
+    start = time.perf_counter()
+    for _ in function(docstrings):
+        pass
+    return len(docstrings) / (time.perf_counter() - start)
+
+
+def one_formatter_per_docstring(docstrings):
+    for lines in docstrings:
+        yield GoogleFormatter(lines).get_formatted_docstring()
+
+
+def main():
+    docstrings = generate_docstrings(N_DOCSTRINGS)
+    jobs = os.cpu_count() or 1
+    runs = [
+        ("GoogleFormatter loop", one_formatter_per_docstring),
+        ("format_docstrings", format_docstrings),
+        (
+            f"format_docstrings (jobs={jobs})",
+            lambda docstrings: format_docstrings(docstrings, jobs=jobs),
+        ),
+    ]
+    print(f"{'method':<32} {'docstrings/s':>12}")
+    for name, function in runs:
+        print(f"{name:<32} {throughput(function, docstrings):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Import time of the docmat modules and startup time of the CLI.
+
+Run with `python -m benchmarks.bench_import_time`. Import times are the cumulative
+times reported by `python -X importtime`, the CLI time is the wall time of formatting a
+single file, including the interpreter startup.
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import generate_module
+
+MODULES = ("docmat", "docmat.__main__", "docmat.api", "docmat.daemon")
+REPEAT = 11
+
+
+def import_time(module: str) -> float:
+    """Measure the cumulative import time of a module in a fresh interpreter.
+
+    Args:
+        module (str): name of the module.
+
+    Returns:
+        float: import time, in seconds.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in process.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1e6
+    raise RuntimeError(f"{module} not found in the output of -X importtime")
+
+
+def wall_time(command):
+    start = time.perf_counter()
+    subprocess.run(command, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'import':<20} {'median (ms)':>12} {'min (ms)':>9}")
+    for module in MODULES:
+        timings = [import_time(module) for _ in range(REPEAT)]
+        print(
+            f"{module:<20} {statistics.median(timings) * 1e3:>12.1f} "
+            f"{min(timings) * 1e3:>9.1f}"
+        )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "module.py"
+        path.write_text(generate_module(1))
+        commands = {
+            "python -c pass": [sys.executable, "-c", "pass"],
+            "docmat (no cache)": [sys.executable, "-m", "docmat", str(path)]
+            + ["--check", "--no-cache", "--cache-dir", tmp],
+            "docmat (cached)": [sys.executable, "-m", "docmat", str(path)]
+            + ["--cache-dir", tmp],
+        }
+        print(f"\n{'command':<20} {'median (ms)':>12} {'min (ms)':>9}")
+        for name, command in commands.items():
+            timings = [wall_time(command) for _ in range(REPEAT)]
+            print(
+                f"{name:<20} {statistics.median(timings) * 1e3:>12.1f} "
+                f"{min(timings) * 1e3:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Docstring extraction of `FileHandler.iter_doc` against a full `ast.walk`.
+
+Run with `python -m benchmarks.bench_iter_doc`.
+"""
+
+import ast
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import generate_module
+from docmat.file import FileHandler
+
+N_FUNCTIONS = (100, 1_000, 10_000)
+REPEAT = 5
+
+
+def iter_doc_ast_walk(file_content):
+    """Reference implementation walking every node of the tree."""
+    file_lines = file_content.split("\n")
+    for element in ast.walk(ast.parse(file_content)):
+        if type(element) in (
+            ast.AsyncFunctionDef,
+            ast.FunctionDef,
+            ast.ClassDef,
+            ast.Module,
+        ):
+            if docstring_text := ast.get_docstring(element):
+                start = element.body[0].lineno - 1
+                end = start + len(docstring_text.split("\n"))
+                if file_lines[end - 1].strip()[-3:] in ('"""', "'''"):
+                    yield start, file_lines[start:end]
+                else:
+                    yield start, file_lines[start : end + 1]
+
+
+def best_of(function):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "module.py"
+        print(f"{'functions':>10} {'ast.walk':>10} {'iter_doc':>10} {'speedup':>8}")
+        for n_functions in N_FUNCTIONS:
+            content = generate_module(n_functions)
+            path.write_text(content)
+            handler = FileHandler(str(path))
+            assert sorted(handler.iter_doc()) == sorted(iter_doc_ast_walk(content))
+            reference = best_of(lambda: list(iter_doc_ast_walk(content)))
+            current = best_of(lambda: list(handler.iter_doc()))
+            print(
+                f"{n_functions:>10} {reference:>10.4f} {current:>10.4f} "
+                f"{reference / current:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
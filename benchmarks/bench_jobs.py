@@ -0,0 +1,33 @@
+"""Files/sec scaling of `docmat --jobs`.
+
+Run with `python -m benchmarks.bench_jobs`.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import generate_tree
+from docmat.__main__ import process_files
+
+N_FILES = 400
+N_FUNCTIONS = 50
+JOBS = (1, 2, 4, 8)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{N_FILES} files, {N_FUNCTIONS} docstrings per file")
+        print(f"{'jobs':>6} {'seconds':>10} {'files/sec':>10}")
+        for jobs in JOBS:
+            # regenerate the tree so that every run formats unformatted files
+            paths = generate_tree(Path(tmp), N_FILES, N_FUNCTIONS)
+            start = time.perf_counter()
+            results = list(process_files(paths, 88, False, jobs))
+            elapsed = time.perf_counter() - start
+            assert not any(result.error for result in results)
+            print(f"{jobs:>6} {elapsed:>10.3f} {N_FILES / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
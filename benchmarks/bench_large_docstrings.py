@@ -0,0 +1,55 @@
+"""Parsing time of `GoogleFormatter` on docstrings with thousands of lines.
+
+Run with `python -m benchmarks.bench_large_docstrings`.
+"""
+
+import time
+
+from docmat.docstring_formats.google import GoogleFormatter
+
+N_LINES = (1_000, 2_000, 4_000, 8_000)
+
+
+def generate_mixed_docstring(n_lines):
+    """Many short paragraphs and sections."""
+    lines = ['    """Summary of a very large docstring.', ""]
+    while len(lines) < n_lines:
+        lines += [
+            "    Paragraph of text",
+            "    spanning two lines.",
+            "",
+            "    Args:",
+            "        arg1 (int): first argument,",
+            "            on two lines.",
+            "        arg2 (str): second argument.",
+            "",
+        ]
+    return lines + ['    """']
+
+
+def generate_single_section_docstring(n_lines):
+    """A single `Args:` section with an entry per line."""
+    lines = ['    """Summary of a very large docstring.', "", "    Args:"]
+    lines += [f"        arg{i} (int): argument {i}." for i in range(n_lines)]
+    return lines + ['    """']
+
+
+def main():
+    print(f"{'shape':>15} {'lines':>8} {'seconds':>10} {'us/line':>10}")
+    for shape, generate_docstring in (
+        ("mixed", generate_mixed_docstring),
+        ("single section", generate_single_section_docstring),
+    ):
+        for n_lines in N_LINES:
+            docstring = generate_docstring(n_lines)
+            start = time.perf_counter()
+            GoogleFormatter(docstring).get_formatted_docstring()
+            elapsed = time.perf_counter() - start
+            print(
+                f"{shape:>15} {n_lines:>8} {elapsed:>10.3f} "
+                f"{elapsed / n_lines * 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
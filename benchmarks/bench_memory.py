@@ -0,0 +1,74 @@
+"""Peak memory of formatting a large generated module, with and without `--low-memory`.
+
+Run with `python -m benchmarks.bench_memory`. Each run formats the file in a fresh
+interpreter, whose peak resident set size is read from `resource.getrusage`, so it
+includes the memory of the interpreter itself, shown on the first line. The modules
+are generated in a subprocess too, as the peak resident set size of a process
+includes the one of its parent when it was forked.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+N_FUNCTIONS = (10_000, 50_000)
+
+CHILD = """
+import resource, sys
+from docmat.__main__ import process_file
+result = process_file(sys.argv[1], 88, False, False, False, low_memory={low_memory})
+assert result.error is None, result.error
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+GENERATE = """
+import sys
+from pathlib import Path
+from benchmarks.corpus import generate_varied_module
+Path(sys.argv[1]).write_text(generate_varied_module(int(sys.argv[2])))
+"""
+
+
+def peak_rss(code, *args):
+    """Run python code in a fresh interpreter and get its peak resident set size.
+
+    Args:
+        code (str): code which prints its peak resident set size, in kilobytes.
+        *args (str): command line arguments of the code.
+
+    Returns:
+        Tuple[float, float]: peak resident set size in megabytes, and wall time in
+            seconds.
+    """
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-c", code, *args], capture_output=True, text=True, check=True
+    )
+    return int(process.stdout) / 1024, time.perf_counter() - start
+
+
+def main():
+    print(f"{'run':<32} {'file (MB)':>10} {'peak RSS (MB)':>14} {'time (s)':>9}")
+    interpreter, _ = peak_rss(
+        "import resource, docmat.api; "
+        "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    )
+    print(f"{'interpreter':<32} {'':>10} {interpreter:>14.1f} {'':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_functions in N_FUNCTIONS:
+            path = Path(tmp) / f"module_{n_functions}.py"
+            subprocess.run(
+                [sys.executable, "-c", GENERATE, str(path), str(n_functions)],
+                check=True,
+            )
+            size = path.stat().st_size / 1024**2
+            for low_memory in (False, True):
+                rss, seconds = peak_rss(CHILD.format(low_memory=low_memory), str(path))
+                name = f"{n_functions} functions" + (" (low memory)" * low_memory)
+                print(f"{name:<32} {size:>10.1f} {rss:>14.1f} {seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Overlap of I/O latency and formatting with `--io-threads`.
+
+Run with `python -m benchmarks.bench_pipeline`. Network filesystems are simulated by
+adding a fixed latency to each read and write of a file, the worker processes inherit
+it as they are forked. Without I/O threads, each worker waits for the reads and writes
+of its files, with I/O threads they overlap with the formatting of other files.
+"""
+
+import tempfile
+import time
+from functools import wraps
+from pathlib import Path
+
+import docmat.file
+from benchmarks.corpus import generate_tree
+from docmat.__main__ import process_files
+
+N_FILES = 200
+N_FUNCTIONS = 20
+LATENCY = 0.005
+RUNS = [(1, 0), (1, 4), (1, 16), (2, 0), (2, 16)]
+
+
+def with_latency(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        time.sleep(LATENCY)
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def main():
+    for name in ("read_source_file", "write_temp_file", "commit_writes"):
+        setattr(docmat.file, name, with_latency(getattr(docmat.file, name)))
+    print(f"{N_FILES} files, {N_FUNCTIONS} docstrings per file")
+    print(f"{LATENCY * 1e3:.0f} ms per read, temporary file write and rename")
+    print(f"{'jobs':>6} {'io threads':>11} {'seconds':>10} {'files/sec':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for jobs, io_threads in RUNS:
+            # regenerate the tree so that every run formats unformatted files
+            paths = generate_tree(Path(tmp), N_FILES, N_FUNCTIONS)
+            start = time.perf_counter()
+            results = list(process_files(paths, 88, False, jobs, io_threads=io_threads))
+            elapsed = time.perf_counter() - start
+            assert not any(result.error for result in results)
+            print(
+                f"{jobs:>6} {io_threads:>11} {elapsed:>10.3f} "
+                f"{N_FILES / elapsed:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
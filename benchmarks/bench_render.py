@@ -0,0 +1,81 @@
+"""Rendering parsed docstrings at several line lengths against reformatting them.
+
+Run with `python -m benchmarks.bench_render`. Each docstring of a mix of Google and
+NumPy docstrings is formatted at several line lengths, either by building a formatter
+for each line length, or by parsing it once with `parse_docstring` and rendering the
+parsed docstring at each line length.
+"""
+
+import random
+import time
+
+from benchmarks.corpus import NUMPY_SECTIONS, SECTIONS, generate_docstring
+from docmat.api import parse_docstring
+from docmat.docstring_formats import get_formatter
+
+N_DOCSTRINGS = 5_000
+LINE_LENGTHS = (60, 72, 88, 100, 120)
+REPEAT = 3
+
+
+def generate_docstrings(n_docstrings, seed=0):
+    rng = random.Random(seed)
+    docstrings = []
+    for i in range(n_docstrings):
+        style = rng.choice(("google", "numpy"))
+        style_sections = NUMPY_SECTIONS if style == "numpy" else SECTIONS
+        sections = [s for s in style_sections if rng.random() < 0.5]
+        docstrings.append(
+            (style, generate_docstring(f"function_{i}", sections, style=style))
+        )
+    return docstrings
+
+
+def best_of(function):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    docstrings = generate_docstrings(N_DOCSTRINGS)
+    parsed = [parse_docstring(lines, style) for style, lines in docstrings]
+    for (style, lines), docstring in zip(docstrings, parsed):
+        for line_length in LINE_LENGTHS:
+            expected = get_formatter(style)(
+                lines, line_length
+            ).get_formatted_docstring()
+            assert docstring.render(line_length) == expected
+
+    def reformat():
+        for style, lines in docstrings:
+            formatter = get_formatter(style)
+            for line_length in LINE_LENGTHS:
+                formatter(lines, line_length).get_formatted_docstring()
+
+    def parse():
+        for style, lines in docstrings:
+            parse_docstring(lines, style)
+
+    def render():
+        for docstring in parsed:
+            for line_length in LINE_LENGTHS:
+                docstring.render(line_length)
+
+    n_renders = N_DOCSTRINGS * len(LINE_LENGTHS)
+    print(f"{N_DOCSTRINGS} docstrings rendered at line lengths {LINE_LENGTHS}")
+    print(f"{'run':<24} {'seconds':>10} {'us/render':>10}")
+    for name, function in [
+        ("full reformat", reformat),
+        ("parse once", parse),
+        ("render only", render),
+    ]:
+        seconds = best_of(function)
+        print(f"{name:<24} {seconds:>10.3f} {seconds / n_renders * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Scaling of `FileHandler.replace_lines` with the number of docstrings in a file.
+
+Run with `python -m benchmarks.bench_replace_lines`. With linear-time edits the time
+per docstring stays flat as the number of functions grows.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import generate_module
+from docmat.file import FileHandler
+
+N_FUNCTIONS = (1_000, 2_500, 5_000, 10_000)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "module.py"
+        print(f"{'functions':>10} {'seconds':>10} {'us/docstring':>13}")
+        for n_functions in N_FUNCTIONS:
+            path.write_text(generate_module(n_functions))
+            handler = FileHandler(str(path))
+            docstrings = list(handler.iter_doc())
+            start = time.perf_counter()
+            for offset, lines in docstrings:
+                # Every replacement shifts all the following lines
+                handler.replace_lines(lines, lines + [""], offset)
+            handler.formatted_file_content
+            elapsed = time.perf_counter() - start
+            per_docstring = elapsed / len(docstrings) * 1e6
+            print(f"{n_functions:>10} {elapsed:>10.3f} {per_docstring:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
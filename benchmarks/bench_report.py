@@ -0,0 +1,55 @@
+"""Memory used by the JSON report and the run statistics as the number of files grows.
+
+Run with `python -m benchmarks.bench_report`. Results of formatted files are added to a
+`JsonReport` writing to `os.devnull` and to `RunStats`, and the peak memory allocated
+while adding them is measured with `tracemalloc`. It stays flat, as records are written
+as soon as they are added and only the slowest files are kept.
+"""
+
+import os
+import time
+import tracemalloc
+
+from docmat.report import JsonReport
+from docmat.stats import FileStats, RunStats
+
+N_FILES = (1_000, 10_000, 100_000)
+
+
+def add_results(n_files, report, run_stats):
+    for i in range(n_files):
+        path = f"package_{i // 100}/module_{i}.py"
+        stats = FileStats(
+            {"read": 1e-4, "format": i % 97 * 1e-5}, 5, 4096, 3, 2, 1, 4100
+        )
+        run_stats.add(path, True, False, stats)
+        report.add(path, True, None, stats)
+
+
+def measure(n_files, trace):
+    with open(os.devnull, "w") as devnull:
+        report, run_stats = JsonReport(devnull), RunStats()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        add_results(n_files, report, run_stats)
+        report.summary(time.perf_counter() - start)
+        seconds = time.perf_counter() - start
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+        return seconds
+
+
+def main():
+    print(f"{'files':>8} {'peak (KiB)':>11} {'us/file':>8}")
+    for n_files in N_FILES:
+        # Timed without tracemalloc, which slows allocations down
+        seconds = measure(n_files, trace=False)
+        peak = measure(n_files, trace=True)
+        print(f"{n_files:>8} {peak / 1024:>11.1f} {seconds / n_files * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Overhead of detecting the style of each docstring with `style="auto"`.
+
+Run with `python -m benchmarks.bench_style_detection`. A mix of Google and NumPy
+docstrings is formatted with the formatter of their style passed explicitly, and with
+the style detected from their section headers. The docstring cache is bypassed, so that
+every docstring is detected and formatted.
+"""
+
+import random
+import time
+
+from benchmarks.corpus import NUMPY_SECTIONS, SECTIONS, generate_docstring
+from docmat.api import _format_docstring_cached
+from docmat.docstring_formats import detect_style
+
+N_DOCSTRINGS = 20_000
+REPEAT = 5
+
+
+def generate_docstrings(n_docstrings, seed=0):
+    rng = random.Random(seed)
+    docstrings = []
+    for i in range(n_docstrings):
+        style = rng.choice(("google", "numpy"))
+        style_sections = NUMPY_SECTIONS if style == "numpy" else SECTIONS
+        sections = [s for s in style_sections if rng.random() < 0.5]
+        docstring = generate_docstring(f"function_{i}", sections, style=style)
+        docstrings.append((style, tuple(docstring)))
+    return docstrings
+
+
+def best_of(function, docstrings):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function(docstrings)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def format_explicit(docstrings):
+    for style, lines in docstrings:
+        _format_docstring_cached.__wrapped__(lines, 88, False, style)
+
+
+def format_auto(docstrings):
+    for _, lines in docstrings:
+        _format_docstring_cached.__wrapped__(lines, 88, False, "auto")
+
+
+def detect_only(docstrings):
+    for _, lines in docstrings:
+        detect_style(lines)
+
+
+def main():
+    docstrings = generate_docstrings(N_DOCSTRINGS)
+    n_wrong = sum(
+        detect_style(lines) not in (style, None) for style, lines in docstrings
+    )
+    assert n_wrong == 0, f"{n_wrong} docstrings detected with the wrong style"
+    explicit = best_of(format_explicit, docstrings)
+    auto = best_of(format_auto, docstrings)
+    detection = best_of(detect_only, docstrings)
+    print(f"{N_DOCSTRINGS} docstrings, half Google and half NumPy")
+    print(f"{'run':<20} {'seconds':>10} {'us/docstring':>13}")
+    for name, seconds in [
+        ("explicit style", explicit),
+        ("auto style", auto),
+        ("detection only", detection),
+    ]:
+        print(f"{name:<20} {seconds:>10.3f} {seconds / N_DOCSTRINGS * 1e6:>13.2f}")
+    print(f"\ndetection overhead: {detection / explicit:.1%} of the formatting time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Greedy text wrapper against `textwrap.TextWrapper`.
+
+Run with `python -m benchmarks.bench_wrap`. The texts wrapped by docmat are collected
+from the parsed docstrings of the varied corpus, then wrapped with both wrappers, which
+must give the same lines. The docstrings are also formatted end to end with each
+wrapper, selected with the `DOCMAT_WRAPPER` environment variable.
+"""
+
+import os
+import time
+from textwrap import TextWrapper
+
+from benchmarks.corpus import generate_varied_module
+from docmat.api import _format_docstring_cached, parse_docstring
+from docmat.docstring_formats.shared.string_utils import (
+    WRAPPER_ENV_VAR,
+    get_text_wrapper,
+)
+from docmat.docstring_formats.shared.wrapping import GreedyWrapper
+from docmat.file import SourceHandler
+
+N_DOCSTRINGS = 5_000
+WIDTH = 80
+REPEAT = 5
+
+
+def collect_texts(docstrings):
+    texts = []
+    for lines in docstrings:
+        docstring = parse_docstring(lines)
+        texts.append(docstring.summary.text)
+        for section in docstring.sections:
+            texts.extend(getattr(section, "texts", ()))
+            if hasattr(section, "text"):
+                texts.append(section.text)
+    return texts
+
+
+def best_of(function):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    handler = SourceHandler(generate_varied_module(N_DOCSTRINGS))
+    docstrings = [tuple(lines) for _, lines in handler.iter_doc()]
+    texts = collect_texts(docstrings)
+    text_wrapper = TextWrapper(WIDTH, initial_indent="    ", subsequent_indent=" " * 8)
+    greedy_wrapper = GreedyWrapper(WIDTH, "    ", " " * 8)
+    assert [greedy_wrapper.wrap(t) for t in texts] == [
+        text_wrapper.wrap(t) for t in texts
+    ]
+    n_fallbacks = sum(
+        "-" in t or t.split(" ") != t.split() or max(map(len, t.split(" "))) > WIDTH - 8
+        for t in texts
+    )
+    print(f"{len(texts)} texts from {len(docstrings)} docstrings")
+    print(f"{'run':<28} {'seconds':>10} {'us/item':>10}")
+    for name, wrapper in [
+        ("TextWrapper.wrap", text_wrapper),
+        ("GreedyWrapper.wrap", greedy_wrapper),
+    ]:
+        seconds = best_of(lambda: [wrapper.wrap(text) for text in texts])
+        print(f"{name:<28} {seconds:>10.3f} {seconds / len(texts) * 1e6:>10.2f}")
+    for name in ("textwrap", "greedy"):
+        os.environ[WRAPPER_ENV_VAR] = name
+        get_text_wrapper.cache_clear()
+        seconds = best_of(
+            lambda: [
+                _format_docstring_cached.__wrapped__(lines, 88, False, "auto")
+                for lines in docstrings
+            ]
+        )
+        label = f"format_docstring ({name})"
+        print(f"{label:<28} {seconds:>10.3f} {seconds / len(docstrings) * 1e6:>10.2f}")
+    print(f"\n{n_fallbacks / len(texts):.1%} of the texts fall back to TextWrapper")
+
+
+if __name__ == "__main__":
+    main()
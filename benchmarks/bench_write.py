@@ -0,0 +1,55 @@
+"""Time spent writing formatted files with each `--fsync` mode.
+
+Run with `python -m benchmarks.bench_write`. The files are formatted beforehand, only
+their writes are timed. The difference between the modes depends on the filesystem:
+it is negligible on tmpfs, and largest on network filesystems where each `fsync` is a
+round trip to the server.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import generate_tree
+from docmat.api import format_file
+from docmat.file import FileHandler, commit_writes
+
+N_FILES = 400
+N_FUNCTIONS = 20
+
+
+def write_each(handlers, fsync):
+    for handler in handlers:
+        handler.write_formatted_file(fsync)
+
+
+def write_batch(handlers):
+    errors = commit_writes([handler.write_temp_file() for handler in handlers])
+    assert not errors
+
+
+def main():
+    # The temporary directory is on the filesystem to benchmark
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    modes = {
+        "never": lambda handlers: write_each(handlers, fsync=False),
+        "file": lambda handlers: write_each(handlers, fsync=True),
+        "batch": write_batch,
+    }
+    print(f"{N_FILES} files, {N_FUNCTIONS} docstrings per file")
+    print(f"{'fsync':>6} {'seconds':>10} {'files/sec':>10}")
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        for mode, write in modes.items():
+            paths = generate_tree(Path(tmp), N_FILES, N_FUNCTIONS)
+            handlers = [FileHandler(path) for path in paths]
+            for handler in handlers:
+                format_file(handler, 88, False)
+            start = time.perf_counter()
+            write(handlers)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:>6} {elapsed:>10.3f} {N_FILES / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
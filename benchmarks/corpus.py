@@ -0,0 +1,184 @@
+"""Synthetic python sources used by the benchmarks."""
+
+import random
+from pathlib import Path
+from typing import List
+
+FUNCTION_TEMPLATE = '''
+
+def function_{index}(arg1, arg2):
+    """summary of function {index}
+    The length of this description exceeds the maximum line length, hence it needs to be wrapped by the formatter.
+    args:
+    arg1(int): first argument.
+    arg2(str): second argument, whose description is long enough to be wrapped on a new line.
+    """
+    return arg1, arg2
+'''  # noqa: E501
+
+
+def generate_module(n_functions: int) -> str:
+    """Generate the source code of a module with a docstring for each function.
+
+    Args:
+        n_functions (int): number of functions in the module.
+
+    Returns:
+        str: source code of the module.
+    """
+    header = '"""module docstring"""\n'
+    return header + "".join(
+        FUNCTION_TEMPLATE.format(index=i) for i in range(n_functions)
+    )
+
+
+def generate_tree(root: Path, n_files: int, n_functions: int) -> List[str]:
+    """Write a flat tree of generated modules.
+
+    Args:
+        root (Path): directory where the modules are written.
+        n_files (int): number of modules to write.
+        n_functions (int): number of functions of each module.
+
+    Returns:
+        List[str]: paths of the written modules.
+    """
+    source = generate_module(n_functions)
+    paths = []
+    for i in range(n_files):
+        path = root / f"module_{i}.py"
+        path.write_text(source)
+        paths.append(str(path))
+    return paths
+
+
+SUMMARIES = (
+    "compute the value of the {name}",
+    "Return the {name} of the given arguments.",
+    "helper for {name}",
+    "{name} builder, whose summary is long enough to exceed the maximum line length "
+    "when indented",
+)
+
+SECTIONS = {
+    "description": [
+        "The length of this description exceeds the maximum line length, hence it "
+        "needs to be wrapped by the formatter.",
+        "short description",
+    ],
+    "args": [
+        "args:",
+        "    arg1(int): first argument.",
+        "    arg2 (str): second argument, whose description is long enough to be "
+        "wrapped on a new line.",
+    ],
+    "returns": ["Returns:", "    int: the result"],
+    "raises": ["raises:", "    ValueError: if the arguments are not valid."],
+    "example": ["Example:", "    >>> {name}(1, 'a')", "    (1, 'a')"],
+    "note": ["Note:", "    a note which", "    spans two lines"],
+}
+
+NUMPY_SECTIONS = {
+    "description": SECTIONS["description"],
+    "parameters": [
+        "parameters",
+        "----------",
+        "arg1 :int",
+        "    first argument.",
+        "arg2 : str, optional",
+        "    second argument, whose description is long enough to be wrapped on a new "
+        "line.",
+    ],
+    "returns": ["Returns", "-------", "int", "    the result"],
+    "raises": ["Raises", "---", "ValueError", "    if the arguments are not valid."],
+    "examples": ["Examples", "--------", ">>> {name}(1, 'a')", "(1, 'a')"],
+}
+
+
+def generate_docstring(
+    name: str, sections: List[str], indentation: str = "    ", style: str = "google"
+) -> List[str]:
+    """Generate the lines of an unformatted docstring.
+
+    Args:
+        name (str): name of the documented object, used in the summary.
+        sections (List[str]): keys of `SECTIONS`, or of `NUMPY_SECTIONS` for NumPy
+            style, to add after the summary.
+        indentation (str): indentation of the docstring. Defaults to four spaces.
+        style (str): "google" or "numpy". Defaults to "google".
+
+    Returns:
+        List[str]: docstring lines.
+    """
+    style_sections = NUMPY_SECTIONS if style == "numpy" else SECTIONS
+    summary = SUMMARIES[len(name) % len(SUMMARIES)].format(name=name)
+    lines = ['"""' + summary]
+    if sections:
+        lines.append("")
+    for section in sections:
+        lines += [line.format(name=name) for line in style_sections[section]]
+    lines.append('"""')
+    return [indentation + line if line else line for line in lines]
+
+
+def generate_varied_module(
+    n_functions: int, docstring_density: float = 1.0, seed: int = 0
+) -> str:
+    """Generate the source code of a module with a random mix of docstrings.
+
+    Every tenth function is followed by a class with methods. Each function is
+    documented with probability `docstring_density`, its docstring has a random subset
+    of `SECTIONS`.
+
+    Args:
+        n_functions (int): number of functions in the module.
+        docstring_density (float): fraction of documented functions. Defaults to 1.
+        seed (int): seed of the random generator. Defaults to 0.
+
+    Returns:
+        str: source code of the module.
+    """
+    rng = random.Random(seed)
+    chunks = ['"""module docstring"""\n']
+    for i in range(n_functions):
+        indentation = "        "
+        if i % 10 == 0:
+            indentation = "    "
+            chunks.append(f"\n\ndef function_{i}(arg1, arg2):\n")
+        elif i % 10 == 1:
+            chunks.append(f"\n\nclass Class{i}:\n")
+            chunks.extend(
+                line + "\n" for line in generate_docstring(f"Class{i}", [], "    ")
+            )
+        if i % 10:
+            chunks.append(f"\n    def method_{i}(self, arg1, arg2):\n")
+        if rng.random() < docstring_density:
+            sections = [s for s in SECTIONS if rng.random() < 0.5]
+            docstring = generate_docstring(f"function_{i}", sections, indentation)
+            chunks.extend(line + "\n" for line in docstring)
+        chunks.append(f"{indentation}return arg1, arg2\n")
+    return "".join(chunks)
+
+
+def generate_varied_tree(root: Path, n_files: int, seed: int = 0) -> List[str]:
+    """Write a tree of modules of varied size and docstring density.
+
+    Args:
+        root (Path): directory where the modules are written, in nested packages.
+        n_files (int): number of modules to write.
+        seed (int): seed of the random generator. Defaults to 0.
+
+    Returns:
+        List[str]: paths of the written modules.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for i in range(n_files):
+        directory = root / f"package_{i % 4}" / f"subpackage_{i % 3}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"module_{i}.py"
+        n_functions = rng.choice((5, 20, 50, 200))
+        density = rng.choice((0.2, 0.6, 1.0))
+        path.write_text(generate_varied_module(n_functions, density, seed + i))
+        paths.append(str(path))
+    return paths
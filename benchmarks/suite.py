@@ -0,0 +1,190 @@
+"""Benchmark suite with stored baselines, to catch performance regressions.
+
+Run the suite and store its results with
+`python -m benchmarks.suite run --output results.json`, then compare them with the
+stored baseline with `python -m benchmarks.suite compare benchmarks/baseline.json
+results.json`. When the results are omitted, `compare` runs the suite first. The
+comparison exits with status 1 if any benchmark is slower than its baseline by more
+than `--threshold`.
+
+Timings depend on the machine, so the baseline should be refreshed with
+`python -m benchmarks.suite run --output benchmarks/baseline.json` on the machine
+running the comparison, e.g. before applying the changes under test.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import generate_varied_module, generate_varied_tree
+from docmat import __version__
+from docmat.api import format_docstring
+from docmat.docstring_formats.google import GoogleFormatter
+from docmat.file import SourceHandler
+
+DEFAULT_THRESHOLD = 0.25
+
+
+def bench_iter_doc(tmp: Path, n_functions: int, density: float) -> Callable:
+    handler = SourceHandler(generate_varied_module(n_functions, density))
+    return lambda: list(handler.iter_doc())
+
+
+def bench_replace_lines(tmp: Path, n_functions: int) -> Callable:
+    source = generate_varied_module(n_functions)
+    docstrings = [
+        (offset, lines, format_docstring(lines))
+        for offset, lines in SourceHandler(source).iter_doc()
+    ]
+
+    def replace_lines():
+        handler = SourceHandler(source)
+        for offset, lines, formatted_lines in docstrings:
+            handler.replace_lines(lines, formatted_lines, offset)
+        return handler.formatted_file_content
+
+    return replace_lines
+
+
+def bench_google_formatter(tmp: Path, n_functions: int) -> Callable:
+    handler = SourceHandler(generate_varied_module(n_functions))
+    docstrings = [lines for _, lines in handler.iter_doc()]
+    return lambda: [
+        GoogleFormatter(lines).get_formatted_docstring() for lines in docstrings
+    ]
+
+
+def bench_cli(tmp: Path, n_files: int) -> Callable:
+    root = tmp / f"cli_{n_files}"
+    generate_varied_tree(root, n_files)
+    command = [sys.executable, "-m", "docmat", str(root), "--check", "--no-cache"]
+    return lambda: subprocess.run(command + ["--jobs", "1"], capture_output=True)
+
+
+BENCHMARKS = {
+    "iter_doc[20]": partial(bench_iter_doc, n_functions=20, density=1.0),
+    "iter_doc[2000]": partial(bench_iter_doc, n_functions=2000, density=1.0),
+    "iter_doc[2000,sparse]": partial(bench_iter_doc, n_functions=2000, density=0.2),
+    "replace_lines[20]": partial(bench_replace_lines, n_functions=20),
+    "replace_lines[2000]": partial(bench_replace_lines, n_functions=2000),
+    "google_formatter[20]": partial(bench_google_formatter, n_functions=20),
+    "google_formatter[500]": partial(bench_google_formatter, n_functions=500),
+    "cli[1]": partial(bench_cli, n_files=1),
+    "cli[40]": partial(bench_cli, n_files=40),
+}
+
+
+def time_benchmark(function: Callable, repeat: int) -> float:
+    """Time a benchmark, keeping the best of several runs to reduce the noise.
+
+    Args:
+        function (Callable): benchmark to time.
+        repeat (int): number of runs.
+
+    Returns:
+        float: seconds per call of the fastest run.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_suite(pattern: str = "", repeat: int = 5) -> Dict[str, float]:
+    """Run the benchmarks whose name contains a pattern.
+
+    Args:
+        pattern (str): substring of the names of the benchmarks to run. Defaults to
+            "", which runs all the benchmarks.
+        repeat (int): number of runs of each benchmark. Defaults to 5.
+
+    Returns:
+        Dict[str, float]: seconds per call of each benchmark.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, setup in BENCHMARKS.items():
+            if pattern in name:
+                results[name] = time_benchmark(setup(Path(tmp)), repeat)
+                print(f"{name:<28} {results[name] * 1e3:>12.3f} ms", file=sys.stderr)
+    return results
+
+
+def compare(
+    baseline: Dict[str, float],
+    current: Dict[str, float],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> bool:
+    """Compare the results of the suite with a baseline and print a table.
+
+    Args:
+        baseline (Dict[str, float]): seconds per call of each baseline benchmark.
+        current (Dict[str, float]): seconds per call of each current benchmark.
+        threshold (float): maximum relative slowdown before a benchmark is considered
+            a regression. Defaults to `DEFAULT_THRESHOLD`.
+
+    Returns:
+        bool: whether no benchmark regressed.
+    """
+    ok = True
+    print(f"{'benchmark':<28} {'baseline (ms)':>14} {'current (ms)':>13} {'change':>8}")
+    for name in sorted(baseline.keys() & current.keys()):
+        change = current[name] / baseline[name] - 1
+        regressed = change > threshold
+        ok = ok and not regressed
+        print(
+            f"{name:<28} {baseline[name] * 1e3:>14.3f} {current[name] * 1e3:>13.3f} "
+            f"{change:>+8.1%}{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def load_results(path: Path) -> Dict[str, float]:
+    return json.loads(path.read_text())["results"]
+
+
+def save_results(path: Path, results: Dict[str, float]):
+    metadata = {
+        "docmat": __version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    content = {"metadata": metadata, "results": results}
+    path.write_text(json.dumps(content, indent=2, sort_keys=True) + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the suite")
+    run_parser.add_argument("--output", type=Path, help="where to save the results")
+    compare_parser = subparsers.add_parser("compare", help="compare with a baseline")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path, nargs="?")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    for subparser in (run_parser, compare_parser):
+        subparser.add_argument("-k", dest="pattern", default="", help="name filter")
+        subparser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(args.pattern, args.repeat)
+        if args.output is not None:
+            save_results(args.output, results)
+        return 0
+    baseline = load_results(args.baseline)
+    if args.current is not None:
+        current = load_results(args.current)
+    else:
+        current = run_suite(args.pattern, args.repeat)
+    return 0 if compare(baseline, current, args.threshold) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
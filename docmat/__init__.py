@@ -0,0 +1,17 @@
+__version__ = "0.1.0-alpha.1"
+
+_API = ("format_docstring", "format_docstrings", "format_source", "parse_docstring")
+
+
+def __getattr__(name):
+    # The formatting API is imported on first access, so that importing docmat, e.g.
+    # for its version, doesn't import the formatter
+    if name in _API:
+        from docmat import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_API))
@@ -1,11 +1,94 @@
 import argparse
-import fnmatch
-import glob
 import os
+import re
+import sys
+import time
+from collections import namedtuple
+from functools import partial
 from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    TextIO,
+)
 
-from docmat.docstring_formats.google import GoogleFormatter
-from docmat.file import FileHandler
+from docmat.discovery import DEFAULT_EXCLUDES, iter_files
+from docmat.line_ranges import LineRange, parse_line_ranges, parse_unified_diff
+from docmat.stats import FileStats, PhaseTimer, RunStats
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from docmat.file import PendingWrite
+
+FileResult = namedtuple(
+    "FileResult",
+    [
+        "path",
+        "changed",
+        "error",
+        "cache_entry",
+        "diff",
+        "stats",
+        "pending_write",
+        # Time spent on a file which could not be formatted, which has no stats
+        "duration",
+    ],
+    defaults=[None, None, None, None, None],
+)
+
+# Outcome of the formatting of the content of a file, `content` is None if it did not
+# change
+FormattedContent = namedtuple(
+    "FormattedContent",
+    [
+        "content",
+        "docstrings",
+        "docstrings_changed",
+        "diff",
+        "timings",
+        "docstring_cache_hits",
+        "docstring_cache_misses",
+    ],
+)
+
+# File read by `read_file`, its formatted content is written with the same encoding
+SourceFile = namedtuple("SourceFile", ["content", "encoding", "bytes"])
+
+FSYNC_MODES = ("file", "batch", "never")
+
+WRAPPERS = ("greedy", "textwrap")
+
+REPORT_FORMATS = ("json",)
+
+
+def __getattr__(name):
+    # format_file used to be imported here, it's still importable from this module
+    if name == "format_file":
+        from docmat.api import format_file
+
+        return format_file
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def compile_regex(value: str) -> Pattern:
+    """Compile a regular expression passed from CLI.
+
+    Args:
+        value (str): regular expression.
+
+    Returns:
+        Pattern: compiled regular expression.
+    """
+    try:
+        return re.compile(value)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"invalid regular expression: {e}")
 
 
 def parse_args() -> argparse.Namespace:
@@ -21,7 +104,7 @@ def parse_args() -> argparse.Namespace:
         "files",
         type=str,
         nargs="+",
-        help="File(s) to format",
+        help="File(s) to format. Use - to read from stdin and write to stdout",
     )
 
     parser.add_argument(
@@ -41,40 +124,966 @@ def parse_args() -> argparse.Namespace:
         "length",
     )
 
+    parser.add_argument(
+        "--style",
+        dest="style",
+        default="auto",
+        help="Style of the docstrings, e.g. google or numpy. Defaults to auto, which "
+        "detects the style of each docstring from its section headers, and formats "
+        "docstrings without sections as google",
+    )
+
+    parser.add_argument(
+        "--wrapper",
+        dest="wrapper",
+        choices=WRAPPERS,
+        default=None,
+        help="Text wrapper used to wrap the docstrings, which produce the same output. "
+        "'greedy' is faster and falls back to 'textwrap', Python's TextWrapper, for "
+        "text it can't wrap itself. Defaults to the DOCMAT_WRAPPER environment "
+        "variable, or to 'greedy'",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes used to format files. Defaults to the number "
+        "of CPUs",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        default=True,
+        help="Format all files, including the ones known to be already formatted",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        type=Path,
+        default=None,
+        help="Directory where the cache of formatted files is stored. Defaults to "
+        "$DOCMAT_CACHE_DIR or ~/.cache/docmat",
+    )
+
+    parser.add_argument(
+        "--check",
+        dest="check",
+        action="store_true",
+        default=False,
+        help="Don't write the files back, just return status code 1 if any file "
+        "would be reformatted",
+    )
+
+    parser.add_argument(
+        "--diff",
+        dest="diff",
+        action="store_true",
+        default=False,
+        help="Don't write the files back, just print a diff for each file to stdout",
+    )
+
+    parser.add_argument(
+        "--exclude",
+        dest="exclude",
+        type=compile_regex,
+        default=compile_regex(DEFAULT_EXCLUDES),
+        help="Regular expression of the files and directories to skip when walking "
+        "directories, matched against their path relative to the walked directory, "
+        "e.g. /build/. Replaces the default, which skips virtual environments, build "
+        "directories and VCS metadata",
+    )
+
+    parser.add_argument(
+        "--extend-exclude",
+        dest="extend_exclude",
+        type=compile_regex,
+        default=None,
+        help="Like --exclude, but adds to the excluded paths instead of replacing them",
+    )
+
+    parser.add_argument(
+        "--no-gitignore",
+        dest="gitignore",
+        action="store_false",
+        default=True,
+        help="Don't skip the files and directories ignored by .gitignore files when "
+        "walking directories",
+    )
+
+    parser.add_argument(
+        "--low-memory",
+        dest="low_memory",
+        action="store_true",
+        default=False,
+        help="Stream each file instead of loading it in memory, formatting docstrings "
+        "as they are found. Useful for very large generated files. Can't be used with "
+        "--diff or -",
+    )
+
+    parser.add_argument(
+        "--io-threads",
+        dest="io_threads",
+        type=int,
+        default=0,
+        help="Read and write files on this number of threads, while the worker "
+        "processes format them, in order to hide the I/O latency, e.g. on network "
+        "filesystems. Defaults to 0, where worker processes read and write their "
+        "files. Can't be used with --low-memory",
+    )
+
+    parser.add_argument(
+        "--fsync",
+        dest="fsync",
+        choices=FSYNC_MODES,
+        default="file",
+        help="When to flush formatted files to disk. Files are always replaced "
+        "atomically, 'file' flushes each file before replacing it, 'batch' replaces "
+        "all the files at the end of the run after flushing them, which is faster on "
+        "network filesystems, and 'never' leaves it to the OS. Defaults to 'file'",
+    )
+
+    line_ranges_group = parser.add_mutually_exclusive_group()
+
+    line_ranges_group.add_argument(
+        "--line-ranges",
+        dest="line_ranges",
+        type=str,
+        default=None,
+        help="Only format the docstrings overlapping with these line ranges, e.g. "
+        "10-40,100-120. Can only be used with a single file",
+    )
+
+    line_ranges_group.add_argument(
+        "--changed-lines",
+        dest="changed_lines",
+        type=Path,
+        default=None,
+        help="Only format the docstrings overlapping with the lines changed by this "
+        "unified diff file, e.g. the output of `git diff -U0 <git-rev>`",
+    )
+
+    parser.add_argument(
+        "--stats",
+        dest="stats",
+        action="store_true",
+        default=False,
+        help="Print statistics about the run to stderr: counters, hit rate of the "
+        "cache of formatted docstrings, time spent in each phase and slowest files",
+    )
+
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        type=Path,
+        default=None,
+        help="Dump the cProfile statistics of the run to this file. Files are "
+        "formatted in the main process, regardless of --jobs and --io-threads",
+    )
+
+    parser.add_argument(
+        "--report",
+        dest="report",
+        choices=REPORT_FORMATS,
+        default=None,
+        help="Write a machine readable report of the run: a JSON record per line for "
+        "each file, with its path, the number of docstrings formatted and changed, "
+        "its size before and after formatting, the time spent and the error, if any, "
+        "followed by a summary record. Records are written as files are formatted",
+    )
+
+    parser.add_argument(
+        "--report-file",
+        dest="report_file",
+        type=Path,
+        default=None,
+        help="File where the report is written, opened once the options are "
+        "validated. Defaults to stdout",
+    )
+
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be a positive integer")
+    if "-" in args.files and len(args.files) > 1:
+        parser.error("- can't be used together with other files")
+    if args.low_memory and (args.diff or args.files == ["-"]):
+        parser.error("--low-memory can't be used with --diff or -")
+    if args.style != "auto":
+        # The formatters are imported only when needed, they're slow to import
+        from docmat.docstring_formats import FORMATTERS
+
+        if args.style not in FORMATTERS:
+            parser.error(
+                f"--style must be auto or one of: {', '.join(sorted(FORMATTERS))}"
+            )
+    if args.report_file is not None and args.report is None:
+        parser.error("--report-file can only be used with --report")
+    if args.report is not None and args.files == ["-"]:
+        parser.error("--report can't be used with -")
+    report_to_stdout = args.report_file is None or str(args.report_file) == "-"
+    if args.report is not None and args.diff and report_to_stdout:
+        parser.error("--report can't be written to stdout with --diff")
+    if args.io_threads < 0:
+        parser.error("--io-threads must be a non-negative integer")
+    if args.io_threads and args.low_memory:
+        parser.error("--io-threads can't be used with --low-memory")
+    if args.line_ranges is not None:
+        if len(args.files) > 1 or os.path.isdir(args.files[0]):
+            parser.error("--line-ranges can only be used with a single file")
+        try:
+            args.line_ranges = parse_line_ranges(args.line_ranges)
+        except ValueError as e:
+            parser.error(f"--line-ranges: {e}")
+    if args.changed_lines is not None:
+        try:
+            args.changed_lines = parse_unified_diff(args.changed_lines.read_text())
+        except (OSError, UnicodeDecodeError) as e:
+            parser.error(f"--changed-lines: {e}")
     return args
 
 
-def format_file(handler: FileHandler, line_length: int, wrap_summary: bool):
-    """Format a file using the docstring formatter.
+def format_content(
+    content: str,
+    path: str,
+    line_length: int,
+    wrap_summary: bool,
+    line_ranges: Optional[List[LineRange]] = None,
+    diff: bool = False,
+    style: str = "auto",
+) -> FormattedContent:
+    """Format the content of a file, without any filesystem access.
 
     Args:
-        handler (FileHandler): file handler to be used to iterate over docstring lines
-            and to save the formatted code.
+        content (str): content of the file.
+        path (str): path of the file, used in the diff.
         line_length (int): maximum line length.
         wrap_summary (bool): whether to wrap the summary line.
+        line_ranges (Optional[List[LineRange]]): if given, only the docstrings
+            overlapping with these line ranges are formatted. Defaults to None.
+        diff (bool): whether to compute the diff of the formatted content. Defaults to
+            False.
+        style (str): docstring style, see `docmat.api.format_docstring`. Defaults to
+            "auto".
+
+    Returns:
+        FormattedContent: formatted content and statistics of its formatting.
     """
-    for offset, docstring_lines in handler.iter_doc():
-        docstring_lines_formatted = GoogleFormatter(
-            docstring_lines, line_length=line_length, wrap_summary=wrap_summary
-        ).get_formatted_docstring()
-        handler.replace_lines(docstring_lines, docstring_lines_formatted, offset)
+    from docmat.api import format_file, get_docstring_cache_stats
+    from docmat.file import SourceHandler
 
+    timer = PhaseTimer()
+    docstring_cache_before = get_docstring_cache_stats()
+    handler = SourceHandler(content, str(path))
+    n_docstrings = format_file(
+        handler, line_length, wrap_summary, line_ranges, timer, style
+    )
+    with timer.phase("replace"):
+        formatted = handler.formatted_file_content if handler.changed else None
+    file_diff = None
+    if diff and formatted is not None:
+        with timer.phase("diff"):
+            file_diff = handler.get_diff()
+    docstring_cache_after = get_docstring_cache_stats()
+    return FormattedContent(
+        formatted,
+        n_docstrings,
+        handler.n_changed_replacements,
+        file_diff,
+        dict(timer.timings),
+        docstring_cache_after.hits - docstring_cache_before.hits,
+        docstring_cache_after.misses - docstring_cache_before.misses,
+    )
 
-def main():
-    """Format each file passed from CLI."""
-    args = parse_args()
-    line_length = args.line_length
-    wrap_summary = args.wrap_summary
-    for file_glob in args.files:
-        if os.path.isdir(file_glob):
-            for file in Path(file_glob).rglob("*.py"):
-                handler = FileHandler(str(file))
-                format_file(handler, line_length, wrap_summary)
-                handler.write_formatted_file()
+
+def _error_result(path: str, error: Exception, start_time: float) -> FileResult:
+    return FileResult(
+        path,
+        False,
+        f"{type(error).__name__}: {error}",
+        duration=time.perf_counter() - start_time,
+    )
+
+
+def read_file(path: str, timer: PhaseTimer) -> SourceFile:
+    """Read a file to format, see `docmat.file.read_source_file`.
+
+    Args:
+        path (str): path of the file.
+        timer (PhaseTimer): timer of the file, the read phase is added to it.
+
+    Returns:
+        SourceFile: content, encoding and size of the file.
+    """
+    from docmat.file import read_source_file
+
+    n_bytes = os.path.getsize(path)
+    with timer.phase("read"):
+        content, source_encoding = read_source_file(path)
+    return SourceFile(content, source_encoding, n_bytes)
+
+
+def _finish_file(
+    path: str,
+    changed: bool,
+    pending_write: Optional["PendingWrite"],
+    file_diff: Optional[str],
+    stats: FileStats,
+    timer: PhaseTimer,
+    start_time: float,
+    use_cache: bool,
+    write: bool,
+    fsync: bool,
+    defer_write: bool,
+) -> FileResult:
+    from docmat.cache import get_cache_entry
+    from docmat.file import commit_writes, discard_writes
+
+    try:
+        if pending_write is not None and not defer_write:
+            with timer.phase("write"):
+                errors = commit_writes([pending_write], fsync)
+            pending_write = None
+            if errors:
+                raise errors[path]
+        # Files that would be reformatted but were not written can't be cached
+        cache_entry = None
+        if use_cache and (write or not changed):
+            with timer.phase("cache"):
+                # The temporary file keeps its modification time when it is renamed
+                cache_entry = get_cache_entry(
+                    path if pending_write is None else pending_write.tmp_path
+                )
+    except Exception as e:
+        if pending_write is not None:
+            discard_writes([pending_write])
+        return _error_result(path, e, start_time)
+    stats = stats._replace(timings=dict(timer.timings))
+    return FileResult(path, changed, None, cache_entry, file_diff, stats, pending_write)
+
+
+def write_formatted_file(
+    path: str,
+    source: SourceFile,
+    formatted: FormattedContent,
+    timer: PhaseTimer,
+    start_time: float,
+    use_cache: bool = False,
+    write: bool = True,
+    fsync: bool = True,
+    defer_write: bool = False,
+) -> FileResult:
+    """Write the formatted content of a file, if it changed, and get its outcome.
+
+    Any exception is caught and reported as part of the result.
+
+    Args:
+        path (str): path of the file.
+        source (SourceFile): file as read by `read_file`.
+        formatted (FormattedContent): formatted content of the file.
+        timer (PhaseTimer): timer of the file, the write and cache phases are added
+            to it.
+        start_time (float): `time.perf_counter` when the processing of the file
+            started, used for the duration of the file if it could not be written.
+        use_cache (bool): whether to compute the cache entry of the formatted file.
+            Defaults to False.
+        write (bool): whether to write the formatted file back to disk. Defaults to
+            True.
+        fsync (bool): whether to flush the formatted file to disk before replacing
+            the original file. Defaults to True.
+        defer_write (bool): whether to leave the formatted file in a temporary file,
+            returned as a pending write to be committed by the caller. Defaults to
+            False.
+
+    Returns:
+        FileResult: outcome of the formatting of the file.
+    """
+    from docmat.file import get_encoded_size, write_temp_file
+
+    for phase, seconds in formatted.timings.items():
+        timer.timings[phase] += seconds
+    changed = formatted.content is not None
+    n_bytes_out = source.bytes
+    pending_write = None
+    try:
+        if changed:
+            n_bytes_out = get_encoded_size(formatted.content, source.encoding)
+        if write and changed:
+            with timer.phase("write"):
+                pending_write = write_temp_file(
+                    path, formatted.content, source.encoding
+                )
+    except Exception as e:
+        return _error_result(path, e, start_time)
+    stats = FileStats(
+        timer.timings,
+        formatted.docstrings,
+        source.bytes,
+        formatted.docstring_cache_hits,
+        formatted.docstring_cache_misses,
+        formatted.docstrings_changed,
+        n_bytes_out,
+    )
+    return _finish_file(
+        path,
+        changed,
+        pending_write,
+        formatted.diff,
+        stats,
+        timer,
+        start_time,
+        use_cache,
+        write,
+        fsync,
+        defer_write,
+    )
+
+
+def process_file(
+    path: str,
+    line_length: int,
+    wrap_summary: bool,
+    use_cache: bool = False,
+    write: bool = True,
+    diff: bool = False,
+    line_ranges: Optional[List[LineRange]] = None,
+    low_memory: bool = False,
+    fsync: bool = True,
+    defer_write: bool = False,
+    style: str = "auto",
+) -> FileResult:
+    """Format a single file and write it back to disk if it changed.
+
+    This function is executed in the worker processes, hence any exception is caught
+    and reported back to the parent process as part of the result.
+
+    Args:
+        path (str): path of the file to format.
+        line_length (int): maximum line length.
+        wrap_summary (bool): whether to wrap the summary line.
+        use_cache (bool): whether to compute the cache entry of the formatted file.
+            Defaults to False.
+        write (bool): whether to write the formatted file back to disk. Defaults to
+            True.
+        diff (bool): whether to compute the diff of the formatted file. Defaults to
+            False.
+        line_ranges (Optional[List[LineRange]]): if given, only the docstrings
+            overlapping with these line ranges are formatted. Defaults to None.
+        low_memory (bool): whether to stream the file instead of loading it in
+            memory, in which case the diff can't be computed. Defaults to False.
+        fsync (bool): whether to flush the formatted file to disk before replacing
+            the original file. Defaults to True.
+        defer_write (bool): whether to leave the formatted file in a temporary file,
+            returned as a pending write to be committed by the caller. Defaults to
+            False.
+        style (str): docstring style, see `docmat.api.format_docstring`. Defaults to
+            "auto".
+
+    Returns:
+        FileResult: outcome of the formatting of the file.
+    """
+    start_time = time.perf_counter()
+    timer = PhaseTimer()
+    write_options = dict(
+        use_cache=use_cache, write=write, fsync=fsync, defer_write=defer_write
+    )
+    if not low_memory:
+        try:
+            source = read_file(path, timer)
+            formatted = format_content(
+                source.content,
+                path,
+                line_length,
+                wrap_summary,
+                line_ranges,
+                diff,
+                style,
+            )
+        except Exception as e:
+            return _error_result(path, e, start_time)
+        return write_formatted_file(
+            path, source, formatted, timer, start_time, **write_options
+        )
+
+    # The formatter is imported on first use, runs where every file is skipped by the
+    # cache don't pay for it
+    from docmat.api import get_docstring_cache_stats
+    from docmat.file import discard_writes
+    from docmat.streaming import format_file_streaming
+
+    pending_write = None
+    try:
+        n_bytes = n_bytes_out = os.path.getsize(path)
+        before = get_docstring_cache_stats()
+        with timer.phase("stream"):
+            streamed, pending_write = format_file_streaming(
+                path, line_length, wrap_summary, line_ranges, write, style
+            )
+        n_docstrings, changed, n_docstrings_changed = streamed
+        if changed:
+            n_bytes_out = (
+                None
+                if pending_write is None
+                else os.path.getsize(pending_write.tmp_path)
+            )
+    except Exception as e:
+        if pending_write is not None:
+            discard_writes([pending_write])
+        return _error_result(path, e, start_time)
+    after = get_docstring_cache_stats()
+    stats = FileStats(
+        timer.timings,
+        n_docstrings,
+        n_bytes,
+        after.hits - before.hits,
+        after.misses - before.misses,
+        n_docstrings_changed,
+        n_bytes_out,
+    )
+    return _finish_file(
+        path, changed, pending_write, None, stats, timer, start_time, **write_options
+    )
+
+
+def _process_file_in_line_ranges(
+    path: str, line_ranges: Optional[List[LineRange]], **kwargs
+) -> FileResult:
+    return process_file(path, line_ranges=line_ranges, **kwargs)
+
+
+def process_files(
+    paths: List[str],
+    line_length: int,
+    wrap_summary: bool,
+    jobs: int = 1,
+    use_cache: bool = False,
+    write: bool = True,
+    diff: bool = False,
+    line_ranges: Optional[Dict[str, List[LineRange]]] = None,
+    low_memory: bool = False,
+    fsync: bool = True,
+    defer_write: bool = False,
+    io_threads: int = 0,
+    style: str = "auto",
+) -> Iterator[FileResult]:
+    """Format files, possibly fanning them out to a pool of worker processes.
+
+    Results are yielded in the same order as `paths`, regardless of the order in
+    which the workers complete.
+
+    With I/O threads, the files are processed as a pipeline: a thread reads each file,
+    its content is formatted by a worker and then written by a thread, so that the
+    latency of reads and writes overlaps with the formatting of the other files. The
+    threads never wait for the workers, all of which format files regardless of the
+    number of threads. At most two files per worker or thread are in flight at any
+    time.
+
+    Args:
+        paths (List[str]): paths of the files to format.
+        line_length (int): maximum line length.
+        wrap_summary (bool): whether to wrap the summary line.
+        jobs (int): number of worker processes. Defaults to 1, which formats the files
+            in the current process.
+        use_cache (bool): whether to compute the cache entries of the formatted files.
+            Defaults to False.
+        write (bool): whether to write the formatted files back to disk. Defaults to
+            True.
+        diff (bool): whether to compute the diff of the formatted files. Defaults to
+            False.
+        line_ranges (Optional[Dict[str, List[LineRange]]]): if given, only the
+            docstrings overlapping with the line ranges of each file, keyed by
+            absolute path, are formatted. Defaults to None.
+        low_memory (bool): whether to stream the files instead of loading them in
+            memory. Defaults to False.
+        fsync (bool): whether to flush the formatted files to disk before replacing
+            the original files. Defaults to True.
+        defer_write (bool): whether to leave the formatted files in temporary files,
+            returned as pending writes. Defaults to False.
+        io_threads (int): number of threads reading and writing the files. Defaults
+            to 0, where files are read and written by the workers formatting them.
+            Can't be used with `low_memory`.
+        style (str): docstring style, see `docmat.api.format_docstring`. Defaults to
+            "auto".
+
+    Yields:
+        FileResult: outcome of the formatting of each file.
+    """
+    if line_ranges is None:
+        paths_line_ranges = [None] * len(paths)
+    else:
+        paths_line_ranges = [line_ranges.get(os.path.abspath(p), []) for p in paths]
+    workers = min(jobs, len(paths))
+    if io_threads > 0:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        format_file = partial(
+            format_content,
+            line_length=line_length,
+            wrap_summary=wrap_summary,
+            diff=diff,
+            style=style,
+        )
+        write_file = partial(
+            write_formatted_file,
+            use_cache=use_cache,
+            write=write,
+            fsync=fsync,
+            defer_write=defer_write,
+        )
+        # With a single worker, the files are formatted by a thread so that they are
+        # not sent to another process, and are still formatted one at a time
+        if workers > 1:
+            import multiprocessing
+
+            # The workers are started by the I/O threads, forking them would copy a
+            # multi-threaded process
+            start_method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            format_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(start_method),
+            )
         else:
-            for file in glob.glob(file_glob):
-                if fnmatch.fnmatch(file, "*.py"):
-                    handler = FileHandler(file)
-                    format_file(handler, line_length, wrap_summary)
-                    handler.write_formatted_file()
+            format_executor = ThreadPoolExecutor(max_workers=1)
+        with format_executor:
+            yield from _process_files_pipelined(
+                paths,
+                paths_line_ranges,
+                format_file,
+                write_file,
+                format_executor,
+                max(workers, 1),
+                io_threads,
+            )
+        return
+    process = partial(
+        _process_file_in_line_ranges,
+        line_length=line_length,
+        wrap_summary=wrap_summary,
+        use_cache=use_cache,
+        write=write,
+        diff=diff,
+        low_memory=low_memory,
+        fsync=fsync,
+        defer_write=defer_write,
+        style=style,
+    )
+    if workers <= 1:
+        yield from map(process, paths, paths_line_ranges)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(process, paths, paths_line_ranges, chunksize=chunksize)
+
+
+def _process_files_pipelined(
+    paths: List[str],
+    paths_line_ranges: List[Optional[List[LineRange]]],
+    format_file: Callable[..., FormattedContent],
+    write_file: Callable[..., FileResult],
+    format_executor: "Executor",
+    workers: int,
+    io_threads: int,
+) -> Iterator[FileResult]:
+    from collections import deque
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    def process(path: str, line_ranges: Optional[List[LineRange]]) -> Future:
+        # Each stage is submitted by the callback of the previous one, no thread waits
+        # for another stage to complete
+        result = Future()
+        start_time = time.perf_counter()
+        timer = PhaseTimer()
+
+        def submit(executor, on_done, function, *args, **kwargs):
+            try:
+                executor.submit(function, *args, **kwargs).add_done_callback(on_done)
+            except Exception as e:
+                # e.g. the executors are shut down because the run was interrupted
+                result.set_result(_error_result(path, e, start_time))
+
+        def on_read(read: Future):
+            try:
+                source = read.result()
+            except Exception as e:
+                result.set_result(_error_result(path, e, start_time))
+                return
+            submit(
+                format_executor,
+                partial(on_formatted, source),
+                format_file,
+                source.content,
+                path,
+                line_ranges=line_ranges,
+            )
+
+        def on_formatted(source: SourceFile, formatted: Future):
+            try:
+                formatted_content = formatted.result()
+            except Exception as e:
+                result.set_result(_error_result(path, e, start_time))
+                return
+            submit(
+                io_executor,
+                on_written,
+                write_file,
+                path,
+                source,
+                formatted_content,
+                timer,
+                start_time,
+            )
+
+        def on_written(written: Future):
+            try:
+                result.set_result(written.result())
+            except Exception as e:
+                result.set_result(_error_result(path, e, start_time))
+
+        submit(io_executor, on_read, read_file, path, timer)
+        return result
+
+    max_in_flight = 2 * max(workers, io_threads)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=io_threads) as io_executor:
+        for path, line_ranges in zip(paths, paths_line_ranges):
+            pending.append(process(path, line_ranges))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def format_stdin(
+    line_length: int,
+    wrap_summary: bool,
+    check: bool,
+    diff: bool,
+    line_ranges: Optional[List[LineRange]] = None,
+    style: str = "auto",
+) -> int:
+    """Format source code read from stdin.
+
+    The formatted source code is written to stdout, unless `check` or `diff` is set.
+
+    Args:
+        line_length (int): maximum line length.
+        wrap_summary (bool): whether to wrap the summary line.
+        check (bool): whether to only check if the source code would be reformatted.
+        diff (bool): whether to write the diff of the source code instead.
+        line_ranges (Optional[List[LineRange]]): if given, only the docstrings
+            overlapping with these line ranges are formatted. Defaults to None.
+        style (str): docstring style, see `docmat.api.format_docstring`. Defaults to
+            "auto".
+
+    Returns:
+        int: exit code, 1 if the source code could not be formatted or, with `check`,
+            if it would be reformatted, 0 otherwise.
+    """
+    from docmat.api import format_file
+    from docmat.file import SourceHandler
+
+    try:
+        handler = SourceHandler(sys.stdin.read(), "STDIN")
+        format_file(handler, line_length, wrap_summary, line_ranges, style=style)
+    except Exception as e:
+        print(f"error: cannot format -: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    if diff:
+        sys.stdout.write(handler.get_diff())
+    elif not check:
+        sys.stdout.write(handler.formatted_file_content)
+    return int(check and handler.changed)
+
+
+def main() -> int:
+    """Format each file passed from CLI.
+
+    Returns:
+        int: exit code, 1 if any file could not be formatted or, with `--check`, if
+            any file would be reformatted, 0 otherwise.
+    """
+    args = parse_args()
+    start_time = time.perf_counter()
+    if args.wrapper is not None:
+        from docmat.docstring_formats.shared.string_utils import (
+            WRAPPER_ENV_VAR,
+            get_text_wrapper,
+        )
+
+        # Worker processes inherit the environment of this process
+        os.environ[WRAPPER_ENV_VAR] = args.wrapper
+        get_text_wrapper.cache_clear()
+    if args.files == ["-"]:
+        return format_stdin(
+            args.line_length,
+            args.wrap_summary,
+            args.check,
+            args.diff,
+            args.line_ranges,
+            args.style,
+        )
+    report_file = None
+    if args.report is not None:
+        report_file = sys.stdout
+        if args.report_file is not None and str(args.report_file) != "-":
+            try:
+                report_file = open(args.report_file, "w")
+            except OSError as e:
+                print(f"error: cannot open report file: {e}", file=sys.stderr)
+                return 1
+    try:
+        return _format_files(args, start_time, report_file)
+    finally:
+        if report_file is not None and report_file is not sys.stdout:
+            report_file.close()
+
+
+def _format_files(
+    args: argparse.Namespace, start_time: float, report_file: Optional[TextIO]
+) -> int:
+    paths = list(
+        iter_files(args.files, args.exclude, args.extend_exclude, args.gitignore)
+    )
+    line_ranges = None
+    if args.line_ranges is not None:
+        line_ranges = {os.path.abspath(path): args.line_ranges for path in paths}
+    elif args.changed_lines is not None:
+        line_ranges = args.changed_lines
+    if line_ranges is not None:
+        paths = [path for path in paths if line_ranges.get(os.path.abspath(path))]
+    n_paths = len(paths)
+    cache = None
+    # Files formatted only partially can't be cached
+    if args.use_cache and line_ranges is None:
+        from docmat.cache import Cache, get_cache_dir
+
+        cache = Cache(
+            args.cache_dir or get_cache_dir(),
+            args.line_length,
+            args.wrap_summary,
+            args.style,
+            args.low_memory,
+        )
+        paths = cache.filter_formatted(paths)
+    exit_code = 0
+    run_stats = RunStats()
+    report = None
+    if report_file is not None:
+        from docmat.report import JsonReport
+
+        report = JsonReport(report_file)
+    profiler = None
+    if args.profile is not None:
+        import cProfile
+
+        # Worker processes and I/O threads would be invisible to the profiler
+        profiler = cProfile.Profile()
+        profiler.enable()
+    pending_results = []
+    try:
+        for result in process_files(
+            paths,
+            args.line_length,
+            args.wrap_summary,
+            1 if profiler is not None else args.jobs,
+            cache is not None,
+            write=not (args.check or args.diff),
+            diff=args.diff,
+            line_ranges=line_ranges,
+            low_memory=args.low_memory,
+            fsync=args.fsync == "file",
+            defer_write=args.fsync == "batch",
+            io_threads=0 if profiler is not None else args.io_threads,
+            style=args.style,
+        ):
+            # Files written at the end of the run are counted and reported once
+            # written
+            if result.pending_write is None:
+                run_stats.add(
+                    result.path, result.changed, result.error is not None, result.stats
+                )
+                if report is not None:
+                    report.add(
+                        result.path,
+                        result.changed,
+                        result.error,
+                        result.stats,
+                        result.duration,
+                    )
+            if result.error is not None:
+                print(
+                    f"error: cannot format {result.path}: {result.error}",
+                    file=sys.stderr,
+                )
+                exit_code = 1
+                continue
+            if result.diff:
+                sys.stdout.write(result.diff)
+            if args.check and result.changed:
+                print(f"would reformat {result.path}", file=sys.stderr)
+                exit_code = 1
+            if result.pending_write is not None:
+                # Committed at the end of the run, then cached
+                pending_results.append(result)
+            elif cache is not None and result.cache_entry is not None:
+                cache.update(result.path, result.cache_entry)
+    except BaseException:
+        if pending_results:
+            from docmat.file import discard_writes
+
+            discard_writes(result.pending_write for result in pending_results)
+        raise
+    if pending_results:
+        from docmat.file import commit_writes
+
+        errors = commit_writes(result.pending_write for result in pending_results)
+        for result in pending_results:
+            error = errors.get(result.path)
+            run_stats.add(
+                result.path,
+                result.changed and error is None,
+                error is not None,
+                result.stats,
+            )
+            if report is not None:
+                report.add(
+                    result.path,
+                    result.changed,
+                    None if error is None else f"{type(error).__name__}: {error}",
+                    result.stats,
+                )
+            if error is not None:
+                print(
+                    f"error: cannot write {result.path}: {error}",
+                    file=sys.stderr,
+                )
+                exit_code = 1
+            elif cache is not None and result.cache_entry is not None:
+                cache.update(result.path, result.cache_entry)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+    if cache is not None:
+        try:
+            cache.write()
+        except OSError as e:
+            print(f"warning: cannot write cache: {e}", file=sys.stderr)
+    if args.stats:
+        run_stats.report(time.perf_counter() - start_time)
+    if report is not None:
+        report.summary(time.perf_counter() - start_time, n_paths - len(paths))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
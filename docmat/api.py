@@ -0,0 +1,224 @@
+from collections import deque, namedtuple
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from docmat.docstring_formats import (
+    DEFAULT_STYLE,
+    Docstring,
+    detect_style,
+    get_formatter,
+)
+from docmat.file import SourceHandler
+from docmat.line_ranges import LineRange, overlaps
+from docmat.stats import PhaseTimer
+
+DOCSTRING_CACHE_SIZE = 4096
+
+# Style detecting the style of each docstring
+AUTO_STYLE = "auto"
+
+DocstringCacheStats = namedtuple("DocstringCacheStats", ["hits", "misses"])
+
+
+@lru_cache(maxsize=DOCSTRING_CACHE_SIZE)
+def _format_docstring_cached(
+    docstring_lines: Tuple[str, ...], line_length: int, wrap_summary: bool, style: str
+) -> Tuple[str, ...]:
+    if style == AUTO_STYLE:
+        style = detect_style(docstring_lines) or DEFAULT_STYLE
+    return tuple(
+        get_formatter(style)(
+            list(docstring_lines), line_length=line_length, wrap_summary=wrap_summary
+        ).get_formatted_docstring()
+    )
+
+
+def get_docstring_cache_stats() -> DocstringCacheStats:
+    """Get the statistics of the cache of formatted docstrings of this process.
+
+    Returns:
+        DocstringCacheStats: number of docstrings found in and missing from the cache
+            since the process started.
+    """
+    info = _format_docstring_cached.cache_info()
+    return DocstringCacheStats(info.hits, info.misses)
+
+
+def format_docstring(
+    docstring_lines: List[str],
+    line_length: int = 88,
+    wrap_summary: bool = False,
+    style: str = AUTO_STYLE,
+) -> List[str]:
+    """Format the lines of a single docstring.
+
+    The most recently formatted docstrings are cached, keyed by their raw lines, which
+    include the indentation, and by the formatting options, so that identical
+    docstrings are formatted once per process.
+
+    Args:
+        docstring_lines (List[str]): docstring lines, from the opening to the closing
+            delimiter.
+        line_length (int): maximum line length. Defaults to 88.
+        wrap_summary (bool): whether to wrap the summary line. Defaults to False.
+        style (str): docstring style, i.e. the name of a registered formatter, or
+            "auto" to detect the style of the docstring from its section headers.
+            Defaults to "auto".
+
+    Returns:
+        List[str]: formatted docstring lines.
+    """
+    return list(
+        _format_docstring_cached(
+            tuple(docstring_lines), line_length, wrap_summary, style
+        )
+    )
+
+
+def parse_docstring(docstring_lines: List[str], style: str = AUTO_STYLE) -> Docstring:
+    """Parse a docstring once, to render it at several line lengths or inspect it.
+
+    Args:
+        docstring_lines (List[str]): docstring lines, from the opening to the closing
+            delimiter.
+        style (str): docstring style, see `format_docstring`. Defaults to "auto".
+
+    Returns:
+        Docstring: parsed docstring, whose `render` method gives the same lines as
+            `format_docstring` with the same options.
+    """
+    if style == AUTO_STYLE:
+        style = detect_style(docstring_lines) or DEFAULT_STYLE
+    return get_formatter(style).parse(docstring_lines)
+
+
+def _format_docstrings_chunk(
+    docstrings: List[List[str]], line_length: int, wrap_summary: bool, style: str
+) -> List[List[str]]:
+    return [
+        format_docstring(lines, line_length, wrap_summary, style)
+        for lines in docstrings
+    ]
+
+
+def format_docstrings(
+    docstrings: Iterable[List[str]],
+    line_length: int = 88,
+    wrap_summary: bool = False,
+    jobs: int = 1,
+    chunksize: int = 256,
+    style: str = AUTO_STYLE,
+) -> Iterator[List[str]]:
+    """Format many docstrings, lazily yielding the results in the input order.
+
+    The docstrings are consumed as the results are requested, so arbitrarily long
+    iterables can be formatted with bounded memory. With more than one job, chunks of
+    docstrings are fanned out to a pool of worker processes which lives as long as the
+    generator, and at most two chunks per worker are in flight at any time.
+
+    Args:
+        docstrings (Iterable[List[str]]): lines of each docstring to format.
+        line_length (int): maximum line length. Defaults to 88.
+        wrap_summary (bool): whether to wrap the summary line. Defaults to False.
+        jobs (int): number of worker processes. Defaults to 1, which formats the
+            docstrings in the current process.
+        chunksize (int): number of docstrings sent to a worker process at once.
+            Defaults to 256.
+        style (str): docstring style, see `format_docstring`. Defaults to "auto".
+
+    Yields:
+        List[str]: formatted lines of each docstring.
+    """
+    if jobs <= 1:
+        for docstring_lines in docstrings:
+            yield format_docstring(docstring_lines, line_length, wrap_summary, style)
+        return
+    # The process pool is imported only when needed, it's slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    docstrings = iter(docstrings)
+    chunks = iter(lambda: list(islice(docstrings, chunksize)), [])
+    format_chunk = partial(
+        _format_docstrings_chunk,
+        line_length=line_length,
+        wrap_summary=wrap_summary,
+        style=style,
+    )
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for chunk in chunks:
+            pending.append(executor.submit(format_chunk, chunk))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def format_file(
+    handler: SourceHandler,
+    line_length: int,
+    wrap_summary: bool,
+    line_ranges: Optional[List[LineRange]] = None,
+    timer: Optional[PhaseTimer] = None,
+    style: str = AUTO_STYLE,
+) -> int:
+    """Format a file using the docstring formatter.
+
+    Args:
+        handler (SourceHandler): file handler to be used to iterate over docstring
+            lines and to save the formatted code.
+        line_length (int): maximum line length.
+        wrap_summary (bool): whether to wrap the summary line.
+        line_ranges (Optional[List[LineRange]]): if given, only the docstrings
+            overlapping with these line ranges are formatted. Defaults to None.
+        timer (Optional[PhaseTimer]): if given, the time spent parsing the file,
+            formatting the docstrings and replacing them is added to this timer.
+            Defaults to None.
+        style (str): docstring style, see `format_docstring`. Defaults to "auto".
+
+    Returns:
+        int: number of docstrings formatted.
+    """
+    timer = timer or PhaseTimer()
+    with timer.phase("parse"):
+        docstrings = list(handler.iter_doc())
+    n_formatted = 0
+    for offset, docstring_lines in docstrings:
+        if line_ranges is not None and not overlaps(
+            line_ranges, offset + 1, offset + len(docstring_lines)
+        ):
+            continue
+        with timer.phase("format"):
+            docstring_lines_formatted = format_docstring(
+                docstring_lines, line_length, wrap_summary, style
+            )
+        with timer.phase("replace"):
+            handler.replace_lines(docstring_lines, docstring_lines_formatted, offset)
+        n_formatted += 1
+    return n_formatted
+
+
+def format_source(
+    source: str,
+    line_length: int = 88,
+    wrap_summary: bool = False,
+    line_ranges: Optional[List[LineRange]] = None,
+    style: str = AUTO_STYLE,
+) -> str:
+    """Format the docstrings of python source code, without any filesystem access.
+
+    Args:
+        source (str): python source code.
+        line_length (int): maximum line length. Defaults to 88.
+        wrap_summary (bool): whether to wrap the summary line. Defaults to False.
+        line_ranges (Optional[List[LineRange]]): if given, only the docstrings
+            overlapping with these line ranges are formatted. Defaults to None.
+        style (str): docstring style, see `format_docstring`. Defaults to "auto".
+
+    Returns:
+        str: formatted source code.
+    """
+    handler = SourceHandler(source)
+    format_file(handler, line_length, wrap_summary, line_ranges, style=style)
+    return handler.formatted_file_content
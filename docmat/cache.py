@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from docmat import __version__
+
+CacheEntry = namedtuple("CacheEntry", ["mtime", "size", "hash"])
+
+
+def get_cache_dir() -> Path:
+    """Get the default cache directory.
+
+    The directory can be overridden with the `DOCMAT_CACHE_DIR` environment variable,
+    otherwise it is placed under `XDG_CACHE_HOME` (or `~/.cache` if not set).
+
+    Returns:
+        Path: default cache directory.
+    """
+    if cache_dir := os.environ.get("DOCMAT_CACHE_DIR"):
+        return Path(cache_dir)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "docmat"
+
+
+def get_cache_entry(path: str) -> CacheEntry:
+    """Build the cache entry of a file from its current content on disk.
+
+    Args:
+        path (str): file path.
+
+    Returns:
+        CacheEntry: cache entry of the file.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    return CacheEntry(stat.st_mtime, stat.st_size, content_hash)
+
+
+class Cache:
+    """On-disk cache of files known to be already formatted.
+
+    A cache file is kept for each combination of docmat version and formatting
+    options, so that changing any of them invalidates the whole cache.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        line_length: int,
+        wrap_summary: bool,
+        style: str = "auto",
+        low_memory: bool = False,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            cache_dir (Path): directory where the cache files are stored.
+            line_length (int): maximum line length.
+            wrap_summary (bool): whether to wrap the summary line.
+            style (str): docstring style. Defaults to "auto".
+            low_memory (bool): whether the files are streamed, which leaves the
+                docstrings sharing a line with code unformatted. Defaults to False.
+        """
+        options = f"{__version__}|{line_length}|{wrap_summary}|{style}|{low_memory}"
+        key = hashlib.sha256(options.encode()).hexdigest()[:16]
+        self._cache_file = Path(cache_dir) / f"cache.{key}.json"
+        self._entries = self._read()
+        self._changed = False
+
+    def _read(self) -> Dict[str, CacheEntry]:
+        try:
+            with open(self._cache_file) as f:
+                raw_entries = json.load(f)
+            return {path: CacheEntry(*entry) for path, entry in raw_entries.items()}
+        except (OSError, ValueError, TypeError):
+            # A missing or corrupted cache is the same as an empty cache
+            return {}
+
+    def is_formatted(self, path: str) -> bool:
+        """Check whether a file is known to be already formatted.
+
+        The content of the file is hashed only if its modification time changed since
+        it was cached, e.g. after a `git checkout`.
+
+        Args:
+            path (str): file path.
+
+        Returns:
+            bool: True if the file did not change since it was formatted.
+        """
+        key = os.path.abspath(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != entry.size:
+            return False
+        if stat.st_mtime == entry.mtime:
+            return True
+        new_entry = get_cache_entry(path)
+        if new_entry.hash != entry.hash:
+            return False
+        self._entries[key] = new_entry
+        self._changed = True
+        return True
+
+    def filter_formatted(self, paths: Iterable[str]) -> List[str]:
+        """Filter out files that are known to be already formatted.
+
+        Args:
+            paths (Iterable[str]): file paths.
+
+        Returns:
+            List[str]: paths of the files that need to be formatted.
+        """
+        return [path for path in paths if not self.is_formatted(path)]
+
+    def update(self, path: str, entry: Optional[CacheEntry] = None):
+        """Mark a file as formatted.
+
+        Args:
+            path (str): file path.
+            entry (Optional[CacheEntry]): cache entry of the file, computed from the
+                file on disk if not given.
+        """
+        self._entries[os.path.abspath(path)] = entry or get_cache_entry(path)
+        self._changed = True
+
+    def write(self):
+        """Atomically write the cache to disk, if it changed since it was read."""
+        if not self._changed:
+            return
+        import tempfile
+
+        self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self._cache_file.parent, prefix=self._cache_file.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self._cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._changed = False
@@ -0,0 +1,226 @@
+import argparse
+import os
+import socketserver
+import stat
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from docmat.api import AUTO_STYLE, format_source
+from docmat.docstring_formats import FORMATTERS
+
+LINE_LENGTH_HEADER = "X-Line-Length"
+WRAP_SUMMARY_HEADER = "X-Wrap-Summary"
+STYLE_HEADER = "X-Style"
+
+# Requests with a larger body are rejected without reading it
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse Command line arguments.
+
+    Returns:
+        argparse.Namespace: Namespace containing the parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="docmat daemon, formats python source code sent over HTTP."
+    )
+
+    parser.add_argument(
+        "--bind-host",
+        dest="bind_host",
+        type=str,
+        default="localhost",
+        help="Address to bind the server to",
+    )
+
+    parser.add_argument(
+        "--bind-port",
+        dest="bind_port",
+        type=int,
+        default=45485,
+        help="Port to listen on",
+    )
+
+    parser.add_argument(
+        "--socket",
+        dest="socket",
+        type=str,
+        default=None,
+        help="Path of a Unix socket to listen on, instead of a TCP port",
+    )
+
+    return parser.parse_args()
+
+
+def parse_bool(value: str) -> bool:
+    """Parse a boolean header value.
+
+    Args:
+        value (str): header value.
+
+    Raises:
+        ValueError: if the value is not a boolean.
+
+    Returns:
+        bool: parsed value.
+    """
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"invalid boolean value {value!r}")
+
+
+class FormatRequestHandler(BaseHTTPRequestHandler):
+    """Format the python source code sent in the body of a POST request.
+
+    Formatting options are read from the `X-Line-Length`, `X-Wrap-Summary` and `X-Style`
+    headers. The response is the formatted source code with status 200, or an empty body
+    with status 204 if the source code is already formatted.
+    """
+
+    def _send(self, status: HTTPStatus, body: str = ""):
+        encoded_body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.end_headers()
+        self.wfile.write(encoded_body)
+
+    def _read_body(self) -> Optional[bytes]:
+        """Read the body of the request, whose length is given by its header.
+
+        The connection is closed if the body can't be read, since the rest of the
+        request would be parsed as the next one.
+
+        Returns:
+            Optional[bytes]: body of the request, None if the request was rejected.
+        """
+        content_length = self.headers.get("Content-Length")
+        if content_length is None:
+            self.close_connection = True
+            self._send(HTTPStatus.LENGTH_REQUIRED, "Missing Content-Length header")
+            return None
+        try:
+            length = int(content_length)
+            if length < 0:
+                raise ValueError(f"negative length {length}")
+        except ValueError as e:
+            self.close_connection = True
+            self._send(HTTPStatus.BAD_REQUEST, f"Invalid Content-Length header: {e}")
+            return None
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+            self._send(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Body larger than {MAX_BODY_SIZE} bytes",
+            )
+            return None
+        return self.rfile.read(length)
+
+    def do_POST(self):
+        # The body is read before the options are validated, so that the client can
+        # finish sending it even if the request is rejected
+        body = self._read_body()
+        if body is None:
+            return
+        try:
+            line_length = int(self.headers.get(LINE_LENGTH_HEADER, 88))
+            wrap_summary = parse_bool(self.headers.get(WRAP_SUMMARY_HEADER, "false"))
+            style = self.headers.get(STYLE_HEADER, AUTO_STYLE)
+            if style != AUTO_STYLE and style not in FORMATTERS:
+                raise ValueError(f"unknown docstring style {style!r}")
+        except ValueError as e:
+            self._send(HTTPStatus.BAD_REQUEST, f"Invalid header: {e}")
+            return
+        try:
+            source = body.decode()
+        except UnicodeDecodeError as e:
+            self._send(HTTPStatus.BAD_REQUEST, f"Invalid body: {e}")
+            return
+        # Source code is formatted with "\n" line endings, the line ending of its first
+        # line is restored in the response
+        newline = "\r\n" if source.split("\n", 1)[0].endswith("\r") else "\n"
+        if newline != "\n":
+            source = source.replace(newline, "\n")
+        try:
+            formatted_source = format_source(
+                source, line_length, wrap_summary, style=style
+            )
+        except Exception as e:
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+            return
+        if formatted_source == source:
+            self._send(HTTPStatus.NO_CONTENT)
+        else:
+            self._send(HTTPStatus.OK, formatted_source.replace("\n", newline))
+
+    def log_request(self, code="-", size="-"):
+        # Only errors are logged, logging every request would slow down the editors
+        pass
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+
+class ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+
+def make_server(
+    host: str = "localhost", port: int = 45485, socket: Optional[str] = None
+):
+    """Create the daemon server, each request is handled in a separate thread.
+
+    Args:
+        host (str): address to bind the server to. Defaults to "localhost".
+        port (int): port to listen on. Defaults to 45485.
+        socket (str): path of a Unix socket to listen on, instead of a TCP port.
+            Defaults to None.
+
+    Raises:
+        FileExistsError: if the path of the Unix socket exists and is not a socket.
+
+    Returns:
+        socketserver.BaseServer: server, ready to serve requests.
+    """
+    if socket is not None:
+        try:
+            is_socket = stat.S_ISSOCK(os.lstat(socket).st_mode)
+        except FileNotFoundError:
+            is_socket = None
+        if is_socket is False:
+            raise FileExistsError(f"{socket} exists and is not a socket")
+        if is_socket:
+            # Left over by a previous daemon
+            os.unlink(socket)
+        return ThreadingUnixHTTPServer(socket, FormatRequestHandler)
+    return ThreadingHTTPServer((host, port), FormatRequestHandler)
+
+
+def main():
+    """Serve format requests until interrupted."""
+    args = parse_args()
+    try:
+        server = make_server(args.bind_host, args.bind_port, args.socket)
+    except FileExistsError as e:
+        sys.exit(f"error: {e}")
+    address = args.socket or f"http://{args.bind_host}:{server.server_address[1]}"
+    print(f"docmatd listening on {address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import os
+import re
+from collections import namedtuple
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+
+DEFAULT_EXCLUDES = (
+    r"/(\.direnv|\.eggs|\.git|\.hg|\.ipynb_checkpoints|\.mypy_cache|\.nox|"
+    r"\.pytest_cache|\.ruff_cache|\.svn|\.tox|\.venv|__pycache__|__pypackages__|"
+    r"_build|buck-out|build|dist|node_modules|venv)/"
+)
+
+GitignorePattern = namedtuple("GitignorePattern", ["regex", "negated", "dir_only"])
+
+# A .gitignore file applying to a walked tree. The path of a file relative to the
+# directory of the .gitignore is `prefix + path_relative_to_root[strip:]`
+ScopedGitignore = namedtuple("ScopedGitignore", ["gitignore", "prefix", "strip"])
+
+
+def translate_gitignore_pattern(pattern: str) -> Tuple[str, bool]:
+    """Translate a gitignore pattern to a regular expression.
+
+    Args:
+        pattern (str): gitignore pattern, without negation and trailing slash.
+
+    Returns:
+        Tuple[str, bool]: regular expression matching the paths relative to the
+            directory of the `.gitignore` file, and whether the pattern is anchored to
+            that directory, i.e. it contains a slash.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i) and i + 2 == n and pattern[i - 1] == "/":
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            content = pattern[i + 1 : end].replace("\\", "\\\\")
+            if content[0] in "!^":
+                content = "^" + content[1:]
+            regex.append(f"[{content}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(regex), anchored
+
+
+def parse_gitignore(lines: Iterable[str]) -> List[GitignorePattern]:
+    """Parse the lines of a `.gitignore` file.
+
+    Args:
+        lines (Iterable[str]): lines of the file.
+
+    Returns:
+        List[GitignorePattern]: patterns, in the same order as in the file.
+    """
+    patterns = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        regex, anchored = translate_gitignore_pattern(line)
+        prefix = "" if anchored else "(?:.*/)?"
+        patterns.append(
+            GitignorePattern(re.compile(f"{prefix}{regex}\\Z"), negated, dir_only)
+        )
+    return patterns
+
+
+class Gitignore:
+    def __init__(self, patterns: List[GitignorePattern]) -> None:
+        """Class Constructor.
+
+        Args:
+            patterns (List[GitignorePattern]): patterns of a `.gitignore` file.
+        """
+        self.patterns = patterns
+
+    @classmethod
+    def from_file(cls, path: str) -> "Gitignore":
+        """Read a `.gitignore` file, an unreadable file has no patterns.
+
+        Args:
+            path (str): path of the file.
+
+        Returns:
+            Gitignore: patterns of the file.
+        """
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                patterns = parse_gitignore(f)
+        except OSError:
+            patterns = []
+        return cls(patterns)
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """Match a path against the patterns, the last matching pattern wins.
+
+        Args:
+            relative_path (str): path relative to the directory of the `.gitignore`
+                file, with forward slashes.
+            is_dir (bool): whether the path is a directory.
+
+        Returns:
+            Optional[bool]: True if the path is ignored, False if it is explicitly
+                not ignored by a negated pattern, None if no pattern matches.
+        """
+        for pattern in reversed(self.patterns):
+            if pattern.dir_only and not is_dir:
+                continue
+            if pattern.regex.match(relative_path):
+                return not pattern.negated
+        return None
+
+
+def find_git_root(directory: str) -> Optional[str]:
+    """Find the root of the git repository containing a directory.
+
+    Args:
+        directory (str): absolute path of the directory.
+
+    Returns:
+        Optional[str]: root of the repository, None if the directory is not in a
+            repository.
+    """
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def get_parent_gitignores(directory: str) -> List[ScopedGitignore]:
+    """Get the `.gitignore` files applying to a directory from its parents.
+
+    Args:
+        directory (str): absolute path of the directory.
+
+    Returns:
+        List[ScopedGitignore]: `.gitignore` files from the root of the repository
+            down to the parent of the directory, empty if it is not in a repository.
+    """
+    git_root = find_git_root(directory)
+    if git_root is None or git_root == directory:
+        return []
+    parts = os.path.relpath(directory, git_root).split(os.sep)
+    gitignores = []
+    parent = git_root
+    for i in range(len(parts)):
+        path = os.path.join(parent, ".gitignore")
+        if os.path.isfile(path):
+            prefix = "/".join(parts[i:]) + "/"
+            gitignores.append(ScopedGitignore(Gitignore.from_file(path), prefix, 1))
+        parent = os.path.join(parent, parts[i])
+    return gitignores
+
+
+def is_gitignored(
+    gitignores: List[ScopedGitignore], relative_path: str, is_dir: bool
+) -> bool:
+    # Deeper .gitignore files take precedence over the ones of their parents
+    for gitignore, prefix, strip in reversed(gitignores):
+        ignored = gitignore.match(prefix + relative_path[strip:], is_dir)
+        if ignored is not None:
+            return ignored
+    return False
+
+
+def walk_python_files(
+    root: str,
+    exclude: Optional[Pattern] = None,
+    gitignores: Optional[List[ScopedGitignore]] = None,
+) -> Iterator[str]:
+    """Recursively find the python files of a directory, using `os.scandir`.
+
+    Excluded and gitignored directories are pruned before descending into them, and
+    symbolic links to directories are not followed.
+
+    Args:
+        root (str): directory to walk.
+        exclude (Optional[Pattern]): regular expression searched in the path of each
+            file and directory relative to `root`, prefixed with a slash. Directories
+            end with a slash, e.g. `/build/`. Matching paths are skipped. Defaults to
+            None.
+        gitignores (Optional[List[ScopedGitignore]]): if given, `.gitignore` files
+            found while walking are added to these ones, and the paths they ignore are
+            skipped. Defaults to None, which does not read `.gitignore` files.
+
+    Yields:
+        str: path of each python file, in sorted order within a directory.
+    """
+    stack = [(root, "/", gitignores)]
+    while stack:
+        directory, relative_directory, gitignores = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        if gitignores is not None and any(e.name == ".gitignore" for e in entries):
+            gitignore = Gitignore.from_file(os.path.join(directory, ".gitignore"))
+            strip = len(relative_directory)
+            gitignores = gitignores + [ScopedGitignore(gitignore, "", strip)]
+        subdirectories = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if not is_dir and not entry.name.endswith(".py"):
+                continue
+            relative_path = relative_directory + entry.name + ("/" if is_dir else "")
+            if exclude is not None and exclude.search(relative_path):
+                continue
+            if gitignores and is_gitignored(
+                gitignores, relative_path.rstrip("/"), is_dir
+            ):
+                continue
+            if is_dir:
+                subdirectories.append((entry.path, relative_path, gitignores))
+            elif entry.is_file():
+                yield entry.path
+        # Reversed so that directories are popped in sorted order
+        stack.extend(reversed(subdirectories))
+
+
+def iter_files(
+    file_globs: Iterable[str],
+    exclude: Optional[Pattern] = None,
+    extend_exclude: Optional[Pattern] = None,
+    gitignore: bool = False,
+) -> Iterator[str]:
+    """Iterate over the python files matching the paths passed from CLI.
+
+    Directories are walked recursively, skipping the excluded and gitignored paths.
+    Files and glob patterns are never excluded. Each file is yielded once, even if it
+    is matched by several paths.
+
+    Args:
+        file_globs (Iterable[str]): file names, directories or glob patterns.
+        exclude (Optional[Pattern]): regular expression of the paths to skip while
+            walking directories, see `walk_python_files`. Defaults to None.
+        extend_exclude (Optional[Pattern]): regular expression of additional paths to
+            skip while walking directories. Defaults to None.
+        gitignore (bool): whether to skip the paths ignored by `.gitignore` files.
+            Defaults to False.
+
+    Yields:
+        str: path of a python file to format.
+    """
+    if exclude is None:
+        exclude = extend_exclude
+    elif extend_exclude is not None:
+        exclude = re.compile(f"(?:{exclude.pattern})|(?:{extend_exclude.pattern})")
+    seen = set()
+    for file_glob in file_globs:
+        if os.path.isdir(file_glob):
+            gitignores = None
+            if gitignore:
+                gitignores = get_parent_gitignores(os.path.abspath(file_glob))
+            files = walk_python_files(file_glob, exclude, gitignores)
+        elif os.path.isfile(file_glob):
+            files = [file_glob] if file_glob.endswith(".py") else []
+        else:
+            import glob
+
+            files = [f for f in glob.glob(file_glob) if f.endswith(".py")]
+        for file in files:
+            key = os.path.abspath(file)
+            if key not in seen:
+                seen.add(key)
+                yield file
@@ -0,0 +1,6 @@
+from .google import GoogleFormatter  # noqa
+from .numpy import NumpyFormatter  # noqa
+from .shared.base import FORMATTERS, BaseFormatter, get_formatter  # noqa
+from .shared.classifier import DEFAULT_STYLE, detect_style  # noqa
+from .shared.elements import Entry  # noqa
+from .shared.model import Docstring  # noqa
@@ -0,0 +1 @@
+from .docstring import NumpyFormatter  # noqa
@@ -0,0 +1,65 @@
+import re
+
+from docmat.docstring_formats.shared import (
+    BaseFormatter,
+    UnderlinedSection,
+    UnindentedSection,
+)
+from docmat.docstring_formats.shared.tokenizer import BLANK, DELIMITER
+
+UNDERLINE_PATTERN = re.compile(r"-{3,}\Z")
+
+
+class NumpyFormatter(BaseFormatter):
+    """Formatter of NumPy style docstrings, whose sections are underlined."""
+
+    style = "numpy"
+
+    def iter_elements(self, offset):
+        """Iterate over the docstring elements following the summary.
+
+        A section starts at a line followed by an underline, and ends before the next
+        section. Paragraphs preceding the first section are formatted as unindented
+        sections.
+
+        Args:
+            offset (int): offset from which to start looking for elements.
+
+        Yields:
+            Union[UnderlinedSection, UnindentedSection]: docstring elements.
+        """
+        lines = self._dedented_lines
+        kinds, indentation_levels = self._tokens
+        n_lines = len(lines)
+
+        def is_section_start(i):
+            return (
+                kinds[i] not in (BLANK, DELIMITER)
+                and i + 1 < n_lines
+                and UNDERLINE_PATTERN.match(lines[i + 1].strip()) is not None
+            )
+
+        start = offset
+        while start < n_lines:
+            if kinds[start] in (BLANK, DELIMITER):
+                start += 1
+            elif is_section_start(start):
+                end = start + 2
+                while end < n_lines and kinds[end] != DELIMITER:
+                    if is_section_start(end):
+                        break
+                    end += 1
+                yield UnderlinedSection(
+                    lines[start:end], indentation_levels=indentation_levels[start:end]
+                )
+                start = end
+            else:
+                end = start + 1
+                while (
+                    end < n_lines
+                    and kinds[end] not in (BLANK, DELIMITER)
+                    and not is_section_start(end)
+                ):
+                    end += 1
+                yield UnindentedSection(lines[start:end])
+                start = end
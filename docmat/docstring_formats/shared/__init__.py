@@ -1,2 +1,11 @@
 from .base import BaseFormatter  # noqa
-from .elements import IndentedSection, NewLine, Summary, UnindentedSection  # noqa
+from .elements import (  # noqa
+    Element,
+    Entry,
+    IndentedSection,
+    NewLine,
+    Summary,
+    UnderlinedSection,
+    UnindentedSection,
+)
+from .model import Docstring  # noqa
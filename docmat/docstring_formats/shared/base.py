@@ -1,6 +1,151 @@
-from abc import ABC
+from abc import ABC, abstractmethod
+from textwrap import dedent
+from typing import Dict, Iterator, List, Type
+
+from .elements import Summary
+from .model import Docstring
+from .tokenizer import tokenize_lines
+
+# Registered formatters, by docstring style
+FORMATTERS: Dict[str, Type["BaseFormatter"]] = {}
 
 
 class BaseFormatter(ABC):
-    def __init__(self) -> None:
+    """Base class of the docstring formatters.
+
+    The summary of the docstring is found here, the elements following it are parsed by
+    `iter_elements`, into a `Docstring` rendered at the line length of the formatter.
+    Subclasses setting `style` are registered in `FORMATTERS`, so that docstrings of
+    that style are dispatched to them.
+    """
+
+    style = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.style is not None:
+            FORMATTERS[cls.style] = cls
+
+    def __init__(
+        self,
+        docstring_lines: List[str],
+        line_length: int = 88,
+        wrap_summary: bool = False,
+    ) -> None:
+        """Class Constructor.
+
+        Args:
+            docstring_lines (List[str]): docstring lines to format.
+            line_length (int): maximum line length. Defaults to 88.
+            wrap_summary (bool): whether to wrap the summary line. Defaults to False.
+        """
         super().__init__()
+        self._delimiter = self.get_docstring_delimiter(docstring_lines[0])
+        self._indentation = self.get_indentation(docstring_lines[0], self._delimiter)
+        self._dedented_lines = self.dedent_lines(docstring_lines)
+        self._tokens = tokenize_lines(self._dedented_lines, self._delimiter)
+        self._line_length = line_length
+        self._wrap_summary = wrap_summary
+        summary_starts, summary_ends = self.find_summary(self._dedented_lines)
+        self.docstring = Docstring(
+            self._delimiter,
+            self._indentation,
+            Summary(
+                " ".join(self._dedented_lines[summary_starts:summary_ends]),
+                delimiter=self._delimiter,
+            ),
+            tuple(self.iter_elements(summary_ends)),
+        )
+
+    @classmethod
+    def parse(cls, docstring_lines: List[str]) -> Docstring:
+        """Parse a docstring, to render it later at any line length.
+
+        Args:
+            docstring_lines (List[str]): docstring lines.
+
+        Returns:
+            Docstring: parsed docstring.
+        """
+        return cls(docstring_lines).docstring
+
+    @abstractmethod
+    def iter_elements(self, offset: int) -> Iterator:
+        """Iterate over the docstring elements following the summary.
+
+        Args:
+            offset (int): offset from which to start looking for elements.
+
+        Yields:
+            Element: docstring elements, built without a line length.
+        """
+
+    def find_summary(self, lines):
+        summary_starts = None
+        for i, line in enumerate(lines):
+            if line.strip() == self._delimiter and summary_starts is None:
+                continue
+            if line:
+                if summary_starts is None:
+                    summary_starts = i
+            if (
+                # Line finishes with a dot
+                line.endswith(".")
+                # Meet a new line while parsing summary
+                or (not line and summary_starts is not None)
+                # Line finishes with the delimiter while parsing summary
+                or line.endswith(self._delimiter)
+            ):
+                return summary_starts, i + 1
+
+    @staticmethod
+    def dedent_lines(docstring_lines):
+        dedented_lines = dedent("\n".join(docstring_lines)).split("\n")
+        return [line.rstrip() for line in dedented_lines]
+
+    @staticmethod
+    def get_docstring_delimiter(line):
+        stripped_line = line.strip()
+        docstring_delimiters = ('"""', "'''")
+        for delimiter in docstring_delimiters:
+            if stripped_line.startswith(delimiter):
+                return delimiter
+        raise RuntimeError(
+            f'"{line}" does not start with any of these docstring '
+            f"delimiters {docstring_delimiters}"
+        )
+
+    @staticmethod
+    def get_indentation(line, docstring_delimiter):
+        return line.split(docstring_delimiter)[0]
+
+    def __str__(self) -> str:
+        return "\n".join(self.get_formatted_docstring()) + "\n"
+
+    def get_formatted_docstring(self) -> List[str]:
+        """Get the formatted docstring lines, see `Docstring.render`.
+
+        Returns:
+            List[str]: formatted and indented docstring lines.
+        """
+        return self.docstring.render(self._line_length, self._wrap_summary)
+
+
+def get_formatter(style: str) -> Type[BaseFormatter]:
+    """Get the formatter of a docstring style.
+
+    Args:
+        style (str): docstring style, e.g. "google".
+
+    Raises:
+        ValueError: if no formatter is registered for the style.
+
+    Returns:
+        Type[BaseFormatter]: formatter class.
+    """
+    try:
+        return FORMATTERS[style]
+    except KeyError:
+        raise ValueError(
+            f"unknown docstring style {style!r}, expected one of {sorted(FORMATTERS)}"
+        )
@@ -0,0 +1,83 @@
+from typing import List, Optional
+
+from .string_utils import get_section_name
+
+DEFAULT_STYLE = "google"
+
+GOOGLE_SECTIONS = frozenset(
+    (
+        "args",
+        "arguments",
+        "attributes",
+        "example",
+        "examples",
+        "keyword args",
+        "keyword arguments",
+        "methods",
+        "note",
+        "notes",
+        "other parameters",
+        "parameters",
+        "raises",
+        "references",
+        "returns",
+        "see also",
+        "todo",
+        "warning",
+        "warnings",
+        "warns",
+        "yields",
+    )
+)
+
+# Section names of numpydoc, the Google-only ones are excluded so that a title
+# underlined as a rule, e.g. "Args", doesn't make a docstring NumPy style
+NUMPY_SECTIONS = frozenset(
+    (
+        "attributes",
+        "examples",
+        "methods",
+        "notes",
+        "other parameters",
+        "parameters",
+        "raises",
+        "receives",
+        "references",
+        "returns",
+        "see also",
+        "warnings",
+        "warns",
+        "yields",
+    )
+)
+
+
+def detect_style(docstring_lines: List[str]) -> Optional[str]:
+    """Guess the style of a docstring from its section headers, in a single pass.
+
+    A known section name underlined with at least three dashes is a NumPy section
+    header, a known section name followed by a colon is a Google section header. Other
+    lines of dashes are rules, which don't decide the style. The first header
+    found decides the style, the docstring is never formatted to find it.
+
+    Args:
+        docstring_lines (List[str]): docstring lines.
+
+    Returns:
+        Optional[str]: "numpy" or "google", None if the docstring has no section.
+    """
+    previous_line = ""
+    for line in docstring_lines:
+        line = line.strip()
+        if (
+            line.startswith("---")
+            and not line.strip("-")
+            and previous_line.lower() in NUMPY_SECTIONS
+        ):
+            return "numpy"
+        if line.endswith(":"):
+            section_name = get_section_name(line)
+            if section_name is not None and section_name.lower() in GOOGLE_SECTIONS:
+                return "google"
+        previous_line = line
+    return None
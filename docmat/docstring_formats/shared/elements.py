@@ -1,11 +1,29 @@
 import re
-from textwrap import TextWrapper
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from itertools import groupby
+from typing import Tuple
 
-from .string_utils import capitalize, check_dot, count_indentation_level
+from .string_utils import (
+    capitalize,
+    check_dot,
+    count_indentation_level,
+    get_section_name,
+    get_text_wrapper,
+)
+
+SPACES_PATTERN = re.compile(r" +")
+
+# Entry of a section listing arguments, return values, exceptions or attributes. The
+# name or the type are None if the entry doesn't give them
+Entry = namedtuple("Entry", ["name", "type", "description"])
+
+# Sections whose entries are types rather than names, e.g. the returned value
+TYPED_SECTIONS = frozenset(("raises", "receives", "returns", "warns", "yields"))
 
 
 def replace_double_spaces(s):
-    return re.sub(r" +", " ", s)
+    return SPACES_PATTERN.sub(" ", s)
 
 
 def strip_all(l):
@@ -24,7 +42,63 @@ def clean_text(text):
     return capitalize(check_dot(text))
 
 
-class Summary:
+class Element(ABC):
+    """Base class of the docstring elements.
+
+    Elements hold the parsed content of a part of a docstring, which `render` formats at
+    any line length. `lines` holds the element rendered at the line length given to its
+    constructor, and is empty if none was given. Elements are immutable once built, each
+    attribute can be set only once by the constructor, and have no instance `__dict__`.
+    Equality and hashing compare the type and the parsed content of the elements, so
+    they can be deduplicated without rebuilding their strings.
+    """
+
+    __slots__ = ("lines",)
+
+    @abstractmethod
+    def render(self, line_length: int) -> Tuple[str, ...]:
+        """Format the element.
+
+        Args:
+            line_length (int): maximum line length, excluding the docstring
+                indentation.
+
+        Returns:
+            Tuple[str, ...]: formatted lines.
+        """
+
+    def __setattr__(self, name: str, value) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _content(self):
+        return tuple(getattr(self, slot) for slot in type(self).__slots__)
+
+    def __str__(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+    def __repr__(self) -> str:
+        content = ", ".join(
+            f"{slot}={getattr(self, slot)!r}" for slot in type(self).__slots__
+        )
+        return f"{type(self).__name__}({content})"
+
+    def __eq__(self, __o: object) -> bool:
+        if type(__o) is not type(self):
+            return NotImplemented
+        return self._content() == __o._content()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._content()))
+
+
+class Summary(Element):
+    __slots__ = ("delimiter", "text")
+
     def __init__(
         self,
         summary,
@@ -32,97 +106,292 @@ class Summary:
         should_wrap=False,
         line_length=None,
     ) -> None:
-        clean_summary = clean_text(summary)
-        clean_summary = delimiter + clean_summary
+        self.delimiter = delimiter
+        self.text = clean_text(summary)
+        self.lines = self.render(line_length, should_wrap)
+
+    def render(self, line_length: int, should_wrap: bool = False) -> Tuple[str, ...]:
+        """Format the summary, prefixed with the opening delimiter.
+
+        Args:
+            line_length (int): maximum line length, excluding the docstring
+                indentation.
+            should_wrap (bool): whether to wrap the summary. Defaults to False.
+
+        Returns:
+            Tuple[str, ...]: formatted lines.
+        """
         if should_wrap:
-            self.lines = TextWrapper(line_length).wrap(clean_summary)
-        else:
-            self.lines = [clean_summary]
+            return tuple(get_text_wrapper(line_length).wrap(self.delimiter + self.text))
+        return (self.delimiter + self.text,)
 
     def __str__(self) -> str:
         return "\n".join(self.lines)
 
 
-class NewLine:
+class NewLine(Element):
+    __slots__ = ()
+
     def __init__(self) -> None:
-        self.lines = [""]
+        self.lines = ("",)
+
+    def render(self, line_length: int) -> Tuple[str, ...]:
+        return ("",)
 
     def __str__(self) -> str:
         return ""
 
 
-class UnindentedSection:
-    def __init__(self, raw_lines, line_length) -> None:
+class UnindentedSection(Element):
+    __slots__ = ("text",)
+
+    def __init__(self, raw_lines, line_length=None) -> None:
         text = " ".join(l.strip() for l in raw_lines)
-        cleaned_text = clean_text(text)
-        self.lines = TextWrapper(line_length).wrap(cleaned_text)
+        self.text = clean_text(text)
+        self.lines = () if line_length is None else self.render(line_length)
 
-    def __str__(self) -> str:
-        return "\n".join(self.lines) + "\n"
+    def render(self, line_length: int) -> Tuple[str, ...]:
+        return tuple(get_text_wrapper(line_length).wrap(self.text))
 
-    def __repr__(self) -> str:
-        return f"UnindentedSection({str(self)})"
 
-    def __eq__(self, __o: object) -> bool:
-        return str(self) == str(__o)
+class IndentedSection(Element):
+    """Section of a Google style docstring, whose title ends with a colon."""
 
+    __slots__ = ("title", "texts")
+
+    # Sections whose entries start with the name of an argument or attribute
+    NAMED_SECTIONS = frozenset(
+        (
+            "args",
+            "arguments",
+            "attributes",
+            "keyword args",
+            "keyword arguments",
+            "methods",
+            "other parameters",
+            "parameters",
+        )
+    )
+    # `name (type): description`, the type is optional and ends at the first
+    # parenthesis followed by a colon, the description may contain both
+    NAMED_ENTRY_PATTERN = re.compile(r"(\S+?)\s*(?:\((.*?)\))?\s*:\s*(.*)", re.DOTALL)
+    # `type: description`
+    TYPED_ENTRY_PATTERN = re.compile(r"([^:]+?)\s*:\s+(.*)", re.DOTALL)
 
-class IndentedSection:
     @staticmethod
     def _find_start_body(lines):
-        for i, line in enumerate(lines[1:]):
-            if line != "":
-                return i + 1
+        for i in range(1, len(lines)):
+            if lines[i] != "":
+                return i
+        return len(lines)
 
     @staticmethod
-    def split_body_into_sections(lines, offset):
-        def next_start_element(offset):
-            for i, line in enumerate(lines[offset:]):
-                if line:
-                    return i + offset
-            return None
-
-        def find_end_of_section(offset):
-            init_indentation_level = count_indentation_level(lines[offset])
-            offset += 1
-            if len(lines) > offset:
-                for i, line in enumerate(lines[offset:]):
-                    if count_indentation_level(line) <= init_indentation_level:
-                        return i + offset
-                return i + offset + 1
-            return offset
-
-        start = next_start_element(offset)
-        while start is not None:
-            end = find_end_of_section(start)
-            yield lines[start:end]
-            offset = end
-            start = next_start_element(offset)
+    def split_body_into_sections(lines, offset, indentation_levels=None):
+        """Split the body of the section into the lines of each of its entries.
 
-    def __init__(self, raw_lines, line_length) -> None:
+        An entry ends at the first line that is not more indented than the line where
+        it starts. Lines are scanned once, without copying the remaining lines.
 
+        Args:
+            lines (List[str]): section lines.
+            offset (int): offset where the body of the section starts.
+            indentation_levels (Optional[List[int]]): indentation level of each line,
+                computed from the lines if not given. Defaults to None.
+
+        Yields:
+            List[str]: lines of each entry.
+        """
+        if indentation_levels is None:
+            indentation_levels = [count_indentation_level(line) for line in lines]
+        n_lines = len(lines)
+        start = offset
+        while True:
+            while start < n_lines and not lines[start]:
+                start += 1
+            if start == n_lines:
+                return
+            end = start + 1
+            while end < n_lines and indentation_levels[end] > indentation_levels[start]:
+                end += 1
+            yield lines[start:end]
+            start = end
+
+    def __init__(self, raw_lines, line_length=None, indentation_levels=None) -> None:
         lines = [l.rstrip() for l in raw_lines]
-        section_title = capitalize(lines[0].strip())
+        self.title = capitalize(lines[0].strip())
         start_body = self._find_start_body(lines)
-        body_sections_lines = list(self.split_body_into_sections(lines, start_body))
+        self.texts = tuple(
+            replace_double_spaces(check_dot(" ".join(strip_all(section_lines))))
+            for section_lines in self.split_body_into_sections(
+                lines, start_body, indentation_levels
+            )
+        )
+        self.lines = () if line_length is None else self.render(line_length)
+
+    def render(self, line_length: int) -> Tuple[str, ...]:
+        formatted_lines = [self.title]
+        if self.title.endswith("::"):
+            formatted_lines.append("")
+        wrapper = get_text_wrapper(line_length, " " * 4, " " * 8)
+        for text in self.texts:
+            formatted_lines += wrapper.wrap(text)
+        return tuple(formatted_lines)
+
+    @property
+    def entries(self) -> Tuple[Entry, ...]:
+        """Entries of the section, parsed from the text of each of them.
+
+        Returns:
+            Tuple[Entry, ...]: entries, whose name and type are None if they are not
+                found, e.g. in sections of free text.
+        """
+        section_name = (get_section_name(self.title) or "").lower()
+        if section_name in self.NAMED_SECTIONS:
+            pattern, named = self.NAMED_ENTRY_PATTERN, True
+        elif section_name in TYPED_SECTIONS:
+            pattern, named = self.TYPED_ENTRY_PATTERN, False
+        else:
+            return tuple(Entry(None, None, text) for text in self.texts)
+        entries = []
+        for text in self.texts:
+            match = pattern.match(text)
+            if match is None:
+                entries.append(Entry(None, None, text))
+            elif named:
+                entries.append(Entry(*match.groups()))
+            else:
+                entries.append(Entry(None, *match.groups()))
+        return tuple(entries)
+
+
+class UnderlinedSection(Element):
+    """Section of a NumPy style docstring, whose title is underlined with dashes.
+
+    The bodies of the sections listing parameters, return values, exceptions or
+    attributes are split into entries, whose first line (`name : type`) is kept and
+    whose description is wrapped. The bodies of the other sections, e.g. notes or
+    examples, are kept as they are.
+    """
+
+    __slots__ = ("title", "body", "entry_paragraphs")
 
-        self.lines = [section_title]
-        if section_title.endswith("::"):
-            self.lines += [""]
+    ENTRY_SECTIONS = frozenset(
+        (
+            "attributes",
+            "methods",
+            "other parameters",
+            "parameters",
+            "raises",
+            "receives",
+            "returns",
+            "warns",
+            "yields",
+        )
+    )
 
-        for section_lines in body_sections_lines:
-            section_text = replace_double_spaces(
-                check_dot(" ".join(strip_all(section_lines)))
+    @staticmethod
+    def split_body_into_entries(lines, offset, indentation_levels):
+        """Split the body of the section into the lines of each of its entries.
+
+        An entry ends before the next line that is not blank and not more indented
+        than the line where it starts, hence the descriptions of an entry can span
+        several paragraphs.
+
+        Args:
+            lines (List[str]): section lines.
+            offset (int): offset where the body of the section starts.
+            indentation_levels (List[int]): indentation level of each line.
+
+        Yields:
+            List[str]: lines of each entry.
+        """
+        n_lines = len(lines)
+        start = offset
+        while True:
+            while start < n_lines and not lines[start]:
+                start += 1
+            if start == n_lines:
+                return
+            end = start + 1
+            while end < n_lines and (
+                not lines[end] or indentation_levels[end] > indentation_levels[start]
+            ):
+                end += 1
+            yield lines[start:end]
+            start = end
+
+    @staticmethod
+    def format_entry_header(line):
+        name, colon, type_ = line.strip().partition(":")
+        if colon and type_.strip():
+            return f"{name.strip()} : {type_.strip()}"
+        return replace_double_spaces(line.strip())
+
+    def __init__(self, raw_lines, line_length=None, indentation_levels=None) -> None:
+        lines = [l.rstrip() for l in raw_lines]
+        if indentation_levels is None:
+            indentation_levels = [count_indentation_level(line) for line in lines]
+        self.title = capitalize(replace_double_spaces(lines[0].strip()))
+        body_start = 2
+        body_end = len(lines)
+        while body_end > body_start and not lines[body_end - 1]:
+            body_end -= 1
+        if self.title.lower() not in self.ENTRY_SECTIONS:
+            body = lines[body_start:body_end]
+            while body and not body[0]:
+                body.pop(0)
+            base_indentation = min(
+                (count_indentation_level(line) for line in body if line), default=0
+            )
+            # Lines of the sections without entries, kept as they are
+            self.body = tuple(line[base_indentation:] for line in body)
+            self.entry_paragraphs = ()
+        else:
+            self.body = ()
+            # Header and paragraphs of the description of each entry
+            self.entry_paragraphs = tuple(
+                (
+                    self.format_entry_header(entry_lines[0]),
+                    tuple(
+                        replace_double_spaces(
+                            check_dot(" ".join(strip_all(paragraph_lines)))
+                        )
+                        for not_blank, paragraph_lines in groupby(
+                            entry_lines[1:], key=bool
+                        )
+                        if not_blank
+                    ),
+                )
+                for entry_lines in self.split_body_into_entries(
+                    lines[:body_end], body_start, indentation_levels
+                )
             )
-            self.lines += TextWrapper(
-                line_length, initial_indent=" " * 4, subsequent_indent=" " * 8
-            ).wrap(section_text)
+        self.lines = () if line_length is None else self.render(line_length)
 
-    def __str__(self) -> str:
-        return "\n".join(self.lines) + "\n"
+    def render(self, line_length: int) -> Tuple[str, ...]:
+        formatted_lines = [self.title, "-" * len(self.title), *self.body]
+        wrapper = get_text_wrapper(line_length, " " * 4, " " * 4)
+        for header, paragraphs in self.entry_paragraphs:
+            formatted_lines.append(header)
+            for i, paragraph in enumerate(paragraphs):
+                if i:
+                    formatted_lines.append("")
+                formatted_lines += wrapper.wrap(paragraph)
+        return tuple(formatted_lines)
 
-    def __repr__(self) -> str:
-        return f"IndentedSection({str(self)})"
+    @property
+    def entries(self) -> Tuple[Entry, ...]:
+        """Entries of the section, parsed from their `name : type` header.
 
-    def __eq__(self, __o: object) -> bool:
-        return str(self) == str(__o)
+        Returns:
+            Tuple[Entry, ...]: entries, whose paragraphs are joined by a blank line in
+                the description. Empty for sections without entries.
+        """
+        typed = self.title.lower() in TYPED_SECTIONS
+        entries = []
+        for header, paragraphs in self.entry_paragraphs:
+            name, separator, type_ = header.partition(" : ")
+            if not separator:
+                name, type_ = (None, header) if typed else (header, None)
+            entries.append(Entry(name, type_, "\n\n".join(paragraphs)))
+        return tuple(entries)
@@ -0,0 +1,56 @@
+from collections import namedtuple
+from typing import List
+
+
+class Docstring(
+    namedtuple("Docstring", ["delimiter", "indentation", "summary", "sections"])
+):
+    """Parsed docstring, which can be rendered at several line lengths.
+
+    The summary and the sections following it are parsed once by a formatter, see
+    `BaseFormatter.parse`. Rendering only wraps their text, it never parses the
+    docstring again.
+
+    Attributes:
+        delimiter (str): docstring delimiter, `\"\"\"` or `'''`.
+        indentation (str): indentation of the docstring.
+        summary (Summary): summary of the docstring.
+        sections (Tuple[Element, ...]): elements following the summary, e.g.
+            `IndentedSection` for Google style sections, whose `entries` give the
+            name, type and description of each argument.
+    """
+
+    __slots__ = ()
+
+    def _fits_in_one_line(self, summary_lines, line_length):
+        return (
+            not self.sections
+            and len(summary_lines) == 1
+            and len(summary_lines[0]) + len(self.delimiter) + len(self.indentation)
+            <= line_length
+        )
+
+    def render(self, line_length: int = 88, wrap_summary: bool = False) -> List[str]:
+        """Format the docstring.
+
+        Lines of all the elements, separated by a blank line and followed by the
+        closing delimiter, are appended to a single list which is then indented.
+
+        Args:
+            line_length (int): maximum line length. Defaults to 88.
+            wrap_summary (bool): whether to wrap the summary line. Defaults to False.
+
+        Returns:
+            List[str]: formatted and indented docstring lines.
+        """
+        indentation = self.indentation
+        width = line_length - len(indentation)
+        summary_lines = self.summary.render(width, wrap_summary)
+        if self._fits_in_one_line(summary_lines, line_length):
+            return [f"{indentation}{summary_lines[0]}{self.delimiter}"]
+        lines = list(summary_lines)
+        for section in self.sections:
+            lines.append("")
+            lines.extend(section.render(width))
+        lines.append(self.delimiter)
+        return [indentation + line if line else line for line in lines]
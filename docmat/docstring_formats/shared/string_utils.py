@@ -1,4 +1,17 @@
+import os
 import re
+from functools import lru_cache
+from textwrap import TextWrapper
+
+from .wrapping import GreedyWrapper
+
+SECTION_NAME_PATTERN = re.compile(r"^([^\n\:]+)\:\:?$")
+
+# Text wrappers, which produce the same lines, by name
+WRAPPERS = {"greedy": GreedyWrapper, "textwrap": TextWrapper}
+DEFAULT_WRAPPER = "greedy"
+# Environment variable selecting the text wrapper, inherited by worker processes
+WRAPPER_ENV_VAR = "DOCMAT_WRAPPER"
 
 
 def check_dot(line):
@@ -16,7 +29,7 @@ def capitalize(line):
 
 
 def get_section_name(line):
-    match = re.match(r"^([^\n\:]+)\:\:?$", line)
+    match = SECTION_NAME_PATTERN.match(line)
     if match:
         return match.group(1)
     else:
@@ -29,3 +42,37 @@ def count_indentation_level(line):
 
 def is_start_of_indented_section(line):
     return bool(get_section_name(line))
+
+
+@lru_cache(maxsize=None)
+def get_text_wrapper(width, initial_indent="", subsequent_indent=""):
+    """Get a text wrapper, shared by all the callers using the same settings.
+
+    Text wrappers hold no state between calls to `wrap`, hence they can be reused
+    instead of being created for every block of text. The wrapper is the one named by
+    the `DOCMAT_WRAPPER` environment variable, `greedy` or `textwrap`, when it is
+    first created. Defaults to `greedy`.
+
+    Args:
+        width (int): maximum length of the wrapped lines.
+        initial_indent (str): string prepended to the first line. Defaults to "".
+        subsequent_indent (str): string prepended to all the lines but the first one.
+            Defaults to "".
+
+    Raises:
+        ValueError: if the environment variable names an unknown wrapper.
+
+    Returns:
+        Union[GreedyWrapper, TextWrapper]: text wrapper.
+    """
+    name = os.environ.get(WRAPPER_ENV_VAR, DEFAULT_WRAPPER)
+    try:
+        wrapper_class = WRAPPERS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown text wrapper {name!r} in {WRAPPER_ENV_VAR}, expected one of "
+            f"{sorted(WRAPPERS)}"
+        )
+    return wrapper_class(
+        width, initial_indent=initial_indent, subsequent_indent=subsequent_indent
+    )
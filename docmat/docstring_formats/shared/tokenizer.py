@@ -0,0 +1,38 @@
+from collections import namedtuple
+from typing import List, Optional
+
+from .string_utils import count_indentation_level, is_start_of_indented_section
+
+BLANK = "blank"
+DELIMITER = "delimiter"
+SECTION_HEADER = "section_header"
+TEXT = "text"
+
+LineTokens = namedtuple("LineTokens", ["kinds", "indentation_levels"])
+
+
+def tokenize_lines(lines: List[str], delimiter: Optional[str] = None) -> LineTokens:
+    """Classify each docstring line, in a single pass.
+
+    Args:
+        lines (List[str]): docstring lines.
+        delimiter (Optional[str]): docstring delimiter, lines equal to it are
+            classified as delimiters. Defaults to None.
+
+    Returns:
+        LineTokens: kind (blank, delimiter, section header or text) and indentation
+            level of each line.
+    """
+    kinds = []
+    indentation_levels = []
+    for line in lines:
+        if not line:
+            kinds.append(BLANK)
+        elif line == delimiter:
+            kinds.append(DELIMITER)
+        elif is_start_of_indented_section(line):
+            kinds.append(SECTION_HEADER)
+        else:
+            kinds.append(TEXT)
+        indentation_levels.append(count_indentation_level(line))
+    return LineTokens(kinds, indentation_levels)
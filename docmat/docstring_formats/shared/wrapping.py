@@ -0,0 +1,70 @@
+from textwrap import TextWrapper
+from typing import List
+
+
+class GreedyWrapper:
+    """Greedy text wrapper, producing the same lines as `TextWrapper`.
+
+    Docstring text is wrapped after its whitespace is collapsed into single spaces, so
+    words are found by splitting on spaces, without the regular expression used by
+    `TextWrapper`, and lines are filled greedily. Text which needs the other features
+    of `TextWrapper`, i.e. tabs and other whitespace, repeated, leading or trailing
+    spaces, hyphenated words, or words longer than a line, is wrapped by a
+    `TextWrapper` with the same settings.
+    """
+
+    def __init__(
+        self, width: int, initial_indent: str = "", subsequent_indent: str = ""
+    ) -> None:
+        """Class Constructor.
+
+        Args:
+            width (int): maximum length of the wrapped lines.
+            initial_indent (str): string prepended to the first line. Defaults to "".
+            subsequent_indent (str): string prepended to all the lines but the first
+                one. Defaults to "".
+        """
+        self.width = width
+        self.initial_indent = initial_indent
+        self.subsequent_indent = subsequent_indent
+        self._text_wrapper = TextWrapper(
+            width, initial_indent=initial_indent, subsequent_indent=subsequent_indent
+        )
+        # Longest word fitting on any line
+        self._max_word_length = width - max(len(initial_indent), len(subsequent_indent))
+
+    def wrap(self, text: str) -> List[str]:
+        """Wrap a text.
+
+        Args:
+            text (str): text to wrap.
+
+        Returns:
+            List[str]: wrapped lines, without line endings.
+        """
+        # TextWrapper may break words at hyphens
+        if "-" in text:
+            return self._text_wrapper.wrap(text)
+        words = text.split(" ")
+        # Any other whitespace, including repeated, leading or trailing spaces, splits
+        # the text into different words. TextWrapper replaces some of it and drops
+        # words made only of whitespace at the start and end of lines
+        if words != text.split() or max(map(len, words)) > self._max_word_length:
+            return self._text_wrapper.wrap(text)
+        lines = []
+        indent = self.initial_indent
+        width = self.width - len(indent)
+        line_start = 0
+        line_length = len(words[0])
+        for i in range(1, len(words)):
+            word_length = len(words[i])
+            if line_length + 1 + word_length <= width:
+                line_length += 1 + word_length
+                continue
+            lines.append(indent + " ".join(words[line_start:i]))
+            indent = self.subsequent_indent
+            width = self.width - len(indent)
+            line_start = i
+            line_length = word_length
+        lines.append(indent + " ".join(words[line_start:]))
+        return lines
@@ -1,80 +1,392 @@
 import ast
+import io
+import os
+import shutil
+import stat
+import tempfile
+import tokenize
 from collections import namedtuple
-from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
-OffsetShift = namedtuple("OffsetShift", ["offset", "shift"])
+Edit = namedtuple("Edit", ["offset", "old_lines", "new_lines"])
 
+# Encoding of a source file, "utf-8-sig" if it starts with a BOM, and line ending of
+# its first line
+SourceEncoding = namedtuple("SourceEncoding", ["encoding", "newline"])
 
-class FileHandler:
-    """Handle file I/O operations."""
+# Formatted content written to a temporary file, which replaces the file once committed
+PendingWrite = namedtuple("PendingWrite", ["path", "tmp_path"])
 
-    def __init__(self, path: str) -> None:
+DOCUMENTABLE_NODES = (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+# In the order they appear in the source code
+STATEMENT_LIST_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+
+
+def iter_docstring_nodes(node: ast.AST) -> Iterator[ast.Expr]:
+    """Iterate over the docstring expressions of a node and of its nested statements.
+
+    Only the statement lists of compound statements are visited, expressions are never
+    descended into since they cannot contain classes or functions.
+
+    Args:
+        node (ast.AST): root node, usually the parsed module.
+
+    Yields:
+        ast.Expr: docstring expressions, in source order.
+    """
+    body = getattr(node, "body", ())
+    if isinstance(node, DOCUMENTABLE_NODES) and body:
+        first_statement = body[0]
+        if (
+            isinstance(first_statement, ast.Expr)
+            and isinstance(first_statement.value, ast.Constant)
+            and isinstance(first_statement.value.value, str)
+            # Blank docstrings are skipped, as done by ast.get_docstring
+            and first_statement.value.value.strip()
+        ):
+            yield first_statement
+    for field in STATEMENT_LIST_FIELDS:
+        for child in getattr(node, field, ()):
+            # Only compound statements have statement lists, a match statement has
+            # them in its cases only
+            if any(hasattr(child, f) for f in STATEMENT_LIST_FIELDS):
+                yield from iter_docstring_nodes(child)
+
+
+def detect_source_encoding(readline: Callable[[], bytes]) -> SourceEncoding:
+    """Detect the encoding and line ending of python source code.
+
+    The encoding is declared by a BOM or an encoding cookie, and defaults to UTF-8.
+
+    Args:
+        readline (Callable[[], bytes]): function reading the next line of the source
+            code, as `tokenize.detect_encoding`.
+
+    Returns:
+        SourceEncoding: encoding and line ending of the source code.
+    """
+    encoding, lines = tokenize.detect_encoding(readline)
+    newline = "\r\n" if lines and lines[0].endswith(b"\r\n") else "\n"
+    return SourceEncoding(encoding, newline)
+
+
+def read_source_file(path: str) -> Tuple[str, SourceEncoding]:
+    """Read a python source file, with its declared encoding.
+
+    Args:
+        path (str): file path.
+
+    Returns:
+        Tuple[str, SourceEncoding]: file content, with line endings normalized to
+            "\\n", and its encoding.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    buffer = io.BytesIO(data)
+    source_encoding = detect_source_encoding(buffer.readline)
+    buffer.seek(0)
+    with io.TextIOWrapper(buffer, source_encoding.encoding) as text:
+        return text.read(), source_encoding
+
+
+def open_temp_file(
+    path: str, source_encoding: SourceEncoding
+) -> Tuple[TextIO, PendingWrite]:
+    """Open a temporary file which will replace a file, in the same directory.
+
+    The temporary file has the permissions of the file, and the text written to it is
+    encoded with the encoding and line ending of the file. Symbolic links are resolved,
+    so that the file they point to is replaced rather than the link itself.
+
+    Args:
+        path (str): path of the file to replace.
+        source_encoding (SourceEncoding): encoding of the file.
+
+    Returns:
+        Tuple[TextIO, PendingWrite]: temporary file opened for writing, and the write to
+            commit with `commit_writes` once it is closed.
+    """
+    directory, name = os.path.split(os.path.realpath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        f = os.fdopen(
+            fd, "w", encoding=source_encoding.encoding, newline=source_encoding.newline
+        )
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    return f, PendingWrite(path, tmp_path)
+
+
+def write_temp_file(
+    path: str, content: str, source_encoding: SourceEncoding
+) -> PendingWrite:
+    """Write the new content of a file to a temporary file, see `open_temp_file`.
+
+    Args:
+        path (str): path of the file to replace.
+        content (str): new content of the file.
+        source_encoding (SourceEncoding): encoding of the file.
+
+    Returns:
+        PendingWrite: write replacing the file, to commit with `commit_writes`.
+    """
+    f, pending_write = open_temp_file(path, source_encoding)
+    try:
+        with f:
+            f.write(content)
+    except BaseException:
+        discard_writes([pending_write])
+        raise
+    return pending_write
+
+
+def get_encoded_size(content: str, source_encoding: SourceEncoding) -> int:
+    """Get the size of a file content written with the encoding of the file.
+
+    Args:
+        content (str): file content, with "\\n" line endings.
+        source_encoding (SourceEncoding): encoding and line ending of the file.
+
+    Returns:
+        int: size in bytes, as written by `write_temp_file`.
+    """
+    extra_newline_bytes = len(source_encoding.newline) - 1
+    return (
+        len(content.encode(source_encoding.encoding))
+        + content.count("\n") * extra_newline_bytes
+    )
+
+
+def _fsync(path: str, directory: bool = False):
+    if directory and os.name == "nt":
+        # Directories can't be opened on Windows
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def commit_writes(
+    pending_writes: Iterable[PendingWrite], fsync: bool = True
+) -> Dict[str, OSError]:
+    """Atomically replace files with their temporary files.
+
+    With `fsync`, all the temporary files are flushed to disk before any file is
+    replaced, and their directories are flushed once all the files are replaced, so
+    that a crash leaves each file either untouched or completely formatted. Files with
+    several hard links are overwritten in place instead, to keep their links.
+
+    Args:
+        pending_writes (Iterable[PendingWrite]): files to replace.
+        fsync (bool): whether to flush the files to disk. Defaults to True.
+
+    Returns:
+        Dict[str, OSError]: errors of the files which could not be replaced, by path.
+            Their temporary files are removed.
+    """
+    errors = {}
+    pending_writes = list(pending_writes)
+    if fsync:
+        for pending_write in pending_writes:
+            try:
+                _fsync(pending_write.tmp_path)
+            except OSError as e:
+                errors[pending_write.path] = e
+    directories = set()
+    for pending_write in pending_writes:
+        if pending_write.path not in errors:
+            try:
+                # Write through symbolic links, as done when opening the file
+                target = os.path.realpath(pending_write.path)
+                if os.stat(target).st_nlink > 1:
+                    # Replacing the file would break its other hard links, hence it
+                    # is overwritten in place, which is not atomic
+                    shutil.copyfile(pending_write.tmp_path, target)
+                    os.unlink(pending_write.tmp_path)
+                    if fsync:
+                        _fsync(target)
+                else:
+                    os.replace(pending_write.tmp_path, target)
+                directories.add(os.path.dirname(target))
+                continue
+            except OSError as e:
+                errors[pending_write.path] = e
+        discard_writes([pending_write])
+    if fsync:
+        for directory in sorted(directories):
+            _fsync(directory, directory=True)
+    return errors
+
+
+def discard_writes(pending_writes: Iterable[PendingWrite]):
+    """Remove the temporary files of writes which will not be committed.
+
+    Args:
+        pending_writes (Iterable[PendingWrite]): writes to discard.
+    """
+    for pending_write in pending_writes:
+        try:
+            os.unlink(pending_write.tmp_path)
+        except OSError:
+            pass
+
+
+class SourceHandler:
+    """Handle the docstrings of python source code held in memory."""
+
+    def __init__(self, source: str, name: str = "<string>") -> None:
         """Class constructor.
 
         Args:
-            path (str): file path.
+            source (str): python source code.
+            name (str): name of the source code, used in diffs. Defaults to
+                "<string>".
         """
-        self._file = Path(path)
-        self._initial_file_content = self._file.read_text()
-        self._file_lines = self._initial_file_content.split("\n")
-        self._offset_shifts = []
+        self._name = name
+        self._initial_file_content = source
+        self._file_lines = source.split("\n")
+        self._edits = []
+        self._formatted_file_content = None
+
+    @property
+    def initial_file_content(self):
+        return self._initial_file_content
 
     @property
     def formatted_file_content(self):
-        return "\n".join(self._file_lines)
+        if self._formatted_file_content is None:
+            self._formatted_file_content = "\n".join(self._apply_edits())
+        return self._formatted_file_content
 
     def iter_doc(self):
-        """Iterate over blocks of docstring."""
-        for element in ast.walk(ast.parse(self._initial_file_content)):
-            if type(element) in (
-                ast.AsyncFunctionDef,
-                ast.FunctionDef,
-                ast.ClassDef,
-                ast.Module,
-            ):
-                if docstring_text := ast.get_docstring(element):
-                    docstring = element.body[0]
-                    start = docstring.lineno - 1
-                    # end_lineno attribute not available in python 3.7
-                    length_docstring = len(docstring_text.split("\n"))
-                    end = start + length_docstring
-                    if self._file_lines[end - 1].strip()[-3:] in ('"""', "'''"):
-                        yield start, self._file_lines[start:end]
-                    else:
-                        yield start, self._file_lines[start : end + 1]
-
-    def _calculate_new_file_offset(self, file_offset: int):
-        for offset_shift in self._offset_shifts:
-            if file_offset >= offset_shift.offset:
-                file_offset += offset_shift.shift
-        return file_offset
-
-    def _append_offset_shift(
-        self, old_lines: List[str], new_lines: List[str], offset: int
-    ):
-        shift = len(new_lines) - len(old_lines)
-        if shift != 0:
-            self._offset_shifts.append(OffsetShift(offset + len(old_lines), shift))
+        """Iterate over blocks of docstring.
+
+        Docstrings are yielded in the order in which they appear in the file. Docstring
+        lines are always taken from the initial file content, replacing lines while
+        iterating does not affect the following docstrings.
+        """
+        for docstring in iter_docstring_nodes(ast.parse(self._initial_file_content)):
+            start = docstring.lineno - 1
+            yield start, self._file_lines[start : docstring.end_lineno]
+
+    def _apply_edits(self) -> List[str]:
+        """Splice all the replacements into the initial file lines in a single pass.
+
+        Raises:
+            ValueError: if two replacements overlap.
+
+        Returns:
+            List[str]: formatted file lines.
+        """
+        file_lines = []
+        file_offset = 0
+        for edit in sorted(self._edits, key=lambda edit: edit.offset):
+            if edit.offset < file_offset:
+                raise ValueError(
+                    f"Replacement at line {edit.offset} overlaps with a previous one"
+                )
+            file_lines.extend(self._file_lines[file_offset : edit.offset])
+            file_lines.extend(edit.new_lines)
+            file_offset = edit.offset + len(edit.old_lines)
+        file_lines.extend(self._file_lines[file_offset:])
+        return file_lines
 
     def replace_lines(self, old_lines: List[str], new_lines: List[str], offset: int):
         """Replace lines of the file.
 
+        Replacements are recorded and applied all at once when the formatted file
+        content is requested, hence they can be made in any order.
+
         Args:
             old_lines (List[str]): old lines to be replaced.
             new_lines (List[str]): new lines to replace the old one.
             offset (int): File offset (aka line number) where the old lines began in the
                 original file content.
         """
-        file_offset_start = self._calculate_new_file_offset(offset)
-        file_offset_end = file_offset_start + len(old_lines)
-        self._file_lines = (
-            self._file_lines[:file_offset_start]
-            + new_lines
-            + self._file_lines[file_offset_end:]
+        self._edits.append(Edit(offset, old_lines, new_lines))
+        self._formatted_file_content = None
+
+    @property
+    def n_changed_replacements(self) -> int:
+        """Number of replacements whose new lines differ from the old ones.
+
+        Returns:
+            int: number of changed replacements, e.g. reformatted docstrings.
+        """
+        return sum(edit.old_lines != edit.new_lines for edit in self._edits)
+
+    @property
+    def changed(self) -> bool:
+        return self.formatted_file_content != self._initial_file_content
+
+    def get_diff(self) -> str:
+        """Get the unified diff between the initial and the formatted file content.
+
+        Returns:
+            str: unified diff, empty if the file content did not change.
+        """
+        from difflib import unified_diff
+
+        return "".join(
+            unified_diff(
+                self._initial_file_content.splitlines(keepends=True),
+                self.formatted_file_content.splitlines(keepends=True),
+                fromfile=f"{self._name}\t(original)",
+                tofile=f"{self._name}\t(formatted)",
+            )
+        )
+
+
+class FileHandler(SourceHandler):
+    """Handle file I/O operations.
+
+    Files are read with their declared encoding, and written back with the same
+    encoding, BOM and line ending.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Class constructor.
+
+        Args:
+            path (str): file path.
+        """
+        self._path = path
+        content, self._source_encoding = read_source_file(path)
+        super().__init__(content, str(path))
+
+    def write_temp_file(self) -> Optional[PendingWrite]:
+        """Write the formatted file content to a temporary file.
+
+        Returns:
+            Optional[PendingWrite]: write replacing the original file, to commit with
+                `commit_writes`. None if the file content did not change.
+        """
+        if not self.changed:
+            return None
+        return write_temp_file(
+            self._path, self.formatted_file_content, self._source_encoding
         )
-        self._append_offset_shift(old_lines, new_lines, file_offset_start)
 
-    def write_formatted_file(self):
-        """Overwrite the original file with the formatted file content."""
-        self._file.write_text(self.formatted_file_content)
+    def write_formatted_file(self, fsync: bool = True) -> bool:
+        """Atomically overwrite the original file with the formatted file content.
+
+        The file is left untouched if its content did not change.
+
+        Args:
+            fsync (bool): whether to flush the file to disk. Defaults to True.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        pending_write = self.write_temp_file()
+        if pending_write is None:
+            return False
+        errors = commit_writes([pending_write], fsync)
+        if errors:
+            raise errors[pending_write.path]
+        return True
@@ -0,0 +1,81 @@
+import os
+import re
+from collections import namedtuple
+from typing import Dict, List
+
+LineRange = namedtuple("LineRange", ["start", "end"])
+
+HUNK_HEADER_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def parse_line_ranges(value: str) -> List[LineRange]:
+    """Parse line ranges in the format `START-END[,START-END...]`.
+
+    Line numbers start from 1 and both ends of a range are included.
+
+    Args:
+        value (str): line ranges, e.g. "10-40,100-120".
+
+    Raises:
+        ValueError: if the line ranges are not valid.
+
+    Returns:
+        List[LineRange]: parsed line ranges.
+    """
+    line_ranges = []
+    for line_range in value.split(","):
+        start, sep, end = line_range.strip().partition("-")
+        if not sep or not start.isdigit() or not end.isdigit():
+            raise ValueError(f"invalid line range {line_range!r}, expected START-END")
+        if not 0 < int(start) <= int(end):
+            raise ValueError(f"invalid line range {line_range!r}")
+        line_ranges.append(LineRange(int(start), int(end)))
+    return line_ranges
+
+
+def parse_unified_diff(diff: str) -> Dict[str, List[LineRange]]:
+    """Parse the lines added or changed by a unified diff, e.g. `git diff -U0`.
+
+    Args:
+        diff (str): unified diff.
+
+    Returns:
+        Dict[str, List[LineRange]]: changed line ranges of the new version of each
+            file, keyed by absolute file path. Paths in the diff are relative to the
+            current working directory, the `b/` prefix of git diffs is removed.
+    """
+    changed_lines = {}
+    line_ranges = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            path = line[4:].split("\t")[0]
+            if path == "/dev/null":
+                # Deleted file
+                line_ranges = None
+                continue
+            if path.startswith("b/"):
+                path = path[2:]
+            line_ranges = changed_lines.setdefault(os.path.abspath(path), [])
+        elif line_ranges is not None and (match := HUNK_HEADER_PATTERN.match(line)):
+            start = int(match.group(1))
+            length = int(match.group(2)) if match.group(2) is not None else 1
+            if length:
+                line_ranges.append(LineRange(start, start + length - 1))
+    return changed_lines
+
+
+def overlaps(line_ranges: List[LineRange], start: int, end: int) -> bool:
+    """Check whether a block of lines overlaps with any of the line ranges.
+
+    Args:
+        line_ranges (List[LineRange]): line ranges.
+        start (int): first line of the block, starting from 1.
+        end (int): last line of the block, included.
+
+    Returns:
+        bool: True if the block overlaps with at least one line range.
+    """
+    return any(
+        line_range.start <= end and start <= line_range.end
+        for line_range in line_ranges
+    )
@@ -0,0 +1,104 @@
+import json
+from typing import Optional, TextIO
+
+from docmat.stats import FileStats
+
+
+class JsonReport:
+    def __init__(self, file: TextIO) -> None:
+        """Class Constructor.
+
+        Machine readable report of a run, in JSON lines. A record is written for each
+        file as soon as it is added, followed by a summary record written by
+        `summary`. Only the counters of the summary are kept in memory, which stays
+        flat regardless of the number of files.
+
+        Args:
+            file (TextIO): stream where the records are written, flushed after each
+                record.
+        """
+        self._file = file
+        self.files = 0
+        self.changed = 0
+        self.errors = 0
+        self.docstrings = 0
+        self.docstrings_changed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def add(
+        self,
+        path: str,
+        changed: bool,
+        error: Optional[str],
+        stats: Optional[FileStats],
+        duration: Optional[float] = None,
+    ) -> None:
+        """Write the record of a file.
+
+        The counters of a file which could not be formatted are null, as are its
+        bytes out if its formatted size is unknown.
+
+        Args:
+            path (str): path of the file.
+            changed (bool): whether the formatting changed the file.
+            error (Optional[str]): error preventing the file from being formatted or
+                written, if any.
+            stats (Optional[FileStats]): timings and counters of the file, if any.
+            duration (Optional[float]): seconds spent on the file, used if it has no
+                stats. Defaults to None.
+        """
+        self.files += 1
+        self.changed += changed
+        self.errors += error is not None
+        record = {
+            "type": "file",
+            "path": path,
+            "changed": changed,
+            "docstrings": None,
+            "docstrings_changed": None,
+            "bytes_in": None,
+            "bytes_out": None,
+            "duration": duration,
+            "error": error,
+        }
+        if stats is not None:
+            self.docstrings += stats.docstrings
+            self.docstrings_changed += stats.docstrings_changed
+            self.bytes_in += stats.bytes
+            self.bytes_out += stats.bytes_out or 0
+            record.update(
+                docstrings=stats.docstrings,
+                docstrings_changed=stats.docstrings_changed,
+                bytes_in=stats.bytes,
+                bytes_out=stats.bytes_out,
+                duration=sum(stats.timings.values()),
+            )
+        self._write(record)
+
+    def summary(self, wall_time: float, cached: int = 0) -> None:
+        """Write the summary record of the run.
+
+        Args:
+            wall_time (float): wall time of the run, in seconds.
+            cached (int): number of files skipped because they were already formatted.
+                Defaults to 0.
+        """
+        self._write(
+            {
+                "type": "summary",
+                "files": self.files,
+                "cached": cached,
+                "changed": self.changed,
+                "errors": self.errors,
+                "docstrings": self.docstrings,
+                "docstrings_changed": self.docstrings_changed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "duration": wall_time,
+            }
+        )
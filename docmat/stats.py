@@ -0,0 +1,150 @@
+import heapq
+import sys
+import time
+from collections import defaultdict, namedtuple
+from typing import Dict, List, Optional, TextIO, Tuple
+
+PHASES = ("read", "parse", "format", "replace", "write", "stream", "cache", "diff")
+
+N_SLOWEST_FILES = 10
+
+FileStats = namedtuple(
+    "FileStats",
+    [
+        "timings",
+        "docstrings",
+        "bytes",
+        "docstring_cache_hits",
+        "docstring_cache_misses",
+        "docstrings_changed",
+        "bytes_out",
+    ],
+    # The size of the formatted file is unknown if it was not written while streaming
+    defaults=[0, None],
+)
+
+
+class PhaseTimer:
+    def __init__(self) -> None:
+        """Class Constructor.
+
+        The timer is used as a context manager around each phase, e.g.
+        `with timer.phase("read"): ...`, and accumulates the time spent in each of
+        them.
+        """
+        self.timings: Dict[str, float] = defaultdict(float)
+        self._phase: Optional[str] = None
+        self._start = 0.0
+
+    def phase(self, name: str) -> "PhaseTimer":
+        """Start timing a phase, until the end of the `with` block.
+
+        Args:
+            name (str): name of the phase, one of `PHASES`.
+
+        Returns:
+            PhaseTimer: the timer itself, to be used as a context manager.
+        """
+        self._phase = name
+        return self
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.timings[self._phase] += time.perf_counter() - self._start
+
+
+class RunStats:
+    def __init__(self) -> None:
+        """Class Constructor.
+
+        Timings and counters of the files formatted in a run, added with `add`.
+        """
+        self.files = 0
+        self.changed = 0
+        self.errors = 0
+        self.docstrings = 0
+        self.docstrings_changed = 0
+        self.bytes = 0
+        self.bytes_out = 0
+        self.docstring_cache_hits = 0
+        self.docstring_cache_misses = 0
+        self.timings: Dict[str, float] = defaultdict(float)
+        # Min-heap of the slowest files, bounded so that memory stays flat over runs
+        # of any number of files
+        self._file_times: List[Tuple[float, str]] = []
+
+    def add(self, path: str, changed: bool, error: bool, stats: Optional[FileStats]):
+        """Add the outcome of the formatting of a file.
+
+        Args:
+            path (str): path of the file.
+            changed (bool): whether the formatting of the file changed.
+            error (bool): whether the file could not be formatted.
+            stats (Optional[FileStats]): timings and counters of the file, if any.
+        """
+        self.files += 1
+        self.changed += changed
+        self.errors += error
+        if stats is None:
+            return
+        self.docstrings += stats.docstrings
+        self.docstrings_changed += stats.docstrings_changed
+        self.bytes += stats.bytes
+        if stats.bytes_out is not None:
+            self.bytes_out += stats.bytes_out
+        self.docstring_cache_hits += stats.docstring_cache_hits
+        self.docstring_cache_misses += stats.docstring_cache_misses
+        for phase, seconds in stats.timings.items():
+            self.timings[phase] += seconds
+        file_time = (sum(stats.timings.values()), path)
+        if len(self._file_times) < N_SLOWEST_FILES:
+            heapq.heappush(self._file_times, file_time)
+        else:
+            heapq.heappushpop(self._file_times, file_time)
+
+    def slowest_files(self, n: int = N_SLOWEST_FILES) -> List[Tuple[float, str]]:
+        """Get the files which took the longest to format.
+
+        Args:
+            n (int): maximum number of files, at most `N_SLOWEST_FILES` are kept.
+                Defaults to `N_SLOWEST_FILES`.
+
+        Returns:
+            List[Tuple[float, str]]: seconds spent and path of each file, slowest
+                first.
+        """
+        return sorted(self._file_times, reverse=True)[:n]
+
+    def report(self, wall_time: float, file: Optional[TextIO] = None):
+        """Print a human readable report of the run.
+
+        Timings of the phases are summed over the files, hence with several worker
+        processes their total can exceed the wall time of the run.
+
+        Args:
+            wall_time (float): wall time of the run, in seconds.
+            file (Optional[TextIO]): stream where the report is written. Defaults to
+                None, which writes to stderr.
+        """
+        lookups = self.docstring_cache_hits + self.docstring_cache_misses
+        hit_rate = self.docstring_cache_hits / lookups if lookups else 0.0
+        total = sum(self.timings.values())
+        lines = [
+            f"files: {self.files} ({self.changed} changed, {self.errors} failed), "
+            f"docstrings: {self.docstrings}, bytes: {self.bytes}",
+            f"docstring cache: {self.docstring_cache_hits} hits, "
+            f"{self.docstring_cache_misses} misses ({hit_rate:.1%} hit rate)",
+            f"wall time: {wall_time:.3f}s, time spent formatting files: {total:.3f}s",
+            f"{'phase':<10} {'time (s)':>10} {'share':>7}",
+        ]
+        for phase in PHASES:
+            seconds = self.timings.get(phase, 0.0)
+            share = seconds / total if total else 0.0
+            lines.append(f"{phase:<10} {seconds:>10.3f} {share:>7.1%}")
+        slowest_files = self.slowest_files()
+        if slowest_files:
+            lines.append("slowest files:")
+            lines += [f"{seconds:>10.3f}s {path}" for seconds, path in slowest_files]
+        print("\n".join(lines), file=file or sys.stderr)
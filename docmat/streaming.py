@@ -0,0 +1,215 @@
+import ast
+import re
+import tokenize
+from collections import namedtuple
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from docmat.api import AUTO_STYLE, format_docstring
+from docmat.file import (
+    PendingWrite,
+    detect_source_encoding,
+    discard_writes,
+    open_temp_file,
+)
+from docmat.line_ranges import LineRange, overlaps
+
+StreamingResult = namedtuple(
+    "StreamingResult", ["docstrings", "changed", "docstrings_changed"]
+)
+
+STRING_PREFIX_PATTERN = re.compile(r"[A-Za-z]*")
+
+# Tokens which can't start a statement, hence they don't end the wait for the first
+# statement of a block
+NON_STATEMENT_TOKENS = frozenset(
+    (tokenize.COMMENT, tokenize.NL, tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING)
+)
+
+
+def _is_str_literal(token: tokenize.TokenInfo) -> bool:
+    # Bytes and f-strings are not docstrings
+    prefix = STRING_PREFIX_PATTERN.match(token.string).group().lower()
+    return token.type == tokenize.STRING and "b" not in prefix and "f" not in prefix
+
+
+def _is_blank(string_tokens: List[tokenize.TokenInfo]) -> bool:
+    # Blank docstrings are skipped, as done by SourceHandler.iter_doc
+    return not ast.literal_eval(
+        " ".join(token.string for token in string_tokens)
+    ).strip()
+
+
+def format_lines_streaming(
+    lines: Iterable[str],
+    write: Callable[[str], object],
+    line_length: int,
+    wrap_summary: bool,
+    line_ranges: Optional[List[LineRange]] = None,
+    style: str = AUTO_STYLE,
+) -> StreamingResult:
+    """Format the docstrings of python source code, one line at a time.
+
+    The source code is tokenized as it is read, without building its syntax tree.
+    Docstrings are the string statements which are the first statement of a module,
+    class or function, the same ones found by `SourceHandler.iter_doc`, unless they
+    share their lines with other statements or comments. Lines are written as soon
+    as they can't be part of a docstring, so only the lines of the statement being
+    tokenized are held in memory.
+
+    Args:
+        lines (Iterable[str]): lines of the source code, including their line endings.
+        write (Callable[[str], object]): function called with the formatted source
+            code, a chunk at a time.
+        line_length (int): maximum line length.
+        wrap_summary (bool): whether to wrap the summary line.
+        line_ranges (Optional[List[LineRange]]): if given, only the docstrings
+            overlapping with these line ranges are formatted. Defaults to None.
+        style (str): docstring style, see `format_docstring`. Defaults to "auto".
+
+    Returns:
+        StreamingResult: number of docstrings formatted, whether any of them changed
+            and how many of them changed.
+    """
+    buffer = []
+    # Line number of the first line in the buffer
+    buffer_start = 1
+    lines = iter(lines)
+
+    def readline():
+        line = next(lines, "")
+        if line:
+            buffer.append(line)
+        return line
+
+    def flush(end):
+        # Write the buffered lines before line number `end`
+        nonlocal buffer_start
+        n_lines = end - buffer_start
+        if n_lines > 0:
+            write("".join(buffer[:n_lines]))
+            del buffer[:n_lines]
+            buffer_start = end
+
+    def replace_docstring(start, end):
+        nonlocal buffer_start
+        flush(start)
+        raw_lines = buffer[: end - start + 1]
+        docstring_lines = [line.rstrip("\r\n") for line in raw_lines]
+        formatted_lines = format_docstring(
+            docstring_lines, line_length, wrap_summary, style
+        )
+        line_ending = raw_lines[-1][len(raw_lines[-1].rstrip("\r\n")) :]
+        write(line_ending.join(formatted_lines) + line_ending)
+        del buffer[: end - start + 1]
+        buffer_start = end + 1
+        return formatted_lines != docstring_lines
+
+    n_docstrings = 0
+    n_changed = 0
+    # Whether the next statement is the first one of a module, class or function
+    expect_docstring = True
+    at_statement_start = True
+    in_header = False
+    depth = 0
+    candidate = None
+    for token in tokenize.generate_tokens(readline):
+        if candidate is not None:
+            if token.type == tokenize.STRING:
+                candidate.append(token)
+                continue
+            # Docstrings sharing their lines with other code or comments are left
+            # untouched, as their lines can't be replaced
+            if token.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+                start, end = candidate[0].start[0], candidate[-1].end[0]
+                if (
+                    not candidate[0].line[: candidate[0].start[1]].strip()
+                    and all(_is_str_literal(t) for t in candidate)
+                    and not _is_blank(candidate)
+                    and (line_ranges is None or overlaps(line_ranges, start, end))
+                ):
+                    n_changed += replace_docstring(start, end)
+                    n_docstrings += 1
+            candidate = None
+        if token.type in NON_STATEMENT_TOKENS:
+            continue
+        if token.type == tokenize.NEWLINE:
+            at_statement_start = True
+            flush(token.start[0] + 1)
+            continue
+        if at_statement_start and expect_docstring and token.type == tokenize.STRING:
+            candidate = [token]
+            expect_docstring = at_statement_start = False
+            continue
+        if at_statement_start:
+            expect_docstring = False
+        at_statement_start = False
+        if token.type == tokenize.NAME and token.string in ("def", "class"):
+            in_header = True
+        elif token.type == tokenize.OP:
+            if token.string in "([{":
+                depth += 1
+            elif token.string in ")]}":
+                depth -= 1
+            elif token.string == ":" and depth == 0 and in_header:
+                # The body of the class or function starts
+                in_header = False
+                expect_docstring = at_statement_start = True
+            elif token.string == ";":
+                at_statement_start = True
+    flush(buffer_start + len(buffer))
+    return StreamingResult(n_docstrings, n_changed > 0, n_changed)
+
+
+def format_file_streaming(
+    path: str,
+    line_length: int,
+    wrap_summary: bool,
+    line_ranges: Optional[List[LineRange]] = None,
+    write: bool = True,
+    style: str = AUTO_STYLE,
+) -> Tuple[StreamingResult, Optional[PendingWrite]]:
+    """Format a file with bounded memory, see `format_lines_streaming`.
+
+    The formatted file is written to a temporary file with the encoding and line
+    ending of the file, which is kept only if its content changed.
+
+    Args:
+        path (str): file path.
+        line_length (int): maximum line length.
+        wrap_summary (bool): whether to wrap the summary line.
+        line_ranges (Optional[List[LineRange]]): if given, only the docstrings
+            overlapping with these line ranges are formatted. Defaults to None.
+        write (bool): whether to write the formatted file. Defaults to True.
+        style (str): docstring style, see `format_docstring`. Defaults to "auto".
+
+    Returns:
+        Tuple[StreamingResult, Optional[PendingWrite]]: number of docstrings formatted
+            and whether the file changed, and the write replacing the file, to commit
+            with `commit_writes`. None if the file did not change or `write` is False.
+    """
+    with open(path, "rb") as f:
+        source_encoding = detect_source_encoding(f.readline)
+    with open(path, encoding=source_encoding.encoding) as source:
+        if not write:
+            result = format_lines_streaming(
+                source,
+                lambda chunk: None,
+                line_length,
+                wrap_summary,
+                line_ranges,
+                style,
+            )
+            return result, None
+        output, pending_write = open_temp_file(path, source_encoding)
+        try:
+            with output:
+                result = format_lines_streaming(
+                    source, output.write, line_length, wrap_summary, line_ranges, style
+                )
+        except BaseException:
+            discard_writes([pending_write])
+            raise
+    if not result.changed:
+        discard_writes([pending_write])
+        return result, None
+    return result, pending_write
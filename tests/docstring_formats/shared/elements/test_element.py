@@ -0,0 +1,59 @@
+import pytest
+from docmat.docstring_formats.shared import (
+    Element,
+    IndentedSection,
+    NewLine,
+    Summary,
+    UnderlinedSection,
+    UnindentedSection,
+)
+
+ELEMENTS = [
+    lambda: Summary("summary line", '"""'),
+    lambda: NewLine(),
+    lambda: UnindentedSection(["some text", "on two lines"], 60),
+    lambda: IndentedSection(["args:", "    x (int): value"], 60),
+    lambda: UnderlinedSection(["Returns", "-------", "int", "    value"], 60),
+]
+
+
+@pytest.mark.parametrize("build", ELEMENTS)
+def test_structural_equality(build):
+    element, other = build(), build()
+    assert element is not other
+    assert element == other
+    assert hash(element) == hash(other)
+    assert len({element, other}) == 1
+    assert isinstance(element.lines, tuple)
+    assert not hasattr(element, "__dict__")
+
+
+@pytest.mark.parametrize("build", ELEMENTS)
+def test_immutable(build):
+    element = build()
+    with pytest.raises(AttributeError):
+        element.lines = ("changed",)
+    with pytest.raises(AttributeError):
+        del element.lines
+    assert element == build()
+
+
+def test_element_is_abstract():
+    with pytest.raises(TypeError):
+        Element()
+
+
+def test_elements_of_different_types_are_not_equal():
+    unindented = UnindentedSection(["note."], 60)
+    indented = IndentedSection(["note."], 60)
+    assert unindented.lines == indented.lines
+    assert unindented != indented
+    assert unindented != "Note.\n"
+
+
+def test_elements_with_different_lines_are_not_equal():
+    assert UnindentedSection(["first"], 60) != UnindentedSection(["second"], 60)
+
+
+def test_repr():
+    assert repr(UnindentedSection(["text"], 60)) == "UnindentedSection(text='Text.')"
@@ -1,5 +1,5 @@
 import pytest
-from docmat.docstring_formats.shared.elements import IndentedSection
+from docmat.docstring_formats.shared.elements import Entry, IndentedSection
 
 
 @pytest.mark.parametrize(
@@ -13,3 +13,42 @@ from docmat.docstring_formats.shared.elements import IndentedSection
 )
 def test_split_body_into_sections(test_input, expected):
     assert list(IndentedSection.split_body_into_sections(test_input, 0)) == expected
+
+
+@pytest.mark.parametrize(
+    ["test_input", "expected"],
+    [
+        (
+            [
+                "Args:",
+                "    x (Dict[str, int]): first (optional)",
+                "        value",
+                "    *args: others",
+                "    not an entry",
+            ],
+            (
+                Entry("x", "Dict[str, int]", "first (optional) value."),
+                Entry("*args", None, "others."),
+                Entry(None, None, "not an entry."),
+            ),
+        ),
+        (
+            [
+                "Args:",
+                "    y (str): mode, e.g. (a): b",
+                "    f (Callable[[int], Tuple(int)]): callback",
+            ],
+            (
+                Entry("y", "str", "mode, e.g. (a): b."),
+                Entry("f", "Callable[[int], Tuple(int)]", "callback."),
+            ),
+        ),
+        (
+            ["Raises:", "    ValueError: if x", "    TypeError"],
+            (Entry(None, "ValueError", "if x."), Entry(None, None, "TypeError.")),
+        ),
+        (["Example::", "", "    f(x)"], (Entry(None, None, "f(x)."),)),
+    ],
+)
+def test_entries(test_input, expected):
+    assert IndentedSection(test_input).entries == expected
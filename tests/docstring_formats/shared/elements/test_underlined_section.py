@@ -0,0 +1,73 @@
+import pytest
+from docmat.docstring_formats.shared.elements import Entry, UnderlinedSection
+
+
+@pytest.mark.parametrize(
+    ["test_input", "expected"],
+    [
+        (
+            ["x : int", "    text 1", "", "    text 2", "y", "    text 3"],
+            [["x : int", "    text 1", "", "    text 2"], ["y", "    text 3"]],
+        ),
+        (["", "x", "y", ""], [["x"], ["y", ""]]),
+    ],
+)
+def test_split_body_into_entries(test_input, expected):
+    indentation_levels = [len(line) - len(line.lstrip()) for line in test_input]
+    entries = UnderlinedSection.split_body_into_entries(
+        test_input, 0, indentation_levels
+    )
+    assert list(entries) == expected
+
+
+@pytest.mark.parametrize(
+    ["test_input", "line_length", "expected"],
+    [
+        (
+            ["parameters", "---", "x  :int", "    first  value", "y", ""],
+            88,
+            ["Parameters", "----------", "x : int", "    first value.", "y"],
+        ),
+        (
+            ["Returns", "-------", "int", "    a long description of the value"],
+            24,
+            [
+                "Returns",
+                "-------",
+                "int",
+                "    a long description",
+                "    of the value.",
+            ],
+        ),
+        (
+            ["Raises", "------", "ValueError", "    if x.", "", "    or y"],
+            88,
+            ["Raises", "------", "ValueError", "    if x.", "", "    or y."],
+        ),
+        (
+            ["Examples", "--------", "", "    >>> f(1,", "    ...   2)", "    3", ""],
+            88,
+            ["Examples", "--------", ">>> f(1,", "...   2)", "3"],
+        ),
+    ],
+)
+def test_underlined_section(test_input, line_length, expected):
+    assert UnderlinedSection(test_input, line_length).lines == tuple(expected)
+
+
+@pytest.mark.parametrize(
+    ["test_input", "expected"],
+    [
+        (
+            ["Parameters", "---", "x :int", "    first", "", "    second", "y"],
+            (Entry("x", "int", "first.\n\nsecond."), Entry("y", None, "")),
+        ),
+        (
+            ["Returns", "-------", "int", "    value", "total : int", "    sum"],
+            (Entry(None, "int", "value."), Entry("total", "int", "sum.")),
+        ),
+        (["Notes", "-----", "x : int"], ()),
+    ],
+)
+def test_entries(test_input, expected):
+    assert UnderlinedSection(test_input).entries == expected
@@ -0,0 +1,26 @@
+import pytest
+from docmat.docstring_formats.shared.classifier import detect_style
+
+
+@pytest.mark.parametrize(
+    ["test_input", "expected"],
+    [
+        (['"""Summary."""'], None),
+        (['"""Summary.', "", "Args:", "    x (int): value.", '"""'], "google"),
+        (['"""Summary.', "", "    returns:", "        int: value.", '"""'], "google"),
+        (['"""Summary.', "", "Parameters", "----------", "x : int", '"""'], "numpy"),
+        (
+            ['"""Summary.', "", "As follows:", "", "Returns", "-------", "int", '"""'],
+            "numpy",
+        ),
+        (['"""Summary.', "", "---", '"""'], None),
+        (['"""Summary.', "", "Widgets", "-------", "Mocked widgets.", '"""'], None),
+        (
+            ['"""Summary.', "", "Usage", "-----", "", "Args:", "    x: value.", '"""'],
+            "google",
+        ),
+        (['"""Summary.', "", "Text", "- item", '"""'], None),
+    ],
+)
+def test_detect_style(test_input, expected):
+    assert detect_style(test_input) == expected
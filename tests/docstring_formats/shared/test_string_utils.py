@@ -0,0 +1,24 @@
+import pytest
+from docmat.docstring_formats.shared.string_utils import (
+    get_section_name,
+    get_text_wrapper,
+)
+
+
+@pytest.mark.parametrize(
+    ["line", "expected"],
+    [("Args:", "Args"), ("Example::", "Example"), ("Text: more text", None)],
+)
+def test_get_section_name(line, expected):
+    assert get_section_name(line) == expected
+
+
+def test_get_text_wrapper_is_shared():
+    wrapper = get_text_wrapper(20, "    ", "        ")
+    assert get_text_wrapper(20, "    ", "        ") is wrapper
+    assert get_text_wrapper(20) is not wrapper
+    assert wrapper.wrap("This text is wrapped on three lines") == [
+        "    This text is",
+        "        wrapped on",
+        "        three lines",
+    ]
@@ -0,0 +1,98 @@
+import random
+from textwrap import TextWrapper
+
+import pytest
+from docmat.docstring_formats.shared.string_utils import get_text_wrapper
+from docmat.docstring_formats.shared.wrapping import GreedyWrapper
+
+WORDS = [
+    "a",
+    "word",
+    "sentence.",
+    "(parenthesis)",
+    "x" * 15,
+    "x" * 40,
+    "well-known",
+    "em--dash",
+    "-",
+    "tab\there",
+    "line\nbreak",
+    "\xa0",
+    "\x1f",
+    "non breaking",
+    "é",
+    "",
+    " ",
+]
+
+
+@pytest.mark.parametrize(
+    ["text", "width", "initial_indent", "subsequent_indent"],
+    [
+        ("", 20, "", ""),
+        ("one", 20, "", ""),
+        ("This text is wrapped on three lines", 20, "    ", "        "),
+        ("exactly twenty chars and more", 20, "", ""),
+        ("a b c d e f g h i j k l m n o p", 3, "", ""),
+        ("long words like supercalifragilistic", 10, "", "  "),
+        ("hyphen-ated words are broken at hyphens", 12, "", ""),
+        ("  leading and trailing spaces  ", 10, "", ""),
+        ("tabs\tand\nnewlines", 8, "", ""),
+        ("indent longer than the width", 4, "    ", "    "),
+    ],
+)
+def test_greedy_wrapper(text, width, initial_indent, subsequent_indent):
+    greedy_wrapper = GreedyWrapper(width, initial_indent, subsequent_indent)
+    text_wrapper = TextWrapper(
+        width, initial_indent=initial_indent, subsequent_indent=subsequent_indent
+    )
+    try:
+        expected = text_wrapper.wrap(text)
+    except ValueError:
+        with pytest.raises(ValueError):
+            greedy_wrapper.wrap(text)
+    else:
+        assert greedy_wrapper.wrap(text) == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_greedy_wrapper_random_texts(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        width = rng.randint(12, 60)
+        indents = ("", "    ", "        ")
+        initial_indent, subsequent_indent = rng.choice(indents), rng.choice(indents)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30)))
+        assert GreedyWrapper(width, initial_indent, subsequent_indent).wrap(
+            text
+        ) == TextWrapper(
+            width, initial_indent=initial_indent, subsequent_indent=subsequent_indent
+        ).wrap(
+            text
+        )
+
+
+@pytest.mark.parametrize(
+    ["wrapper", "expected_class"],
+    [(None, GreedyWrapper), ("greedy", GreedyWrapper), ("textwrap", TextWrapper)],
+)
+def test_get_text_wrapper_selection(monkeypatch, wrapper, expected_class):
+    if wrapper is None:
+        monkeypatch.delenv("DOCMAT_WRAPPER", raising=False)
+    else:
+        monkeypatch.setenv("DOCMAT_WRAPPER", wrapper)
+    get_text_wrapper.cache_clear()
+    try:
+        assert type(get_text_wrapper(20)) is expected_class
+    finally:
+        get_text_wrapper.cache_clear()
+
+
+def test_get_text_wrapper_unknown(monkeypatch):
+    monkeypatch.setenv("DOCMAT_WRAPPER", "knuth")
+    get_text_wrapper.cache_clear()
+    try:
+        with pytest.raises(ValueError):
+            get_text_wrapper(20)
+    finally:
+        get_text_wrapper.cache_clear()
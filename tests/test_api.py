@@ -0,0 +1,92 @@
+import pytest
+from docmat import format_docstring, format_docstrings, format_source, parse_docstring
+from docmat.api import get_docstring_cache_stats
+
+SOURCE = '''def func():
+    """summary"""
+'''
+
+
+def test_format_source():
+    expected = '''def func():
+    """Summary."""
+'''
+    assert format_source(SOURCE) == expected
+
+
+def test_format_source_line_length():
+    source = '"""Very long summary line which should be wrapped."""\n'
+    assert format_source(source, line_length=20, wrap_summary=True) == (
+        '"""Very long summary\nline which should be\nwrapped.\n"""\n'
+    )
+
+
+DOCSTRINGS = [
+    ['    """summary', "", "    args:", "    x (int): value.", '    """'],
+    ["'''summary'''"],
+    ['"""Summary.', "", "Returns:", "    int: value.", '"""'],
+]
+
+
+@pytest.mark.parametrize("jobs, chunksize", [(1, 256), (2, 1), (2, 2)])
+def test_format_docstrings(jobs, chunksize):
+    docstrings = iter(DOCSTRINGS * 5)
+    formatted = format_docstrings(docstrings, jobs=jobs, chunksize=chunksize)
+    assert list(formatted) == [format_docstring(lines) for lines in DOCSTRINGS * 5]
+
+
+def test_format_docstrings_is_lazy():
+    docstrings = iter(DOCSTRINGS)
+    formatted = format_docstrings(docstrings, line_length=20)
+    assert next(formatted) == [
+        '    """Summary.',
+        "",
+        "    Args:",
+        "        x (int):",
+        "            value.",
+        '    """',
+    ]
+    assert next(docstrings) == DOCSTRINGS[1]
+
+
+def test_format_docstring_cache():
+    docstring = ['    """cached summary"""']
+    before = get_docstring_cache_stats()
+    formatted = format_docstring(docstring, line_length=71)
+    formatted.append("mutated")
+    assert format_docstring(docstring, line_length=71) == ['    """Cached summary."""']
+    after = get_docstring_cache_stats()
+    assert (after.hits - before.hits, after.misses - before.misses) == (1, 1)
+
+
+NUMPY_DOCSTRING = ['"""summary', "", "Returns", "-------", "int", "    value", '"""']
+NUMPY_EXPECTED = ['"""Summary.', "", "Returns", "-------", "int", "    value.", '"""']
+
+
+@pytest.mark.parametrize(
+    ["style", "expected"],
+    [
+        ("auto", NUMPY_EXPECTED),
+        ("numpy", NUMPY_EXPECTED),
+        ("google", ['"""Summary.', "", "Returns ------- int value.", '"""']),
+    ],
+)
+def test_format_docstring_style(style, expected):
+    assert format_docstring(NUMPY_DOCSTRING, style=style) == expected
+
+
+def test_format_docstring_unknown_style():
+    with pytest.raises(ValueError):
+        format_docstring(NUMPY_DOCSTRING, style="sphinx")
+
+
+@pytest.mark.parametrize(
+    ["docstring", "style"],
+    [(lines, "auto") for lines in DOCSTRINGS] + [(NUMPY_DOCSTRING, "numpy")],
+)
+def test_parse_docstring(docstring, style):
+    parsed = parse_docstring(docstring, style)
+    for line_length in (20, 40, 88):
+        assert parsed.render(line_length) == format_docstring(
+            docstring, line_length, style=style
+        )
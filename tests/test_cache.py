@@ -0,0 +1,62 @@
+import os
+
+from docmat.cache import Cache
+
+
+def test_cache_roundtrip(tmp_path):
+    file = tmp_path / "file.py"
+    file.write_text("pass\n")
+    cache = Cache(tmp_path / "cache", 88, False)
+    assert not cache.is_formatted(str(file))
+    cache.update(str(file))
+    assert cache.is_formatted(str(file))
+    cache.write()
+
+    assert Cache(tmp_path / "cache", 88, False).is_formatted(str(file))
+    assert not Cache(tmp_path / "cache", 79, False).is_formatted(str(file))
+    assert not Cache(tmp_path / "cache", 88, True).is_formatted(str(file))
+    assert not Cache(tmp_path / "cache", 88, False, low_memory=True).is_formatted(
+        str(file)
+    )
+
+
+def test_cache_invalidation(tmp_path):
+    file = tmp_path / "file.py"
+    file.write_text("pass\n")
+    cache = Cache(tmp_path / "cache", 88, False)
+    cache.update(str(file))
+
+    # Same content with a different modification time is still formatted
+    os.utime(file, (0, 0))
+    assert cache.is_formatted(str(file))
+
+    # Different content with the same size is not
+    file.write_text("Pass\n")
+    assert not cache.is_formatted(str(file))
+
+
+def test_corrupted_cache(tmp_path):
+    file = tmp_path / "file.py"
+    file.touch()
+    cache = Cache(tmp_path, 88, False)
+    cache.update(str(file))
+    cache.write()
+    for cache_file in tmp_path.glob("cache.*.json"):
+        cache_file.write_text("{not json")
+    assert not Cache(tmp_path, 88, False).is_formatted(str(file))
+
+
+def test_cache_written_only_if_changed(tmp_path):
+    file = tmp_path / "file.py"
+    file.touch()
+    cache = Cache(tmp_path / "cache", 88, False)
+    cache.write()
+    assert not (tmp_path / "cache").exists()
+    cache.update(str(file))
+    cache.write()
+    (cache_file,) = (tmp_path / "cache").glob("cache.*.json")
+    mtime = cache_file.stat().st_mtime_ns
+    cache = Cache(tmp_path / "cache", 88, False)
+    assert cache.is_formatted(str(file))
+    cache.write()
+    assert cache_file.stat().st_mtime_ns == mtime
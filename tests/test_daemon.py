@@ -0,0 +1,126 @@
+import http.client
+import socket
+import threading
+
+import pytest
+from docmat.daemon import MAX_BODY_SIZE, make_server
+
+UNFORMATTED = 'def func():\n    """summary"""\n'
+FORMATTED = 'def func():\n    """Summary."""\n'
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self._path)
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def connect(request, tmp_path):
+    if request.param == "tcp":
+        server = make_server("localhost", 0)
+        port = server.server_address[1]
+
+        def connection_factory():
+            return http.client.HTTPConnection("localhost", port)
+
+    else:
+        path = str(tmp_path / "docmatd.sock")
+        server = make_server(socket=path)
+
+        def connection_factory():
+            return UnixHTTPConnection(path)
+
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield connection_factory
+    server.shutdown()
+    server.server_close()
+
+
+def post(connection, body, headers=None):
+    connection.request("POST", "/", body=body.encode(), headers=headers or {})
+    response = connection.getresponse()
+    return response.status, response.read().decode()
+
+
+def test_format(connect):
+    assert post(connect(), UNFORMATTED) == (200, FORMATTED)
+    assert post(connect(), FORMATTED) == (204, "")
+
+
+def test_format_crlf(connect):
+    source = 'def f():\r\n    """summary\r\n    more text\r\n    """\r\n'
+    source += "    return 1\r\n"
+    expected = 'def f():\r\n    """Summary more text."""\r\n    return 1\r\n'
+    assert post(connect(), source) == (200, expected)
+    assert post(connect(), expected) == (204, "")
+
+
+def test_format_options(connect):
+    source = '"""Very long summary line which should be wrapped."""\n'
+    headers = {"X-Line-Length": "20", "X-Wrap-Summary": "true"}
+    assert post(connect(), source, headers) == (
+        200,
+        '"""Very long summary\nline which should be\nwrapped.\n"""\n',
+    )
+
+
+def test_invalid_request(connect):
+    status, _ = post(connect(), UNFORMATTED, {"X-Line-Length": "eighty"})
+    assert status == 400
+    status, _ = post(connect(), UNFORMATTED, {"X-Style": "sphinx"})
+    assert status == 400
+    status, body = post(connect(), "def func(:\n")
+    assert status == 500
+    assert body.startswith("SyntaxError")
+
+
+@pytest.mark.parametrize(
+    ["content_length", "expected_status"],
+    [(None, 411), ("abc", 400), ("-1", 400), (str(MAX_BODY_SIZE + 1), 413)],
+)
+def test_invalid_content_length(connect, content_length, expected_status):
+    connection = connect()
+    connection.putrequest("POST", "/", skip_accept_encoding=True)
+    if content_length is not None:
+        connection.putheader("Content-Length", content_length)
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == expected_status
+    response.read()
+    connection.close()
+
+
+def test_socket_path_not_a_socket(tmp_path):
+    path = tmp_path / "notasocket.txt"
+    path.write_text("keep")
+    with pytest.raises(FileExistsError):
+        make_server(socket=str(path))
+    assert path.read_text() == "keep"
+
+
+def test_socket_path_stale_socket(tmp_path):
+    path = str(tmp_path / "docmatd.sock")
+    make_server(socket=path).server_close()
+    make_server(socket=path).server_close()
+
+
+def test_concurrent_requests(connect):
+    results = []
+
+    def request():
+        results.append(post(connect(), UNFORMATTED))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [(200, FORMATTED)] * 8
@@ -0,0 +1,141 @@
+import os
+import re
+
+import pytest
+from docmat.discovery import DEFAULT_EXCLUDES, Gitignore, iter_files, parse_gitignore
+
+
+@pytest.mark.parametrize(
+    ["pattern", "path", "is_dir", "expected"],
+    [
+        ("*.py", "a.py", False, True),
+        ("*.py", "sub/a.py", False, True),
+        ("*.py", "a.pyc", False, None),
+        ("/a.py", "sub/a.py", False, None),
+        ("sub/*.py", "sub/a.py", False, True),
+        ("sub/*.py", "other/sub/a.py", False, None),
+        ("build/", "build", True, True),
+        ("build/", "build", False, None),
+        ("**/gen", "a/b/gen", True, True),
+        ("a/**/gen", "a/gen", True, True),
+        ("a/**/gen", "a/b/c/gen", True, True),
+        ("a/**", "a/b/c.py", False, True),
+        ("mod_[0-9].py", "mod_1.py", False, True),
+        ("mod_[!0-9].py", "mod_1.py", False, None),
+        ("mod_?.py", "mod_12.py", False, None),
+        ("\\#file.py", "#file.py", False, True),
+        ("# comment", "# comment", False, None),
+    ],
+)
+def test_gitignore_pattern(pattern, path, is_dir, expected):
+    assert Gitignore(parse_gitignore([pattern])).match(path, is_dir) is expected
+
+
+def test_gitignore_negation():
+    gitignore = Gitignore(parse_gitignore(["*_pb2.py", "!keep_pb2.py"]))
+    assert gitignore.match("a_pb2.py", False) is True
+    assert gitignore.match("keep_pb2.py", False) is False
+
+
+def make_tree(root, paths):
+    for path in paths:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).touch()
+
+
+def relative(root, paths):
+    return [os.path.relpath(path, root) for path in paths]
+
+
+def test_iter_files_default_excludes(tmp_path):
+    make_tree(
+        tmp_path,
+        [
+            "a.py",
+            "a.txt",
+            ".git/hook.py",
+            ".venv/lib/site.py",
+            "build/lib.py",
+            "node_modules/pkg/gen.py",
+            "src/build_utils.py",
+            "src/pkg/__init__.py",
+        ],
+    )
+    paths = iter_files([str(tmp_path)], re.compile(DEFAULT_EXCLUDES))
+    assert relative(tmp_path, paths) == [
+        "a.py",
+        "src/build_utils.py",
+        "src/pkg/__init__.py",
+    ]
+
+
+def test_iter_files_extend_exclude(tmp_path):
+    make_tree(tmp_path, ["a.py", "build/b.py", "gen/c.py", "src/d_test.py"])
+    extend_exclude = re.compile(r"/gen/|_test\.py$")
+    paths = iter_files([str(tmp_path)], re.compile(DEFAULT_EXCLUDES), extend_exclude)
+    assert relative(tmp_path, paths) == ["a.py"]
+    paths = iter_files([str(tmp_path)], None, extend_exclude)
+    assert relative(tmp_path, paths) == ["a.py", "build/b.py"]
+
+
+def test_iter_files_gitignore(tmp_path):
+    make_tree(
+        tmp_path,
+        [
+            ".git/HEAD",
+            "a_pb2.py",
+            "src/a.py",
+            "src/b_pb2.py",
+            "src/keep_pb2.py",
+            "src/local.py",
+            "src/generated/c.py",
+            "src/sub/local.py",
+        ],
+    )
+    (tmp_path / ".gitignore").write_text("*_pb2.py\n!keep_pb2.py\ngenerated/\n")
+    (tmp_path / "src" / ".gitignore").write_text("/local.py\n")
+    paths = iter_files([str(tmp_path)], gitignore=True)
+    assert relative(tmp_path, paths) == [
+        "src/a.py",
+        "src/keep_pb2.py",
+        "src/sub/local.py",
+    ]
+    # The .gitignore files of the parent directories apply too
+    paths = iter_files([str(tmp_path / "src")], gitignore=True)
+    assert relative(tmp_path, paths) == [
+        "src/a.py",
+        "src/keep_pb2.py",
+        "src/sub/local.py",
+    ]
+    assert len(list(iter_files([str(tmp_path)]))) == 7
+
+
+def test_iter_files_explicit_paths(tmp_path):
+    make_tree(tmp_path, ["build/a.py", "b.py", "c.txt"])
+    (tmp_path / ".gitignore").write_text("b.py\n")
+    paths = [
+        str(tmp_path / "build" / "a.py"),
+        str(tmp_path / "b.py"),
+        str(tmp_path / "c.txt"),
+        str(tmp_path / "missing.py"),
+    ]
+    exclude = re.compile(DEFAULT_EXCLUDES)
+    # Files passed explicitly are never excluded
+    assert list(iter_files(paths, exclude, gitignore=True)) == paths[:2]
+
+
+def test_iter_files_deduplication(tmp_path):
+    make_tree(tmp_path, ["a.py", "sub/b.py"])
+    file_globs = [
+        str(tmp_path / "a.py"),
+        str(tmp_path),
+        str(tmp_path / "*.py"),
+        str(tmp_path / "sub" / ".." / "a.py"),
+    ]
+    assert relative(tmp_path, iter_files(file_globs)) == ["a.py", "sub/b.py"]
+
+
+def test_iter_files_does_not_follow_symlinks(tmp_path):
+    make_tree(tmp_path, ["sub/a.py"])
+    os.symlink(tmp_path, tmp_path / "sub" / "loop")
+    assert relative(tmp_path, iter_files([str(tmp_path)])) == ["sub/a.py"]
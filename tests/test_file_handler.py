@@ -1,5 +1,15 @@
+import os
+import sys
+
 import pytest
-from docmat.file import FileHandler
+from docmat.file import (
+    FileHandler,
+    PendingWrite,
+    commit_writes,
+    discard_writes,
+    get_encoded_size,
+    read_source_file,
+)
 
 TEST_INPUTS = [
     (
@@ -228,3 +238,232 @@ def test_write_file(tmp_path):
     handler.replace_lines(["b"], ["foo"], 1)
     handler.write_formatted_file()
     assert test_file.read_text() == "\n".join(["a", "foo", "c"])
+
+
+def test_iter_doc_after_replace_lines(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text(
+        '"""Module."""\n\n\ndef func():\n    """Function."""\n    pass\n'
+    )
+    handler = FileHandler(test_file)
+    docs = handler.iter_doc()
+    offset, lines = next(docs)
+    handler.replace_lines(lines, ['"""', "Module.", '"""'], offset)
+    assert next(docs) == (4, ['    """Function."""'])
+
+
+def test_write_unchanged_file(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text("\n".join(["a", "b", "c"]))
+    mtime = test_file.stat().st_mtime_ns
+    handler = FileHandler(test_file)
+    handler.replace_lines(["b"], ["b"], 1)
+    assert not handler.changed
+    assert not handler.write_formatted_file()
+    assert test_file.stat().st_mtime_ns == mtime
+
+
+def test_get_diff(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text("\n".join(["a", "b", "c", ""]))
+    handler = FileHandler(test_file)
+    assert handler.get_diff() == ""
+    handler.replace_lines(["b"], ["foo"], 1)
+    assert handler.get_diff().splitlines()[2:] == [
+        "@@ -1,3 +1,3 @@",
+        " a",
+        "-b",
+        "+foo",
+        " c",
+    ]
+
+
+def test_replace_lines_any_order(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text("\n".join(["a", "b", "c", "d"]))
+    handler = FileHandler(test_file)
+    handler.replace_lines(["c"], ["fizz", "buzz"], 2)
+    handler.replace_lines(["a"], [], 0)
+    assert handler.formatted_file_content == "\n".join(["b", "fizz", "buzz", "d"])
+
+
+def test_replace_lines_overlapping(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text("\n".join(["a", "b", "c", "d"]))
+    handler = FileHandler(test_file)
+    handler.replace_lines(["a", "b"], ["foo"], 0)
+    handler.replace_lines(["b", "c"], ["bar"], 1)
+    with pytest.raises(ValueError):
+        handler.formatted_file_content
+
+
+@pytest.mark.parametrize(
+    ["content", "expected"],
+    [
+        (
+            """\
+class A:
+    '''
+    Class docstring starting with a blank line.
+    '''
+
+    if True:
+        def f(self):
+            '''F.'''
+    else:
+        try:
+            pass
+        except ValueError:
+            async def g():
+                b'''Not a docstring.'''
+                def h():
+                    '''H.'''
+
+
+def empty():
+    '''  '''
+""",
+            [
+                (
+                    1,
+                    [
+                        "    '''",
+                        "    Class docstring starting with a blank line.",
+                        "    '''",
+                    ],
+                ),
+                (7, ["            '''F.'''"]),
+                (15, ["                    '''H.'''"]),
+            ],
+        ),
+        (
+            """\
+try:
+    pass
+except ValueError:
+    def a():
+        '''A.'''
+else:
+    def b():
+        '''B.'''
+finally:
+    def c():
+        '''C.'''
+""",
+            [
+                (4, ["        '''A.'''"]),
+                (7, ["        '''B.'''"]),
+                (10, ["        '''C.'''"]),
+            ],
+        ),
+        pytest.param(
+            """\
+match x:
+    case 1:
+        def f():
+            '''F.'''
+    case _:
+        class A:
+            '''A.'''
+""",
+            [(3, ["            '''F.'''"]), (6, ["            '''A.'''"])],
+            marks=pytest.mark.skipif(
+                sys.version_info < (3, 10), reason="match requires python 3.10"
+            ),
+        ),
+    ],
+)
+def test_iter_doc_nested_statements(tmp_path, content, expected):
+    test_file = tmp_path / "test"
+    test_file.write_text(content)
+    assert list(FileHandler(test_file).iter_doc()) == expected
+
+
+@pytest.mark.parametrize(
+    ["content", "expected"],
+    [
+        (b"a\nb\n", b"a\nfoo\n"),
+        (b"a\r\nb\r\n", b"a\r\nfoo\r\n"),
+        (b"\xef\xbb\xbfa\nb\n", b"\xef\xbb\xbfa\nfoo\n"),
+        (b"# coding: latin-1\r\n\xe9\r\n", b"# coding: latin-1\r\nfoo\r\n"),
+    ],
+)
+def test_write_file_keeps_encoding(tmp_path, content, expected):
+    test_file = tmp_path / "test.py"
+    test_file.write_bytes(content)
+    test_file.chmod(0o604)
+    handler = FileHandler(str(test_file))
+    assert "\r" not in handler.initial_file_content
+    old_lines = handler.initial_file_content.split("\n")[1:2]
+    handler.replace_lines(old_lines, ["foo"], 1)
+    _, source_encoding = read_source_file(str(test_file))
+    formatted_size = get_encoded_size(handler.formatted_file_content, source_encoding)
+    assert formatted_size == len(expected)
+    assert handler.write_formatted_file()
+    assert test_file.read_bytes() == expected
+    assert test_file.stat().st_mode & 0o777 == 0o604
+    assert os.listdir(tmp_path) == ["test.py"]
+
+
+def test_n_changed_replacements(tmp_path):
+    test_file = tmp_path / "test.py"
+    test_file.write_text("a\nb\nc\n")
+    handler = FileHandler(str(test_file))
+    handler.replace_lines(["a"], ["a"], 0)
+    handler.replace_lines(["c"], ["foo", "bar"], 2)
+    assert handler.n_changed_replacements == 1
+
+
+def test_write_temp_file(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text("a\nb\n")
+    handler = FileHandler(str(test_file))
+    handler.replace_lines(["b"], ["foo"], 1)
+    pending_write = handler.write_temp_file()
+    assert test_file.read_text() == "a\nb\n"
+    assert commit_writes([pending_write]) == {}
+    assert test_file.read_text() == "a\nfoo\n"
+    assert os.listdir(tmp_path) == ["test"]
+
+
+def test_write_file_through_symlink(tmp_path):
+    (tmp_path / "target").mkdir()
+    test_file = tmp_path / "target" / "test"
+    test_file.write_text("a\nb\n")
+    hard_link = tmp_path / "target" / "hard_link"
+    os.link(test_file, hard_link)
+    symlink = tmp_path / "link"
+    symlink.symlink_to(test_file)
+    handler = FileHandler(str(symlink))
+    handler.replace_lines(["b"], ["foo"], 1)
+    assert handler.write_formatted_file()
+    assert symlink.is_symlink()
+    assert test_file.read_text() == "a\nfoo\n"
+    assert sorted(os.listdir(tmp_path / "target")) == ["hard_link", "test"]
+    assert hard_link.read_text() == "a\nfoo\n"
+    assert os.stat(hard_link).st_ino == os.stat(test_file).st_ino
+
+
+def test_commit_writes_error(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text("a\nb\n")
+    handler = FileHandler(str(test_file))
+    handler.replace_lines(["b"], ["foo"], 1)
+    pending_writes = [
+        handler.write_temp_file(),
+        PendingWrite(str(tmp_path / "other"), str(tmp_path / "missing.tmp")),
+    ]
+    errors = commit_writes(pending_writes)
+    assert list(errors) == [str(tmp_path / "other")]
+    assert test_file.read_text() == "a\nfoo\n"
+    assert os.listdir(tmp_path) == ["test"]
+
+
+def test_discard_writes(tmp_path):
+    test_file = tmp_path / "test"
+    test_file.write_text("a\nb\n")
+    handler = FileHandler(str(test_file))
+    handler.replace_lines(["b"], ["foo"], 1)
+    discard_writes([handler.write_temp_file()])
+    assert test_file.read_text() == "a\nb\n"
+    assert os.listdir(tmp_path) == ["test"]
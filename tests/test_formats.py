@@ -1,7 +1,9 @@
 from textwrap import dedent
 
 import pytest
+from docmat.docstring_formats import FORMATTERS, get_formatter
 from docmat.docstring_formats.google.docstring import GoogleFormatter
+from docmat.docstring_formats.numpy import NumpyFormatter
 from docmat.docstring_formats.shared import IndentedSection, UnindentedSection
 
 TEST_INPUTS_DETECT_SUMMARY = [
@@ -290,6 +292,18 @@ TEST_INPUTS_WRAP_TEXT_BLOCKS = [
             """
         ),
     },
+    {
+        "test_input": ['    """Summary.', '    more text"""'],
+        "wrap_summary": False,
+        "line_length": 40,
+        "expected_output": '    """Summary.\n\n    More text.\n    """\n',
+    },
+    {
+        "test_input": ['"""Summary.', "", "Args:", "    x: y.", "Returns:", '"""'],
+        "wrap_summary": False,
+        "line_length": 40,
+        "expected_output": '"""Summary.\n\nArgs:\n    x: y.\n\nReturns:\n"""\n',
+    },
 ]
 
 
@@ -306,3 +320,129 @@ def test_wrap_text_blocks(test_input, wrap_summary, line_length, expected_output
         )
         == expected_output
     )
+
+
+TEST_INPUTS_NUMPY = [
+    {
+        "test_input": dedent(
+            """\
+                '''compute  things
+
+                extended description
+                on two lines
+
+                parameters
+                ---
+                x  :int
+                    the first value
+                y : str, optional
+                    second.
+
+                    another paragraph
+                Returns
+                -------
+                int
+                    result
+                Examples
+                --------
+                >>> f(1,
+                ...   2)
+                '''"""
+        ).split("\n"),
+        "wrap_summary": False,
+        "line_length": 40,
+        "expected_output": dedent(
+            """\
+                '''Compute things.
+
+                Extended description on two lines.
+
+                Parameters
+                ----------
+                x : int
+                    the first value.
+                y : str, optional
+                    second.
+
+                    another paragraph.
+
+                Returns
+                -------
+                int
+                    result.
+
+                Examples
+                --------
+                >>> f(1,
+                ...   2)
+                '''
+            """
+        ),
+    },
+    {
+        "test_input": ['"""summary"""'],
+        "wrap_summary": False,
+        "line_length": 40,
+        "expected_output": '"""Summary."""\n',
+    },
+]
+
+
+@pytest.mark.parametrize(
+    list(TEST_INPUTS_NUMPY[0].keys()),
+    [tuple(test_case.values()) for test_case in TEST_INPUTS_NUMPY],
+)
+def test_numpy_formatter(test_input, wrap_summary, line_length, expected_output):
+    assert (
+        str(
+            NumpyFormatter(
+                test_input, wrap_summary=wrap_summary, line_length=line_length
+            )
+        )
+        == expected_output
+    )
+
+
+def test_formatter_registry():
+    assert FORMATTERS == {"google": GoogleFormatter, "numpy": NumpyFormatter}
+    assert get_formatter("numpy") is NumpyFormatter
+    with pytest.raises(ValueError):
+        get_formatter("sphinx")
+
+
+def test_register_formatter(monkeypatch):
+    monkeypatch.setattr(
+        "docmat.docstring_formats.shared.base.FORMATTERS", dict(FORMATTERS)
+    )
+
+    class UpperFormatter(GoogleFormatter):
+        style = "upper"
+
+        def get_formatted_docstring(self):
+            return [line.upper() for line in super().get_formatted_docstring()]
+
+    assert get_formatter("upper") is UpperFormatter
+    assert "upper" not in FORMATTERS
+
+
+@pytest.mark.parametrize(
+    ["formatter", "test_input"],
+    [
+        (formatter, test_case["test_input"])
+        for formatter, test_cases in [
+            (GoogleFormatter, TEST_INPUTS_WRAP_SUMMARY + TEST_INPUTS_WRAP_TEXT_BLOCKS),
+            (NumpyFormatter, TEST_INPUTS_NUMPY),
+        ]
+        for test_case in test_cases
+    ],
+)
+@pytest.mark.parametrize("wrap_summary", [False, True])
+def test_render_parsed_docstring(formatter, test_input, wrap_summary):
+    docstring = formatter.parse(test_input)
+    for line_length in (20, 40, 60, 88):
+        assert (
+            docstring.render(line_length, wrap_summary)
+            == formatter(
+                test_input, line_length=line_length, wrap_summary=wrap_summary
+            ).get_formatted_docstring()
+        )
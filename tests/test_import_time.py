@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def imported_modules(module):
+    process = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(process.stdout.split())
+
+
+@pytest.mark.parametrize(
+    ["module", "lazy_modules"],
+    [
+        (
+            "docmat",
+            [
+                "concurrent.futures",
+                "docmat.api",
+                "docmat.cache",
+                "docmat.docstring_formats",
+                "textwrap",
+            ],
+        ),
+        (
+            "docmat.__main__",
+            [
+                "ast",
+                "cProfile",
+                "concurrent.futures",
+                "difflib",
+                "docmat.api",
+                "docmat.cache",
+                "docmat.docstring_formats",
+                "hashlib",
+                "tempfile",
+                "textwrap",
+            ],
+        ),
+    ],
+)
+def test_lazy_imports(module, lazy_modules):
+    assert not imported_modules(module) & set(lazy_modules)
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+from docmat import format_source
+from docmat.line_ranges import (
+    LineRange,
+    overlaps,
+    parse_line_ranges,
+    parse_unified_diff,
+)
+
+DIFF = """\
+diff --git a/src/a.py b/src/a.py
+index 1111111..2222222 100644
+--- a/src/a.py
++++ b/src/a.py
+@@ -3,0 +4,2 @@ def func():
++    added line
++    added line
+@@ -10 +12 @@ def other():
+-    old
++    new
+@@ -20,3 +22,0 @@ def removed():
+-    removed
+-    removed
+-    removed
+diff --git a/deleted.py b/deleted.py
+--- a/deleted.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-x = 1
+-y = 2
+"""
+
+
+def test_parse_line_ranges():
+    assert parse_line_ranges("10-40, 100-120,7-7") == [
+        LineRange(10, 40),
+        LineRange(100, 120),
+        LineRange(7, 7),
+    ]
+
+
+@pytest.mark.parametrize("value", ["10", "10-", "a-b", "0-3", "5-3", "1-2,"])
+def test_parse_invalid_line_ranges(value):
+    with pytest.raises(ValueError):
+        parse_line_ranges(value)
+
+
+def test_parse_unified_diff():
+    assert parse_unified_diff(DIFF) == {
+        os.path.abspath("src/a.py"): [LineRange(4, 5), LineRange(12, 12)]
+    }
+
+
+@pytest.mark.parametrize(
+    ["start", "end", "expected"],
+    [(1, 9, False), (1, 10, True), (15, 25, True), (21, 29, False), (30, 31, True)],
+)
+def test_overlaps(start, end, expected):
+    assert overlaps([LineRange(10, 20), LineRange(30, 30)], start, end) == expected
+
+
+def test_format_source_line_ranges():
+    source = '"""module"""\n\n\ndef func():\n    """\n    function\n    """\n'
+    assert format_source(source, line_ranges=[LineRange(6, 6)]) == (
+        '"""module"""\n\n\ndef func():\n    """Function."""\n'
+    )
+    assert format_source(source, line_ranges=[LineRange(1, 1)]) == (
+        '"""Module."""\n\n\ndef func():\n    """\n    function\n    """\n'
+    )
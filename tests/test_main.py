@@ -0,0 +1,383 @@
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import docmat.__main__
+import docmat.file
+import pytest
+from docmat.__main__ import (
+    FileResult,
+    _process_files_pipelined,
+    format_content,
+    iter_files,
+    main,
+    process_files,
+    write_formatted_file,
+)
+from docmat.docstring_formats.shared.string_utils import get_text_wrapper
+from docmat.file import discard_writes
+
+FORMATTED = '''def func():
+    """Summary."""
+'''
+
+UNFORMATTED = '''def func():
+    """summary"""
+'''
+
+INVALID = "def func(:\n"
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i, content in enumerate([UNFORMATTED, INVALID, FORMATTED, UNFORMATTED]):
+        path = tmp_path / f"file_{i}.py"
+        path.write_text(content)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize(["jobs", "io_threads"], [(1, 0), (2, 0), (1, 2), (2, 1)])
+def test_process_files(files, jobs, io_threads):
+    results = list(process_files(files, 88, False, jobs, io_threads=io_threads))
+    assert [result.path for result in results] == files
+    assert [result.changed for result in results] == [True, False, False, True]
+    assert [result.error is None for result in results] == [True, False, True, True]
+    assert results[1].error.startswith("SyntaxError")
+    for path in files[:1] + files[2:]:
+        with open(path) as f:
+            assert f.read() == FORMATTED
+
+
+def test_process_files_io_threads_not_forked(files, monkeypatch):
+    fork = os.fork
+    threads_at_fork = []
+
+    def record_fork():
+        threads_at_fork.append(threading.active_count())
+        return fork()
+
+    monkeypatch.setattr(os, "fork", record_fork)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        results = list(process_files(files * 4, 88, False, 2, io_threads=4))
+    assert [result.path for result in results] == files * 4
+    assert all(count == 1 for count in threads_at_fork)
+    assert not [w for w in caught if "fork()" in str(w.message)]
+
+
+def test_process_files_stats(files):
+    # Unusual line length, so that docstrings cached by other tests are not reused
+    results = list(process_files(files, 77, False))
+    assert results[1].stats is None
+    stats = [result.stats for result in results[:1] + results[2:]]
+    assert [s.docstrings for s in stats] == [1, 1, 1]
+    assert [s.bytes for s in stats] == [30, 31, 30]
+    assert [(s.docstring_cache_hits, s.docstring_cache_misses) for s in stats] == [
+        (0, 1),
+        (0, 1),
+        (1, 0),
+    ]
+    assert {"read", "parse", "format", "replace", "write"} <= set(stats[0].timings)
+
+
+def test_process_files_pipelined_is_bounded(files, monkeypatch):
+    in_flight = []
+    max_in_flight = 0
+
+    def read_file(path, timer):
+        nonlocal max_in_flight
+        in_flight.append(path)
+        max_in_flight = max(max_in_flight, len(in_flight))
+        raise OSError("unreadable")
+
+    monkeypatch.setattr(docmat.__main__, "read_file", read_file)
+    for result in process_files(files * 5, 88, False, io_threads=1):
+        assert result.error == "OSError: unreadable"
+        in_flight.remove(result.path)
+    assert max_in_flight == 2
+
+
+def test_process_files_pipelined_formats_concurrently(files):
+    # The files can only be formatted if all the workers format at the same time,
+    # while a single I/O thread reads and writes them
+    workers = 4
+    barrier = threading.Barrier(workers, timeout=10)
+
+    def format_file(content, path, line_ranges=None):
+        barrier.wait()
+        return format_content(content, path, 88, False, line_ranges)
+
+    paths = [files[0], files[2], files[3], files[0]]
+    with ThreadPoolExecutor(max_workers=workers) as format_executor:
+        results = list(
+            _process_files_pipelined(
+                paths,
+                [None] * len(paths),
+                format_file,
+                write_formatted_file,
+                format_executor,
+                workers,
+                1,
+            )
+        )
+    assert [result.error for result in results] == [None] * 4
+    assert [result.path for result in results] == paths
+
+
+def test_main_stats(files, tmp_path, monkeypatch, capsys):
+    profile = tmp_path / "docmat.prof"
+    argv = ["docmat", files[0], files[3], "--no-cache", "--stats"]
+    monkeypatch.setattr(sys, "argv", argv + ["--profile", str(profile)])
+    assert main() == 0
+    _, err = capsys.readouterr()
+    assert "files: 2 (2 changed, 0 failed), docstrings: 2" in err
+    assert "hit rate" in err
+    assert files[3] in err.split("slowest files:")[1]
+    assert pstats.Stats(str(profile)).total_calls > 0
+
+
+def test_main_stats_commit_error(files, monkeypatch, capsys):
+    def commit_writes(pending_writes):
+        pending_writes = list(pending_writes)
+        discard_writes(pending_writes)
+        return {
+            pending_write.path: OSError("disk full") for pending_write in pending_writes
+        }
+
+    monkeypatch.setattr(docmat.file, "commit_writes", commit_writes)
+    argv = ["docmat", files[0], files[3], "--no-cache", "--stats", "--jobs", "1"]
+    monkeypatch.setattr(sys, "argv", argv + ["--fsync", "batch"])
+    assert main() == 1
+    _, err = capsys.readouterr()
+    assert f"error: cannot write {files[0]}: disk full" in err
+    assert "files: 2 (0 changed, 2 failed)" in err
+
+
+def test_main_extend_exclude(files, tmp_path, monkeypatch, capsys):
+    argv = ["docmat", str(tmp_path), "--no-cache", "--check", "--jobs", "1"]
+    monkeypatch.setattr(sys, "argv", argv + ["--extend-exclude", "file_[13]"])
+    assert main() == 1
+    _, err = capsys.readouterr()
+    assert err == f"would reformat {files[0]}\n"
+
+
+@pytest.mark.parametrize("flags", [[], ["--check"]])
+def test_main_low_memory(files, monkeypatch, capsys, flags):
+    argv = ["docmat", *files, "--jobs", "1", "--no-cache", "--low-memory"] + flags
+    monkeypatch.setattr(sys, "argv", argv)
+    assert main() == 1
+    with open(files[3]) as f:
+        assert f.read() == (UNFORMATTED if flags else FORMATTED)
+    _, err = capsys.readouterr()
+    assert f"error: cannot format {files[1]}" in err
+
+
+@pytest.mark.parametrize(
+    "flags",
+    [
+        ["--low-memory", "--diff"],
+        ["--low-memory", "--io-threads", "2"],
+        ["--io-threads", "-1"],
+        ["--style", "sphinx"],
+        ["--wrapper", "knuth"],
+        ["--report", "json", "--diff"],
+        ["--report", "xml"],
+        ["--changed-lines", "missing.diff"],
+    ],
+)
+def test_main_invalid_arguments(files, monkeypatch, flags):
+    monkeypatch.setattr(sys, "argv", ["docmat", files[0]] + flags)
+    with pytest.raises(SystemExit):
+        main()
+
+
+@pytest.mark.parametrize(
+    "flags",
+    [
+        ["--fsync", "batch"],
+        ["--low-memory", "--fsync", "batch"],
+        ["--io-threads", "2", "--fsync", "batch"],
+        ["--fsync", "never"],
+    ],
+)
+def test_main_fsync(files, tmp_path, monkeypatch, flags):
+    cache_dir = tmp_path / "cache"
+    argv = ["docmat", files[0], files[3], "--jobs", "1", "--cache-dir", str(cache_dir)]
+    monkeypatch.setattr(sys, "argv", argv + flags)
+    assert main() == 0
+    for path in (files[0], files[3]):
+        with open(path) as f:
+            assert f.read() == FORMATTED
+    assert sorted(os.listdir(tmp_path)) == ["cache"] + [
+        f"file_{i}.py" for i in range(4)
+    ]
+    # The cache entries of the files written at the end of the run are valid
+    calls = []
+
+    def process_file(path, **kwargs):
+        calls.append(path)
+        return FileResult(path, False, None)
+
+    monkeypatch.setattr(docmat.__main__, "process_file", process_file)
+    assert main() == 0
+    assert calls == []
+
+
+@pytest.mark.parametrize("wrapper", ["greedy", "textwrap"])
+def test_main_wrapper(files, monkeypatch, wrapper):
+    monkeypatch.setenv("DOCMAT_WRAPPER", "greedy")
+    argv = ["docmat", files[0], files[3], "--jobs", "2", "--no-cache"]
+    monkeypatch.setattr(sys, "argv", argv + ["--wrapper", wrapper])
+    try:
+        assert main() == 0
+        assert os.environ["DOCMAT_WRAPPER"] == wrapper
+    finally:
+        get_text_wrapper.cache_clear()
+    for path in (files[0], files[3]):
+        with open(path) as f:
+            assert f.read() == FORMATTED
+
+
+@pytest.mark.parametrize(
+    "flags", [[], ["--check"], ["--low-memory"], ["--fsync", "batch", "--jobs", "2"]]
+)
+def test_main_report(files, tmp_path, monkeypatch, flags):
+    report_file = tmp_path / "report.jsonl"
+    argv = ["docmat", *files, "--no-cache", "--report", "json"] + flags
+    monkeypatch.setattr(sys, "argv", argv + ["--report-file", str(report_file)])
+    assert main() == 1
+    records = [json.loads(line) for line in report_file.read_text().splitlines()]
+    assert sorted(record["path"] for record in records[:-1]) == files
+    by_path = {record["path"]: record for record in records[:-1]}
+    assert by_path[files[1]]["error"] is not None
+    assert by_path[files[1]]["duration"] >= 0
+    assert by_path[files[2]]["changed"] is False
+    assert by_path[files[2]]["bytes_out"] == by_path[files[2]]["bytes_in"] == 31
+    changed = by_path[files[0]]
+    assert changed["changed"] is True and changed["error"] is None
+    assert (changed["docstrings"], changed["docstrings_changed"]) == (1, 1)
+    assert changed["bytes_in"] == len(UNFORMATTED)
+    assert changed["bytes_out"] == len(FORMATTED)
+    assert changed["duration"] >= 0
+    summary = records[-1]
+    assert summary["type"] == "summary"
+    assert (summary["files"], summary["changed"], summary["errors"]) == (4, 2, 1)
+    assert summary["docstrings_changed"] == 2
+
+
+@pytest.mark.parametrize(
+    "flags",
+    [
+        [],
+        ["--report", "json", "--jobs", "0"],
+        ["--report", "json", "--changed-lines", "missing.diff"],
+    ],
+)
+def test_main_report_file_kept_on_usage_error(files, tmp_path, monkeypatch, flags):
+    report_file = tmp_path / "keep.txt"
+    report_file.write_text("keep")
+    argv = ["docmat", files[0], "--report-file", str(report_file)] + flags
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit):
+        main()
+    assert report_file.read_text() == "keep"
+
+
+def test_main_report_stdout(files, monkeypatch, capsys):
+    argv = ["docmat", files[2], "--no-cache", "--report", "json"]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert main() == 0
+    out, _ = capsys.readouterr()
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record["type"] for record in records] == ["file", "summary"]
+
+
+def test_iter_files(tmp_path):
+    (tmp_path / "a.py").touch()
+    (tmp_path / "b.txt").touch()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "c.py").touch()
+    assert sorted(iter_files([str(tmp_path)])) == [
+        str(tmp_path / "a.py"),
+        str(tmp_path / "sub" / "c.py"),
+    ]
+    assert list(iter_files([str(tmp_path / "*.txt")])) == []
+
+
+def test_main_uses_cache(files, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    argv = ["docmat", files[0], "--jobs", "1", "--cache-dir", str(cache_dir)]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert main() == 0
+    assert len(list(cache_dir.glob("cache.*.json"))) == 1
+
+    calls = []
+
+    def process_file(path, **kwargs):
+        calls.append(path)
+        return FileResult(path, False, None)
+
+    monkeypatch.setattr(docmat.__main__, "process_file", process_file)
+    assert main() == 0
+    assert calls == []
+    monkeypatch.setattr(sys, "argv", argv + ["--no-cache"])
+    assert main() == 0
+    assert calls == [files[0]]
+
+
+@pytest.mark.parametrize(
+    ["flags", "expected_exit_code"],
+    [(["--check"], 1), (["--diff"], 0), (["--check", "--diff"], 1)],
+)
+def test_main_does_not_write(files, monkeypatch, capsys, flags, expected_exit_code):
+    argv = ["docmat", files[0], files[2], "--jobs", "1", "--no-cache"] + flags
+    monkeypatch.setattr(sys, "argv", argv)
+    assert main() == expected_exit_code
+    with open(files[0]) as f:
+        assert f.read() == UNFORMATTED
+    out, err = capsys.readouterr()
+    assert ("+++" in out) == ("--diff" in flags)
+    assert (f"would reformat {files[0]}" in err) == ("--check" in flags)
+    assert files[2] not in out + err
+
+
+@pytest.mark.parametrize(
+    ["flags", "expected_out", "expected_exit_code"],
+    [([], FORMATTED, 0), (["--check"], "", 1), (["--diff"], "+++ STDIN", 0)],
+)
+def test_main_stdin(monkeypatch, capsys, flags, expected_out, expected_exit_code):
+    monkeypatch.setattr(sys, "argv", ["docmat", "-"] + flags)
+    monkeypatch.setattr(sys, "stdin", io.StringIO(UNFORMATTED))
+    assert main() == expected_exit_code
+    out, _ = capsys.readouterr()
+    assert expected_out in out
+    assert bool(out) == bool(expected_out)
+
+
+def test_main_line_ranges(tmp_path, monkeypatch):
+    path = tmp_path / "file.py"
+    path.write_text(UNFORMATTED + "\n\n" + UNFORMATTED)
+    argv = ["docmat", str(path), "--line-ranges", "6-6", "--no-cache"]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert main() == 0
+    assert path.read_text() == UNFORMATTED + "\n\n" + FORMATTED
+
+
+def test_main_changed_lines(files, tmp_path, monkeypatch):
+    diff = tmp_path / "changes.diff"
+    diff.write_text(f'--- a/file\n+++ {files[3]}\n@@ -1,0 +2 @@\n+    """summary"""\n')
+    argv = ["docmat", files[0], files[3], "--changed-lines", str(diff), "--jobs", "1"]
+    monkeypatch.setattr(sys, "argv", argv + ["--cache-dir", str(tmp_path / "cache")])
+    assert main() == 0
+    with open(files[0]) as f:
+        assert f.read() == UNFORMATTED
+    with open(files[3]) as f:
+        assert f.read() == FORMATTED
+    assert not (tmp_path / "cache").exists()
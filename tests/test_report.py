@@ -0,0 +1,43 @@
+import io
+import json
+
+from docmat.report import JsonReport
+from docmat.stats import FileStats
+
+
+def test_json_report():
+    file = io.StringIO()
+    report = JsonReport(file)
+    report.add("a.py", True, None, FileStats({"format": 2.0}, 3, 10, 1, 2, 2, 12))
+    assert len(file.getvalue().splitlines()) == 1
+    report.add("b.py", False, "SyntaxError: invalid syntax", None, 0.5)
+    report.add("c.py", True, None, FileStats({"stream": 1.0}, 1, 20, 0, 1, 1, None))
+    report.summary(4.0, cached=5)
+    records = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert records[0] == {
+        "type": "file",
+        "path": "a.py",
+        "changed": True,
+        "docstrings": 3,
+        "docstrings_changed": 2,
+        "bytes_in": 10,
+        "bytes_out": 12,
+        "duration": 2.0,
+        "error": None,
+    }
+    assert records[1]["error"] == "SyntaxError: invalid syntax"
+    assert records[1]["docstrings"] is None
+    assert records[1]["duration"] == 0.5
+    assert records[2]["bytes_out"] is None
+    assert records[3] == {
+        "type": "summary",
+        "files": 3,
+        "cached": 5,
+        "changed": 2,
+        "errors": 1,
+        "docstrings": 4,
+        "docstrings_changed": 3,
+        "bytes_in": 30,
+        "bytes_out": 12,
+        "duration": 4.0,
+    }
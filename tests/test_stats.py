@@ -0,0 +1,55 @@
+import io
+
+import pytest
+from docmat.stats import N_SLOWEST_FILES, FileStats, PhaseTimer, RunStats
+
+
+def test_phase_timer():
+    timer = PhaseTimer()
+    with timer.phase("read"):
+        pass
+    with timer.phase("format"):
+        pass
+    with timer.phase("read"):
+        pass
+    assert set(timer.timings) == {"read", "format"}
+    assert all(seconds >= 0 for seconds in timer.timings.values())
+
+
+@pytest.fixture
+def run_stats():
+    run_stats = RunStats()
+    run_stats.add(
+        "a.py", True, False, FileStats({"read": 1.0, "format": 2.0}, 3, 10, 1, 2)
+    )
+    run_stats.add("b.py", False, True, None)
+    run_stats.add("c.py", False, False, FileStats({"format": 5.0}, 1, 20, 0, 1))
+    return run_stats
+
+
+def test_run_stats(run_stats):
+    assert (run_stats.files, run_stats.changed, run_stats.errors) == (3, 1, 1)
+    assert (run_stats.docstrings, run_stats.bytes) == (4, 30)
+    assert run_stats.timings == {"read": 1.0, "format": 7.0}
+    assert run_stats.slowest_files() == [(5.0, "c.py"), (3.0, "a.py")]
+    assert run_stats.slowest_files(1) == [(5.0, "c.py")]
+
+
+def test_run_stats_keeps_slowest_files():
+    run_stats = RunStats()
+    for i in range(100):
+        stats = FileStats({"format": float(i % 37)}, 1, 10, 0, 1, 1, 12)
+        run_stats.add(f"{i}.py", True, False, stats)
+    assert len(run_stats._file_times) == N_SLOWEST_FILES
+    assert [seconds for seconds, _ in run_stats.slowest_files(3)] == [36.0, 36.0, 35.0]
+    assert (run_stats.docstrings_changed, run_stats.bytes_out) == (100, 1200)
+
+
+def test_run_stats_report(run_stats):
+    report = io.StringIO()
+    run_stats.report(4.0, report)
+    lines = report.getvalue().splitlines()
+    assert lines[0] == "files: 3 (1 changed, 1 failed), docstrings: 4, bytes: 30"
+    assert lines[1] == "docstring cache: 1 hits, 3 misses (25.0% hit rate)"
+    assert "format          7.000   87.5%" in lines
+    assert lines[-2:] == ["     5.000s c.py", "     3.000s a.py"]
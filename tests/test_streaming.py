@@ -0,0 +1,162 @@
+import io
+import os
+import stat
+import tracemalloc
+
+import pytest
+from docmat import format_source
+from docmat.api import format_file
+from docmat.file import FileHandler, commit_writes
+from docmat.line_ranges import LineRange
+from docmat.streaming import format_file_streaming, format_lines_streaming
+
+SOURCES = [
+    'def func():\n    """summary"""\n',
+    'def func():\n    """summary"""\n    return 1\n',
+    '"""module summary"""\nimport os\n',
+    'def func(a: int = (1, 2)) -> "str":\n    """summary"""\n',
+    'def func():\n    b"""not a docstring"""\n    f"""not {a} docstring"""\n',
+    'def func():\n    """   """\n',
+    'def func():\n    x = 1\n    """not a docstring"""\n',
+    'def func():\n    """summary""".strip()\n',
+    'class A:\n    """summary"""\n\n    def f(self):\n        """summary"""\n',
+    'def func():\n    """summary\n\n    args:\n    x (int): value.\n    """\n',
+    'def func():\n    """summary"""',
+    'def func():\r\n    """summary"""\r\n    pass\r\n',
+    'x = {"a": 1}\n\n\nasync def func():\n    """summary"""\n',
+]
+
+
+def format_streaming(source, line_ranges=None):
+    output = io.StringIO()
+    result = format_lines_streaming(
+        io.StringIO(source, newline=""), output.write, 88, False, line_ranges
+    )
+    return output.getvalue(), result
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_format_lines_streaming(source):
+    formatted, result = format_streaming(source)
+    expected = format_source(source.replace("\r\n", "\n"))
+    assert formatted.replace("\r\n", "\n") == expected
+    assert result.changed == (formatted != source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        '"""module summary"""  # comment\n',
+        'def func(): """summary"""\n',
+        'def func(): """summary"""; return 1\n',
+        'def func():\n    """summary"""; return 1\n',
+    ],
+)
+def test_format_lines_streaming_shared_lines(source):
+    assert format_streaming(source) == (source, (0, False, 0))
+
+
+def test_format_lines_streaming_line_ranges():
+    source = 'def f():\n    """summary"""\n\n\ndef g():\n    """summary"""\n'
+    formatted, result = format_streaming(source, [LineRange(5, 6)])
+    assert formatted == (
+        'def f():\n    """summary"""\n\n\ndef g():\n    """Summary."""\n'
+    )
+    assert result == (1, True, 1)
+
+
+@pytest.mark.parametrize("changed", [True, False])
+def test_format_file_streaming(tmp_path, changed):
+    path = tmp_path / "module.py"
+    source = SOURCES[0] if changed else format_source(SOURCES[0])
+    path.write_text(source)
+    os.chmod(path, 0o640)
+    result, pending_write = format_file_streaming(str(path), 88, False)
+    assert result == (1, changed, int(changed))
+    assert (pending_write is not None) == changed
+    if changed:
+        assert path.read_text() == source
+        assert commit_writes([pending_write]) == {}
+    assert path.read_text() == format_source(SOURCES[0])
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert os.listdir(tmp_path) == ["module.py"]
+
+
+def test_format_file_streaming_symlink(tmp_path):
+    (tmp_path / "target").mkdir()
+    path = tmp_path / "target" / "module.py"
+    path.write_text(SOURCES[0])
+    symlink = tmp_path / "link.py"
+    symlink.symlink_to(path)
+    _, pending_write = format_file_streaming(str(symlink), 88, False)
+    assert commit_writes([pending_write]) == {}
+    assert symlink.is_symlink()
+    assert path.read_text() == format_source(SOURCES[0])
+    assert os.listdir(tmp_path / "target") == ["module.py"]
+
+
+def test_format_file_streaming_no_write(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text(SOURCES[0])
+    assert format_file_streaming(str(path), 88, False, write=False) == (
+        (1, True, 1),
+        None,
+    )
+    assert path.read_text() == SOURCES[0]
+    assert os.listdir(tmp_path) == ["module.py"]
+
+
+def test_format_file_streaming_error(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text('def func():\n    """summary"""\n    x = (\n')
+    with pytest.raises(Exception):
+        format_file_streaming(str(path), 88, False)
+    assert path.read_text() == 'def func():\n    """summary"""\n    x = (\n'
+    assert os.listdir(tmp_path) == ["module.py"]
+
+
+@pytest.mark.parametrize(
+    ["encoding", "newline"], [("utf-8-sig", "\n"), ("latin-1", "\r\n")]
+)
+def test_format_file_streaming_encoding(tmp_path, encoding, newline):
+    path = tmp_path / "module.py"
+    source = "# -*- coding: latin-1 -*-\n" if encoding == "latin-1" else ""
+    source += 'def func():\n    """résumé"""\n'
+    path.write_bytes(source.replace("\n", newline).encode(encoding))
+    _, pending_write = format_file_streaming(str(path), 88, False)
+    commit_writes([pending_write])
+    expected = source.replace('"""résumé"""', '"""Résumé."""')
+    assert path.read_bytes() == expected.replace("\n", newline).encode(encoding)
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("low_memory", [True, False])
+def test_peak_memory(tmp_path, low_memory):
+    # The docstrings are the same so that the bounded docstring cache doesn't grow
+    function = 'def func_{}(x):\n    """summary\n\n    args:\n    x: value.\n    """\n'
+    paths = []
+    for n_functions in (500, 5000):
+        path = tmp_path / f"module_{n_functions}.py"
+        path.write_text("".join(function.format(i) for i in range(n_functions)))
+        paths.append(str(path))
+    if low_memory:
+        peaks = [
+            peak_memory(lambda: format_file_streaming(path, 88, False, write=False))
+            for path in paths
+        ]
+        # Only the statement being tokenized is held in memory, whatever the file size
+        assert peaks[1] < 2 * peaks[0]
+    else:
+        peaks = [
+            peak_memory(lambda: format_file(FileHandler(path), 88, False))
+            for path in paths
+        ]
+        assert peaks[1] > 5 * peaks[0]